@@ -1,12 +1,6 @@
-from .models import CartItem
+from .summary import get_cart_summary
 
 
 def cart_summary(request):
-    count = 0
-    total = 0
-    user = getattr(request, "user", None)
-    if user and user.is_authenticated:
-        items = CartItem.objects.filter(user=user).select_related("product")
-        count = sum(i.quantity for i in items)
-        total = sum(i.line_total for i in items)
-    return {"cart_count": count, "cart_total": total}
+    summary = get_cart_summary(request)
+    return {"cart_count": summary["count"], "cart_total": summary["total"]}
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.24 on 2026-10-18 10:32
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_items(apps, schema_editor):
+    CartItem = apps.get_model("cart", "CartItem")
+
+    duplicates = (
+        CartItem.objects
+        .values("user", "product")
+        .annotate(rows=Count("id"), keep=Min("id"), total=Sum("quantity"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        CartItem.objects.filter(pk=row["keep"]).update(quantity=row["total"])
+        CartItem.objects.filter(
+            user=row["user"],
+            product=row["product"],
+        ).exclude(pk=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_alter_cartitem_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_items,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('user', 'product'), name='uniq_cartitem_user_product'),
+        ),
+    ]
@@ -1,7 +1,33 @@
 from django.db import models
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
 from django.contrib.auth.models import User
 from products.models import Product
 
+LINE_TOTAL = ExpressionWrapper(
+    F("quantity") * F("product__price"),
+    output_field=DecimalField(max_digits=10, decimal_places=2),
+)
+
+
+class CartItemQuerySet(models.QuerySet):
+    def with_line_totals(self):
+        """
+        Compute unit_price and line_total in SQL for every row.
+        """
+        return self.annotate(
+            unit_price=F("product__price"),
+            line_total=LINE_TOTAL,
+        )
+
+    def totals(self):
+        """
+        Return the item count and gross total in one aggregate query.
+        """
+        return self.aggregate(
+            count=Sum("quantity"),
+            gross_total=Sum(LINE_TOTAL),
+        )
+
 
 class CartItem(models.Model):
     user = models.ForeignKey(
@@ -15,13 +41,39 @@ class CartItem(models.Model):
     )
     quantity = models.PositiveIntegerField(default=1)
 
+    objects = CartItemQuerySet.as_manager()
+
+    # Set by CartItemQuerySet.with_line_totals()
+    _unit_price = None
+    _line_total = None
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "product"],
+                name="uniq_cartitem_user_product",
+            )
+        ]
+
     def __str__(self):
         return f"{self.product.name} x {self.quantity}"
 
     @property
     def unit_price(self):
+        if self._unit_price is not None:
+            return self._unit_price
         return self.product.price
 
+    @unit_price.setter
+    def unit_price(self, value):
+        self._unit_price = value
+
     @property
     def line_total(self):
+        if self._line_total is not None:
+            return self._line_total
         return self.unit_price * self.quantity
+
+    @line_total.setter
+    def line_total(self, value):
+        self._line_total = value
@@ -0,0 +1,174 @@
+import logging
+
+import stripe
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order
+
+from .models import CartItem
+
+logger = logging.getLogger(__name__)
+
+# Intents in these states can still be confirmed by the payment page.
+REUSABLE_STATUSES = {
+    "requires_payment_method",
+    "requires_confirmation",
+    "requires_action",
+}
+
+# Intents in these states have been paid, or are being paid. They are
+# never replaced, or the payment could no longer be matched to its
+# order.
+SETTLED_STATUSES = {"succeeded", "processing"}
+
+
+def idempotency_key(order, amount, currency, replaces=""):
+    """
+    Stripe idempotency key for creating the intent of ``order``.
+
+    Repeating a create for the same order and amount (a double submit
+    or a retried request) replays the original response instead of
+    opening another intent. ``replaces`` is the id of an unusable
+    intent being replaced, so its successor gets a fresh key.
+    """
+    key = f"fotolio-{order.order_number}-{amount}-{currency}"
+    return f"{key}-{replaces}" if replaces else key
+
+
+def get_payment_intent(order, amount, currency, metadata):
+    """
+    Return a PaymentIntent for ``order`` charging ``amount`` (in the
+    smallest currency unit).
+
+    The order's existing intent is retrieved and reused while it can
+    still be paid, and only updated when the amount changed. A settled
+    intent is returned unchanged, so the caller can send the buyer on
+    to the confirmation. A new intent is created when the order has
+    none or it is no longer usable.
+    """
+    currency = str(currency).lower()
+    replaces = ""
+
+    if order.stripe_payment_intent_id:
+        intent = stripe.PaymentIntent.retrieve(order.stripe_payment_intent_id)
+        if intent.status in SETTLED_STATUSES:
+            return intent
+        if (
+            intent.status in REUSABLE_STATUSES
+            and str(intent.currency).lower() == currency
+        ):
+            if int(intent.amount) == amount:
+                return intent
+            # Setting the amount is idempotent by itself; a fixed key
+            # would replay a stale response if the amount changes back.
+            return stripe.PaymentIntent.modify(
+                intent.id,
+                amount=amount,
+                metadata=metadata,
+            )
+        replaces = intent.id
+
+    return stripe.PaymentIntent.create(
+        amount=amount,
+        currency=currency,
+        automatic_payment_methods={"enabled": True},
+        metadata=metadata,
+        idempotency_key=idempotency_key(order, amount, currency, replaces),
+    )
+
+
+def cancel_payment_intent(intent_id):
+    """
+    Cancel an intent so a stale payment page can no longer charge it.
+
+    Returns True when the intent is canceled, or unknown to Stripe, and
+    False when it has been paid, is being paid or Stripe could not be
+    reached; its order must then be kept.
+    """
+    try:
+        intent = stripe.PaymentIntent.retrieve(intent_id)
+        if intent.status in SETTLED_STATUSES:
+            return False
+        if intent.status != "canceled":
+            stripe.PaymentIntent.cancel(intent_id)
+    except stripe.InvalidRequestError as error:
+        return error.http_status == 404
+    except stripe.StripeError:
+        return False
+    return True
+
+
+def mark_order_paid(order, intent_id, currency, amount):
+    """
+    Record a succeeded payment on ``order`` and clear the buyer's cart.
+
+    The flag is flipped with a conditional UPDATE, so only the first of
+    several confirmations (webhook deliveries, replays, the success
+    page) does the work. Returns True for that one call.
+    """
+    with transaction.atomic():
+        paid_at = timezone.now()
+        updated = Order.objects.filter(pk=order.pk, is_paid=False).update(
+            is_paid=True,
+            paid_at=paid_at,
+            stripe_payment_intent_id=intent_id,
+            stripe_currency=str(currency).lower(),
+            stripe_amount=int(amount),
+            updated_at=paid_at,
+        )
+        if updated and order.user_id:
+            CartItem.objects.filter(user_id=order.user_id).delete()
+
+    if updated:
+        order.is_paid = True
+        order.paid_at = paid_at
+        order.stripe_payment_intent_id = intent_id
+        order.stripe_currency = str(currency).lower()
+        order.stripe_amount = int(amount)
+    return bool(updated)
+
+
+def confirm_payment_intent(intent):
+    """
+    Mark the order paid by a ``payment_intent.succeeded`` event.
+
+    The order is found by the intent's id or, failing that, by the
+    order number in the intent's metadata, in case the order was moved
+    to another intent before this payment was reported. Returns the
+    order, or None when no order matches the intent's amount and
+    currency; a payment taken without an order to fulfil is logged as
+    an error.
+    """
+    order = (
+        Order.objects
+        .filter(stripe_payment_intent_id=intent["id"])
+        .first()
+    )
+    if order is None:
+        order_number = (intent.get("metadata") or {}).get("order_number")
+        if order_number:
+            order = Order.objects.filter(order_number=order_number).first()
+    if order is None:
+        logger.error(
+            "Payment %s succeeded but matches no order.",
+            intent["id"],
+        )
+        return None
+
+    received = intent.get("amount_received") or intent["amount"]
+    if (
+        int(received) != order.stripe_amount
+        or str(intent["currency"]).lower() != order.stripe_currency
+    ):
+        logger.error(
+            "Payment %s of %s %s does not match order %s.",
+            intent["id"],
+            received,
+            intent["currency"],
+            order.order_number,
+        )
+        return None
+
+    mark_order_paid(order, intent["id"], intent["currency"], received)
+    return order
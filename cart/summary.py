@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from fotolio.caching import has_shared_cache
+from products.catalog import get_catalog_version
+
+from .models import CartItem
+
+CART_SUMMARY_CACHE_KEY = "cart:summary"
+CART_SUMMARY_CACHE_TIMEOUT = 60 * 5
+REQUEST_ATTR = "_cart_summary"
+
+EMPTY_SUMMARY = {"count": 0, "total": 0}
+
+
+def _cache_key(user_id):
+    # Prices live on Product, so a catalog change invalidates every cart.
+    return f"{CART_SUMMARY_CACHE_KEY}:{user_id}:{get_catalog_version()}"
+
+
+def _cache_timeout():
+    # A per-process cache would keep showing other workers' stale
+    # counts after the cart changes, so caching is off by default
+    # unless the cache is shared.
+    default = CART_SUMMARY_CACHE_TIMEOUT if has_shared_cache() else 0
+    return getattr(settings, "CART_SUMMARY_CACHE_TIMEOUT", default)
+
+
+def compute_cart_summary(user):
+    """
+    Return the item count and gross total of a cart in one aggregate
+    query, without loading the cart rows.
+    """
+    totals = CartItem.objects.filter(user=user).totals()
+    if not totals["count"]:
+        return dict(EMPTY_SUMMARY)
+    return {"count": totals["count"], "total": totals["gross_total"]}
+
+
+def get_cart_summary(request):
+    """
+    Return the cart summary for the current request.
+
+    The summary is computed at most once per request. With a shared
+    cache, or a non-zero CART_SUMMARY_CACHE_TIMEOUT setting, it is also
+    shared between requests until the cart or the catalog changes.
+    """
+    summary = getattr(request, REQUEST_ATTR, None)
+    if summary is not None:
+        return summary
+
+    user = getattr(request, "user", None)
+    if not user or not user.is_authenticated:
+        summary = dict(EMPTY_SUMMARY)
+    else:
+        timeout = _cache_timeout()
+        key = _cache_key(user.pk)
+        summary = cache.get(key) if timeout else None
+        if summary is None:
+            summary = compute_cart_summary(user)
+            if timeout:
+                cache.set(key, summary, timeout)
+
+    setattr(request, REQUEST_ATTR, summary)
+    return summary
+
+
+def remember_cart_summary(request, items):
+    """
+    Seed the per-request summary from cart rows a view already loaded,
+    so the context processor does not query them again.
+    """
+    count = sum(item.quantity for item in items)
+    total = sum((item.line_total for item in items), Decimal("0.00"))
+    if count:
+        summary = {"count": count, "total": total}
+    else:
+        summary = dict(EMPTY_SUMMARY)
+    setattr(request, REQUEST_ATTR, summary)
+
+
+def invalidate_cart_summary(user_id):
+    cache.delete(_cache_key(user_id))
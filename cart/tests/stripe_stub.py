@@ -0,0 +1,179 @@
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+import stripe
+
+CANCELABLE_STATUSES = {
+    "requires_payment_method",
+    "requires_confirmation",
+    "requires_action",
+    "requires_capture",
+}
+
+
+class StripeStub:
+    """
+    A local HTTP stand-in for the Stripe PaymentIntents API.
+
+    Used as a context manager, it points the stripe library at itself,
+    records every request as (method, path, idempotency key) in
+    ``calls`` and can add ``latency`` seconds to each response, so
+    tests can count and time Stripe round trips without the network.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = []
+        self.intents = {}
+        self.replays = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            daemon=True,
+        )
+        self._thread.start()
+
+        self._saved = (stripe.api_base, stripe.max_network_retries)
+        host, port = self._server.server_address
+        stripe.api_base = f"http://{host}:{port}"
+        stripe.max_network_retries = 0
+        return self
+
+    def __exit__(self, *exc_info):
+        stripe.api_base, stripe.max_network_retries = self._saved
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def count(self, method, action=""):
+        """
+        Number of requests made with ``method``; ``action`` narrows it
+        to "create", "retrieve", "update" or "cancel".
+        """
+        return sum(
+            1 for call in self.calls
+            if call[0] == method and (not action or call[3] == action)
+        )
+
+    def set_status(self, intent_id, status):
+        self.intents[intent_id]["status"] = status
+
+    def _handle(self, method, path, key, form):
+        parts = path.strip("/").split("/")
+        if parts[:2] != ["v1", "payment_intents"]:
+            return 404, {"error": {"message": f"No route {path}"}}
+
+        if len(parts) == 2 and method == "POST":
+            action = "create"
+        elif len(parts) == 3 and method == "GET":
+            action = "retrieve"
+        elif len(parts) == 3 and method == "POST":
+            action = "update"
+        elif parts[3:] == ["cancel"] and method == "POST":
+            action = "cancel"
+        else:
+            return 404, {"error": {"message": f"No route {path}"}}
+
+        with self._lock:
+            self.calls.append((method, path, key, action))
+            if key and key in self.replays:
+                return 200, self.replays[key]
+
+            if action == "create":
+                intent_id = f"pi_stub_{next(self._ids)}"
+                intent = {
+                    "id": intent_id,
+                    "object": "payment_intent",
+                    "amount": int(form["amount"]),
+                    "amount_received": 0,
+                    "currency": form["currency"],
+                    "status": "requires_payment_method",
+                    "client_secret": f"{intent_id}_secret",
+                    "metadata": _metadata(form),
+                }
+                self.intents[intent_id] = intent
+            else:
+                intent = self.intents.get(parts[2])
+                if intent is None:
+                    return 404, {
+                        "error": {
+                            "type": "invalid_request_error",
+                            "message": f"No such payment_intent: {parts[2]}",
+                        }
+                    }
+                if action == "update":
+                    if "amount" in form:
+                        intent["amount"] = int(form["amount"])
+                    intent["metadata"].update(_metadata(form))
+                elif action == "cancel":
+                    if intent["status"] in CANCELABLE_STATUSES:
+                        intent["status"] = "canceled"
+                    else:
+                        return 400, {
+                            "error": {
+                                "type": "invalid_request_error",
+                                "message": (
+                                    "You cannot cancel this PaymentIntent "
+                                    f"because it has a status of "
+                                    f"{intent['status']}."
+                                ),
+                            }
+                        }
+
+            response = dict(intent, metadata=dict(intent["metadata"]))
+            if key and method == "POST":
+                self.replays[key] = response
+            return 200, response
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def respond(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode()
+                path, _, query = self.path.partition("?")
+                form = dict(parse_qsl(body or query))
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+                status, payload = stub._handle(
+                    method,
+                    path,
+                    self.headers.get("Idempotency-Key", ""),
+                    form,
+                )
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self.respond("GET")
+
+            def do_POST(self):
+                self.respond("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _metadata(form):
+    return {
+        key[len("metadata["):-1]: value
+        for key, value in form.items()
+        if key.startswith("metadata[")
+    }
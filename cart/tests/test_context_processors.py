@@ -1,7 +1,8 @@
 from decimal import Decimal
 
 from django.contrib.auth.models import AnonymousUser, User
-from django.test import RequestFactory, TestCase
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
 
 from cart.context_processors import cart_summary
 from cart.models import CartItem
@@ -10,6 +11,7 @@ from products.models import Product
 
 class CartContextProcessorTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.factory = RequestFactory()
         self.user = User.objects.create_user(
             username="joe",
@@ -21,6 +23,11 @@ class CartContextProcessorTests(TestCase):
             description="Beautiful sunset artwork.",
             price=Decimal("49.99"),
         )
+        self.second_product = Product.objects.create(
+            name="Ocean Print",
+            description="Ocean wall art.",
+            price=Decimal("49.99"),
+        )
 
     def test_anonymous_user_gets_zero_cart_summary(self):
         request = self.factory.get("/")
@@ -48,7 +55,7 @@ class CartContextProcessorTests(TestCase):
         )
         CartItem.objects.create(
             user=self.user,
-            product=self.product,
+            product=self.second_product,
             quantity=1,
         )
 
@@ -59,3 +66,81 @@ class CartContextProcessorTests(TestCase):
 
         self.assertEqual(context["cart_count"], 3)
         self.assertEqual(context["cart_total"], Decimal("149.97"))
+
+    def test_summary_is_computed_once_per_request(self):
+        CartItem.objects.create(
+            user=self.user,
+            product=self.product,
+            quantity=2,
+        )
+        request = self.factory.get("/")
+        request.user = self.user
+
+        with self.assertNumQueries(1):
+            cart_summary(request)
+        with self.assertNumQueries(0):
+            context = cart_summary(request)
+
+        self.assertEqual(context["cart_count"], 2)
+
+    @override_settings(CART_SUMMARY_CACHE_TIMEOUT=300)
+    def test_summary_is_shared_through_cache_until_cart_changes(self):
+        item = CartItem.objects.create(
+            user=self.user,
+            product=self.product,
+            quantity=2,
+        )
+        first = self.factory.get("/")
+        first.user = self.user
+        cart_summary(first)
+
+        second = self.factory.get("/")
+        second.user = self.user
+        with self.assertNumQueries(0):
+            self.assertEqual(cart_summary(second)["cart_count"], 2)
+
+        item.quantity = 5
+        item.save()
+
+        third = self.factory.get("/")
+        third.user = self.user
+        self.assertEqual(cart_summary(third)["cart_count"], 5)
+
+    @override_settings(CART_SUMMARY_CACHE_TIMEOUT=300)
+    def test_price_change_invalidates_cached_total(self):
+        CartItem.objects.create(
+            user=self.user,
+            product=self.product,
+            quantity=2,
+        )
+        first = self.factory.get("/")
+        first.user = self.user
+        cart_summary(first)
+
+        self.product.price = Decimal("10.00")
+        self.product.save()
+
+        second = self.factory.get("/")
+        second.user = self.user
+        self.assertEqual(cart_summary(second)["cart_total"], Decimal("20.00"))
+
+    @override_settings(CART_SUMMARY_CACHE_TIMEOUT=0)
+    def test_summary_cache_can_be_disabled(self):
+        request = self.factory.get("/")
+        request.user = self.user
+        cart_summary(request)
+
+        request = self.factory.get("/")
+        request.user = self.user
+        with self.assertNumQueries(1):
+            cart_summary(request)
+
+    def test_summary_is_not_cached_in_a_per_process_cache(self):
+        request = self.factory.get("/")
+        request.user = self.user
+        cart_summary(request)
+
+        request = self.factory.get("/")
+        request.user = self.user
+        with self.assertNumQueries(1):
+            cart_summary(request)
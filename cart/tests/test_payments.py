@@ -0,0 +1,208 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from cart.models import CartItem
+from cart.payments import get_payment_intent, idempotency_key
+from cart.tests.stripe_stub import StripeStub
+from orders.models import Order
+from products.models import Product
+
+
+@override_settings(
+    STRIPE_SECRET_KEY="sk_test_dummy",
+    STRIPE_PUBLIC_KEY="pk_test_dummy",
+    STRIPE_CURRENCY="sek",
+)
+class PaymentIntentReuseTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="joe",
+            email="joe@example.com",
+            password="testpass123",
+        )
+        self.product = Product.objects.create(
+            name="Sunset Print",
+            price=Decimal("99.99"),
+        )
+        self.item = CartItem.objects.create(
+            user=self.user,
+            product=self.product,
+            quantity=1,
+        )
+        self.client.force_login(self.user)
+
+        session = self.client.session
+        session["checkout_shipping"] = {
+            "full_name": "Joe Example",
+            "email": "joe@example.com",
+            "phone": "",
+            "address1": "Test Street 1",
+            "address2": "",
+            "city": "Stockholm",
+            "postcode": "11122",
+            "country": "SE",
+        }
+        session.save()
+
+    def load_payment_page(self):
+        response = self.client.get(reverse("cart:payment"))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_first_load_creates_one_intent(self):
+        with StripeStub() as stub:
+            response = self.load_payment_page()
+
+        self.assertEqual(stub.count("POST", "create"), 1)
+        self.assertEqual(stub.count("GET"), 0)
+
+        order = Order.objects.get(user=self.user)
+        self.assertEqual(
+            stub.calls[0][2],
+            idempotency_key(order, 9999, "sek"),
+        )
+        self.assertEqual(
+            response.context["client_secret"],
+            f"{order.stripe_payment_intent_id}_secret",
+        )
+
+    def test_reload_retrieves_the_same_intent(self):
+        with StripeStub() as stub:
+            first = self.load_payment_page()
+            second = self.load_payment_page()
+            third = self.load_payment_page()
+
+        self.assertEqual(stub.count("POST", "create"), 1)
+        self.assertEqual(stub.count("POST", "update"), 0)
+        self.assertEqual(stub.count("GET", "retrieve"), 2)
+        self.assertEqual(len(stub.intents), 1)
+        self.assertEqual(
+            first.context["client_secret"],
+            third.context["client_secret"],
+        )
+        self.assertEqual(
+            second.context["client_secret"],
+            third.context["client_secret"],
+        )
+
+    def test_changed_cart_updates_intent_and_order(self):
+        with StripeStub() as stub:
+            self.load_payment_page()
+            self.item.quantity = 3
+            self.item.save()
+            self.load_payment_page()
+
+        self.assertEqual(stub.count("POST", "create"), 1)
+        self.assertEqual(stub.count("POST", "update"), 1)
+
+        order = Order.objects.get(user=self.user)
+        intent = stub.intents[order.stripe_payment_intent_id]
+        self.assertEqual(intent["amount"], 29997)
+        self.assertEqual(order.stripe_amount, 29997)
+        self.assertEqual(order.total, Decimal("299.97"))
+        self.assertEqual(
+            list(order.lineitems.values_list("quantity", flat=True)),
+            [3],
+        )
+
+    def test_unusable_intent_is_replaced(self):
+        with StripeStub() as stub:
+            self.load_payment_page()
+            order = Order.objects.get(user=self.user)
+            old_id = order.stripe_payment_intent_id
+            stub.set_status(old_id, "canceled")
+
+            self.load_payment_page()
+
+        order.refresh_from_db()
+        self.assertNotEqual(order.stripe_payment_intent_id, old_id)
+        self.assertEqual(stub.count("POST", "create"), 2)
+        self.assertEqual(
+            stub.calls[-1][2],
+            idempotency_key(order, 9999, "sek", replaces=old_id),
+        )
+
+    def test_succeeded_intent_goes_to_the_confirmation(self):
+        with StripeStub() as stub:
+            self.load_payment_page()
+            order = Order.objects.get(user=self.user)
+            intent_id = order.stripe_payment_intent_id
+            stub.set_status(intent_id, "succeeded")
+
+            response = self.client.get(reverse("cart:payment"))
+            self.assertRedirects(
+                response,
+                f"{reverse('cart:success')}?payment_intent={intent_id}",
+                fetch_redirect_response=False,
+            )
+            self.client.get(response.url)
+
+        order.refresh_from_db()
+        self.assertEqual(order.stripe_payment_intent_id, intent_id)
+        self.assertTrue(order.is_paid)
+        self.assertEqual(stub.count("POST", "create"), 1)
+
+    def test_processing_intent_is_not_replaced(self):
+        with StripeStub() as stub:
+            self.load_payment_page()
+            order = Order.objects.get(user=self.user)
+            intent_id = order.stripe_payment_intent_id
+            stub.set_status(intent_id, "processing")
+
+            response = self.client.get(reverse("cart:payment"))
+
+        self.assertRedirects(
+            response,
+            reverse("orders:list"),
+            fetch_redirect_response=False,
+        )
+        order.refresh_from_db()
+        self.assertEqual(order.stripe_payment_intent_id, intent_id)
+        self.assertFalse(order.is_paid)
+        self.assertEqual(stub.count("POST"), 1)
+
+    def test_changed_cart_with_the_same_total_refreshes_lines(self):
+        other = Product.objects.create(
+            name="Harbour Print",
+            price=Decimal("99.99"),
+        )
+        with StripeStub() as stub:
+            self.load_payment_page()
+            self.item.delete()
+            CartItem.objects.create(user=self.user, product=other)
+            self.load_payment_page()
+
+        self.assertEqual(stub.count("POST", "update"), 0)
+        order = Order.objects.get(user=self.user)
+        self.assertEqual(
+            list(order.lineitems.values_list("product_name", flat=True)),
+            ["Harbour Print"],
+        )
+
+    def test_repeated_create_replays_the_same_intent(self):
+        order = Order.objects.create(
+            user=self.user,
+            full_name="Joe Example",
+            email="joe@example.com",
+            address1="Test Street 1",
+            city="Stockholm",
+            country="SE",
+        )
+
+        with StripeStub() as stub:
+            first = get_payment_intent(order, 9999, "sek", metadata={})
+            second = get_payment_intent(order, 9999, "sek", metadata={})
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(len(stub.intents), 1)
+
+    def test_reload_costs_a_single_round_trip(self):
+        with StripeStub(latency=0.05) as stub:
+            self.load_payment_page()
+            stub.calls.clear()
+            self.load_payment_page()
+
+        self.assertEqual(len(stub.calls), 1)
@@ -1,10 +1,25 @@
+import random
+import threading
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth.models import AnonymousUser, User
-from django.test import TestCase, override_settings
+from django.db import IntegrityError, connection
+from django.test import (
+    Client,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
 
 from cart.models import CartItem
-from cart.utils import calculate_cart_totals, get_cart_items_for_user
+from cart.utils import (
+    add_cart_item,
+    calculate_cart_totals,
+    get_cart_items_for_user,
+    get_cart_totals,
+)
 from products.models import Product
 
 
@@ -25,6 +40,11 @@ class CartUtilsTests(TestCase):
             description="Beautiful sunset artwork.",
             price=Decimal("49.99"),
         )
+        self.second_product = Product.objects.create(
+            name="Ocean Print",
+            description="Ocean wall art.",
+            price=Decimal("49.99"),
+        )
 
     def test_get_cart_items_for_anonymous_user_returns_none_queryset(self):
         user = AnonymousUser()
@@ -61,7 +81,7 @@ class CartUtilsTests(TestCase):
         )
         item_two = CartItem.objects.create(
             user=self.user,
-            product=self.product,
+            product=self.second_product,
             quantity=1,
         )
 
@@ -80,7 +100,7 @@ class CartUtilsTests(TestCase):
         )
         item_two = CartItem.objects.create(
             user=self.user,
-            product=self.product,
+            product=self.second_product,
             quantity=1,
         )
 
@@ -89,3 +109,168 @@ class CartUtilsTests(TestCase):
         self.assertEqual(totals["subtotal"], Decimal("119.98"))
         self.assertEqual(totals["tax"], Decimal("29.99"))
         self.assertEqual(totals["total"], Decimal("149.97"))
+
+
+class CartTotalsInDatabaseTests(TestCase):
+    """
+    Property checks: for random carts, the SQL line totals and the
+    aggregate totals match the per-row Python computation exactly.
+    """
+
+    seed = 20261018
+    carts = 40
+    vat_rates = ["0.00", "0.06", "0.12", "0.25"]
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="joe",
+            password="testpass123",
+        )
+        self.rng = random.Random(self.seed)
+        self.products = [
+            Product.objects.create(name=f"Print {i}", price=Decimal("1.00"))
+            for i in range(12)
+        ]
+
+    def random_cart(self):
+        CartItem.objects.filter(user=self.user).delete()
+        chosen = self.rng.sample(
+            self.products,
+            self.rng.randint(0, len(self.products)),
+        )
+        for product in chosen:
+            price = Decimal(self.rng.randint(1, 999999)) / 100
+            Product.objects.filter(pk=product.pk).update(price=price)
+            CartItem.objects.create(
+                user=self.user,
+                product=product,
+                quantity=self.rng.randint(1, 50),
+            )
+
+    def python_totals(self):
+        # The per-row property path, as the cart computed it before.
+        items = CartItem.objects.filter(user=self.user).select_related(
+            "product"
+        )
+        return calculate_cart_totals(list(items))
+
+    def test_sql_line_totals_match_python(self):
+        for _ in range(self.carts):
+            self.random_cart()
+            for item in get_cart_items_for_user(self.user):
+                self.assertEqual(item.unit_price, item.product.price)
+                self.assertEqual(
+                    item.line_total,
+                    item.product.price * item.quantity,
+                )
+
+    def test_aggregate_totals_match_python(self):
+        for _ in range(self.carts):
+            self.random_cart()
+            vat_rate = Decimal(self.rng.choice(self.vat_rates))
+            with self.settings(VAT_RATE=vat_rate):
+                expected = self.python_totals()
+                self.assertEqual(get_cart_totals(self.user), expected)
+                self.assertEqual(
+                    calculate_cart_totals(get_cart_items_for_user(self.user)),
+                    expected,
+                )
+
+    def test_get_cart_totals_is_one_query(self):
+        self.random_cart()
+
+        with self.assertNumQueries(1):
+            get_cart_totals(self.user)
+
+    def test_get_cart_totals_for_empty_and_anonymous_carts(self):
+        zero = {
+            "subtotal": Decimal("0.00"),
+            "tax": Decimal("0.00"),
+            "total": Decimal("0.00"),
+        }
+
+        self.assertEqual(get_cart_totals(self.user), zero)
+        self.assertEqual(get_cart_totals(AnonymousUser()), zero)
+
+
+class AddCartItemTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="joe",
+            password="testpass123",
+        )
+        self.product = Product.objects.create(
+            name="Sunset Print",
+            description="Beautiful sunset artwork.",
+            price=Decimal("49.99"),
+        )
+
+    def test_add_cart_item_creates_row(self):
+        add_cart_item(self.user, self.product, 2)
+
+        item = CartItem.objects.get(user=self.user, product=self.product)
+        self.assertEqual(item.quantity, 2)
+
+    def test_add_cart_item_increments_in_one_statement(self):
+        add_cart_item(self.user, self.product, 2)
+
+        with self.assertNumQueries(1):
+            add_cart_item(self.user, self.product, 3)
+
+        item = CartItem.objects.get(user=self.user, product=self.product)
+        self.assertEqual(item.quantity, 5)
+
+    def test_fallback_increment_path(self):
+        with patch("fotolio.db.UPSERT_VENDORS", set()):
+            add_cart_item(self.user, self.product, 2)
+            add_cart_item(self.user, self.product, 3)
+
+        item = CartItem.objects.get(user=self.user, product=self.product)
+        self.assertEqual(item.quantity, 5)
+
+    def test_duplicate_cart_rows_are_rejected(self):
+        CartItem.objects.create(user=self.user, product=self.product)
+
+        with self.assertRaises(IntegrityError):
+            CartItem.objects.create(user=self.user, product=self.product)
+
+
+class AddToCartConcurrencyTests(TransactionTestCase):
+    threads = 8
+    adds_per_thread = 10
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Threads need a file-backed test database.")
+        self.user = User.objects.create_user(
+            username="joe",
+            password="testpass123",
+        )
+        self.product = Product.objects.create(
+            name="Sunset Print",
+            description="Beautiful sunset artwork.",
+            price=Decimal("49.99"),
+        )
+
+    def hammer(self):
+        client = Client()
+        client.force_login(self.user)
+        url = reverse("cart:add", args=[self.product.pk])
+        try:
+            for _ in range(self.adds_per_thread):
+                client.post(url, {"quantity": 1})
+        finally:
+            connection.close()
+
+    def test_concurrent_adds_do_not_lose_updates(self):
+        workers = [
+            threading.Thread(target=self.hammer)
+            for _ in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        item = CartItem.objects.get(user=self.user, product=self.product)
+        self.assertEqual(item.quantity, self.threads * self.adds_per_thread)
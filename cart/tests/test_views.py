@@ -8,6 +8,7 @@ from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from cart.models import CartItem
+from cart.tests.stripe_stub import StripeStub
 from orders.models import Order
 from products.models import Category, Product
 from profiles.models import Profile
@@ -368,6 +369,7 @@ class CartViewsTests(TestCase):
         mock_create.return_value = SimpleNamespace(
             id="pi_test_123",
             client_secret="pi_test_123_secret_abc",
+            status="requires_payment_method",
         )
 
         self.create_cart_item(quantity=2)
@@ -395,28 +397,20 @@ class CartViewsTests(TestCase):
 
         mock_create.assert_called_once()
 
-    @patch("cart.views.stripe.PaymentIntent.create")
-    def test_payment_reuses_existing_pending_order(
-        self,
-        mock_create,
-    ):
-        mock_create.return_value = SimpleNamespace(
-            id="pi_test_456",
-            client_secret="pi_test_456_secret_abc",
-        )
-
+    def test_payment_reuses_existing_pending_order(self):
         self.create_cart_item(quantity=1)
         self.login()
         self.set_checkout_shipping_session()
 
-        first_response = self.client.get(reverse("cart:payment"))
-        self.assertEqual(first_response.status_code, 200)
+        with StripeStub():
+            first_response = self.client.get(reverse("cart:payment"))
+            self.assertEqual(first_response.status_code, 200)
 
-        first_order = Order.objects.get(user=self.user, is_paid=False)
-        order_count_before = Order.objects.count()
+            first_order = Order.objects.get(user=self.user, is_paid=False)
+            order_count_before = Order.objects.count()
 
-        second_response = self.client.get(reverse("cart:payment"))
-        self.assertEqual(second_response.status_code, 200)
+            second_response = self.client.get(reverse("cart:payment"))
+            self.assertEqual(second_response.status_code, 200)
 
         self.assertEqual(Order.objects.count(), order_count_before)
         same_order = Order.objects.get(user=self.user, is_paid=False)
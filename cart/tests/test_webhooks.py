@@ -0,0 +1,196 @@
+import hashlib
+import hmac
+import json
+import time
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from cart.models import CartItem
+from orders.models import Order
+from products.models import Product
+
+WEBHOOK_SECRET = "whsec_test_secret"
+
+
+def signed_event(event, secret=WEBHOOK_SECRET, timestamp=None):
+    """
+    Return (payload, Stripe-Signature header) for a locally signed event.
+    """
+    payload = json.dumps(event)
+    timestamp = timestamp or int(time.time())
+    signature = hmac.new(
+        secret.encode(),
+        f"{timestamp}.{payload}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+    return payload, f"t={timestamp},v1={signature}"
+
+
+@override_settings(
+    STRIPE_SECRET_KEY="sk_test_dummy",
+    STRIPE_PUBLIC_KEY="pk_test_dummy",
+    STRIPE_CURRENCY="sek",
+    STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET,
+)
+class StripeWebhookTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="joe",
+            password="testpass123",
+        )
+        self.product = Product.objects.create(
+            name="Sunset Print",
+            price=Decimal("99.99"),
+        )
+        CartItem.objects.create(user=self.user, product=self.product)
+        self.order = Order.objects.create(
+            user=self.user,
+            full_name="Joe Example",
+            email="joe@example.com",
+            address1="Test Street 1",
+            city="Stockholm",
+            country="SE",
+            total=Decimal("99.99"),
+            stripe_payment_intent_id="pi_hook_123",
+            stripe_currency="sek",
+            stripe_amount=9999,
+        )
+
+    def intent_event(self, event_type="payment_intent.succeeded", **intent):
+        data = {
+            "id": "pi_hook_123",
+            "object": "payment_intent",
+            "amount": 9999,
+            "amount_received": 9999,
+            "currency": "sek",
+            "status": "succeeded",
+        }
+        data.update(intent)
+        return {
+            "id": "evt_test_1",
+            "object": "event",
+            "type": event_type,
+            "data": {"object": data},
+        }
+
+    def deliver(self, event, **kwargs):
+        payload, signature = signed_event(event, **kwargs)
+        return self.client.post(
+            reverse("cart:stripe_webhook"),
+            data=payload,
+            content_type="application/json",
+            HTTP_STRIPE_SIGNATURE=signature,
+        )
+
+    def test_succeeded_event_marks_order_paid_and_clears_cart(self):
+        response = self.deliver(self.intent_event())
+
+        self.assertEqual(response.status_code, 200)
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.is_paid)
+        self.assertFalse(CartItem.objects.filter(user=self.user).exists())
+
+    def test_order_is_found_by_order_number_metadata(self):
+        # A reload moved the order to a newer intent before the earlier
+        # one was paid.
+        self.order.stripe_payment_intent_id = "pi_hook_456"
+        self.order.save(update_fields=["stripe_payment_intent_id"])
+
+        response = self.deliver(
+            self.intent_event(
+                metadata={"order_number": self.order.order_number}
+            )
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.is_paid)
+
+    def test_payment_without_an_order_is_logged(self):
+        with self.assertLogs("cart.payments", "ERROR") as logs:
+            response = self.deliver(self.intent_event(id="pi_unknown"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("pi_unknown", logs.output[0])
+
+    def test_replayed_event_is_a_no_op(self):
+        self.deliver(self.intent_event())
+        # A new cart started after payment must survive a redelivery.
+        CartItem.objects.create(user=self.user, product=self.product)
+
+        response = self.deliver(self.intent_event())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(CartItem.objects.filter(user=self.user).exists())
+
+    def test_bad_signature_is_rejected(self):
+        response = self.deliver(self.intent_event(), secret="whsec_wrong")
+
+        self.assertEqual(response.status_code, 400)
+        self.order.refresh_from_db()
+        self.assertFalse(self.order.is_paid)
+
+    def test_stale_signature_is_rejected(self):
+        response = self.deliver(
+            self.intent_event(),
+            timestamp=int(time.time()) - 3600,
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(STRIPE_WEBHOOK_SECRET="")
+    def test_missing_secret_is_rejected(self):
+        response = self.deliver(self.intent_event())
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_amount_mismatch_does_not_mark_paid(self):
+        response = self.deliver(
+            self.intent_event(amount=100, amount_received=100)
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.order.refresh_from_db()
+        self.assertFalse(self.order.is_paid)
+
+    def test_other_events_are_acknowledged(self):
+        response = self.deliver(
+            self.intent_event(event_type="payment_intent.payment_failed")
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.order.refresh_from_db()
+        self.assertFalse(self.order.is_paid)
+
+    @patch("cart.views.stripe.PaymentIntent.retrieve")
+    def test_success_page_after_webhook_skips_stripe(self, mock_retrieve):
+        self.deliver(self.intent_event())
+        self.client.force_login(self.user)
+        session = self.client.session
+        session["pending_order_id"] = self.order.id
+        session["expected_payment_intent_id"] = "pi_hook_123"
+        session.save()
+
+        response = self.client.get(
+            reverse("cart:success") + "?payment_intent=pi_hook_123",
+        )
+
+        mock_retrieve.assert_not_called()
+        self.assertEqual(
+            response.url,
+            reverse(
+                "orders:detail",
+                kwargs={"order_number": self.order.order_number},
+            ) + "?paid=1",
+        )
+        messages = list(get_messages(response.wsgi_request))
+        self.assertEqual(
+            [str(m) for m in messages],
+            ["Your order has been placed successfully."],
+        )
+        self.assertNotIn("pending_order_id", self.client.session)
@@ -1,21 +1,94 @@
 from decimal import Decimal, ROUND_HALF_UP
 
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from fotolio.db import can_upsert, upsert
 
 from .models import CartItem
+from .summary import invalidate_cart_summary
 
 
 def get_cart_items_for_user(user):
     if not user.is_authenticated:
         return CartItem.objects.none()
-    return CartItem.objects.filter(user=user).select_related("product")
+    return (
+        CartItem.objects
+        .filter(user=user)
+        .select_related("product")
+        .with_line_totals()
+    )
+
+
+def add_cart_item(user, product, quantity):
+    """
+    Add ``quantity`` of ``product`` to the user's cart atomically.
+
+    On SQLite and PostgreSQL this is a single INSERT ... ON CONFLICT DO
+    UPDATE, so concurrent adds of the same product never lose an
+    increment. Other backends fall back to an F() increment with a
+    guarded insert.
+    """
+    if can_upsert():
+        upsert(
+            CartItem,
+            ["user_id", "product_id", "quantity"],
+            [(user.pk, product.pk, quantity)],
+            conflict=["user_id", "product_id"],
+            updates={"quantity": "{old} + {new}"},
+        )
+    else:
+        _increment_cart_item(user, product, quantity)
+    invalidate_cart_summary(user.pk)
+
+
+def _increment_cart_item(user, product, quantity):
+    items = CartItem.objects.filter(user=user, product=product)
+    if items.update(quantity=F("quantity") + quantity):
+        return
+    try:
+        with transaction.atomic():
+            CartItem.objects.create(
+                user=user,
+                product=product,
+                quantity=quantity,
+            )
+    except IntegrityError:
+        # Another request created the row first.
+        items.update(quantity=F("quantity") + quantity)
 
 
 def calculate_cart_totals(items):
+    """
+    Return subtotal, tax and total for cart rows that are already
+    loaded. Rows from get_cart_items_for_user() carry line totals
+    computed in SQL, so this only adds them up.
+    """
     gross_total = sum(
         (item.line_total for item in items),
         Decimal("0.00"),
-    ).quantize(
+    )
+    return split_vat(gross_total)
+
+
+def get_cart_totals(user):
+    """
+    Return subtotal, tax and total for a user's cart from a single
+    aggregate query, without loading the cart rows.
+    """
+    if not user.is_authenticated:
+        return split_vat(Decimal("0.00"))
+    totals = CartItem.objects.filter(user=user).totals()
+    return split_vat(totals["gross_total"] or Decimal("0.00"))
+
+
+def split_vat(gross_total):
+    """
+    Round the VAT-inclusive ``gross_total`` and split it into net
+    subtotal and tax using VAT_RATE.
+    """
+    gross_total = Decimal(gross_total).quantize(
         Decimal("0.01"),
         rounding=ROUND_HALF_UP,
     )
@@ -1,11 +1,16 @@
+from collections import Counter
 from decimal import Decimal, ROUND_HALF_UP
+from urllib.parse import urlencode
 
 import stripe
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django_countries import countries
 
@@ -15,7 +20,18 @@ from products.models import Product
 from profiles.models import Profile
 
 from .models import CartItem
-from .utils import calculate_cart_totals, get_cart_items_for_user
+from .payments import (
+    SETTLED_STATUSES,
+    confirm_payment_intent,
+    get_payment_intent,
+    mark_order_paid,
+)
+from .summary import remember_cart_summary
+from .utils import (
+    add_cart_item,
+    calculate_cart_totals,
+    get_cart_items_for_user,
+)
 
 
 @login_required
@@ -24,12 +40,7 @@ def add_to_cart(request, product_id):
     product = get_object_or_404(Product, pk=product_id)
     qty = int(request.POST.get("quantity", 1))
 
-    item, created = CartItem.objects.get_or_create(
-        user=request.user,
-        product=product,
-    )
-    item.quantity = item.quantity + qty if not created else qty
-    item.save()
+    add_cart_item(request.user, product, qty)
 
     messages.success(
         request,
@@ -42,6 +53,7 @@ def add_to_cart(request, product_id):
 def detail(request):
     items = get_cart_items_for_user(request.user)
     totals = calculate_cart_totals(items)
+    remember_cart_summary(request, items)
 
     context = {
         "items": items,
@@ -61,6 +73,8 @@ def checkout(request):
         messages.info(request, "Your cart is empty.")
         return redirect("cart:detail")
 
+    remember_cart_summary(request, items)
+
     profile, _ = Profile.objects.get_or_create(user=request.user)
 
     session_shipping = request.session.get("checkout_shipping") or {}
@@ -182,6 +196,8 @@ def payment(request):
         messages.info(request, "Your cart is empty.")
         return redirect("cart:detail")
 
+    remember_cart_summary(request, items)
+
     shipping = request.session.get("checkout_shipping")
     if not shipping:
         messages.error(request, "Please complete checkout before payment.")
@@ -243,28 +259,19 @@ def payment(request):
             stripe_currency=str(settings.STRIPE_CURRENCY).lower(),
             stripe_amount=amount_ore,
         )
-
-        OrderLineItem.objects.bulk_create(
-            [
-                OrderLineItem(
-                    order=order,
-                    product=item.product,
-                    product_name=item.product.name,
-                    quantity=item.quantity,
-                    line_total=item.line_total,
-                )
-                for item in items
-            ]
-        )
+        _create_line_items(order, items)
 
         request.session["pending_order_id"] = order.id
         request.session.modified = True
+        created = True
+    else:
+        created = False
 
     try:
-        intent = stripe.PaymentIntent.create(
-            amount=amount_ore,
-            currency=settings.STRIPE_CURRENCY,
-            automatic_payment_methods={"enabled": True},
+        intent = get_payment_intent(
+            order,
+            amount_ore,
+            settings.STRIPE_CURRENCY,
             metadata={
                 "user_id": str(request.user.id),
                 "email": shipping.get("email", ""),
@@ -278,17 +285,38 @@ def payment(request):
         )
         return redirect("cart:checkout")
 
-    order.stripe_payment_intent_id = intent.id
-    order.stripe_currency = str(settings.STRIPE_CURRENCY).lower()
-    order.stripe_amount = amount_ore
-    order.save(
-        update_fields=[
-            "stripe_payment_intent_id",
-            "stripe_currency",
-            "stripe_amount",
-            "updated_at",
-        ]
-    )
+    if intent.status in SETTLED_STATUSES:
+        return _payment_settled(request, intent)
+
+    if not created and not _lines_match(order, items):
+        # The cart changed since the order was opened.
+        order.subtotal = totals["subtotal"]
+        order.tax = totals["tax"]
+        order.total = totals["total"]
+        with transaction.atomic():
+            order.save(
+                update_fields=["subtotal", "tax", "total", "updated_at"]
+            )
+            order.lineitems.all().delete()
+            _create_line_items(order, items)
+
+    currency = str(settings.STRIPE_CURRENCY).lower()
+    if (
+        order.stripe_payment_intent_id != intent.id
+        or order.stripe_currency != currency
+        or order.stripe_amount != amount_ore
+    ):
+        order.stripe_payment_intent_id = intent.id
+        order.stripe_currency = currency
+        order.stripe_amount = amount_ore
+        order.save(
+            update_fields=[
+                "stripe_payment_intent_id",
+                "stripe_currency",
+                "stripe_amount",
+                "updated_at",
+            ]
+        )
 
     request.session["expected_payment_intent_id"] = intent.id
     request.session["expected_payment_amount"] = amount_ore
@@ -314,6 +342,49 @@ def payment(request):
     return render(request, "cart/payment.html", context)
 
 
+def _payment_settled(request, intent):
+    """
+    Send the buyer on from a payment page whose intent was already paid,
+    for example after a reload while the payment went through.
+    """
+    if intent.status == "succeeded":
+        query = urlencode({"payment_intent": intent.id})
+        return redirect(f"{reverse('cart:success')}?{query}")
+    messages.info(
+        request,
+        "Your payment is being processed. "
+        "Your order will be confirmed as soon as it completes.",
+    )
+    return redirect("orders:list")
+
+
+def _lines_match(order, items):
+    """
+    Return whether the order's line items still match the cart rows.
+    """
+    lines = order.lineitems.values_list(
+        "product_id", "quantity", "line_total"
+    )
+    return Counter(lines) == Counter(
+        (item.product_id, item.quantity, item.line_total) for item in items
+    )
+
+
+def _create_line_items(order, items):
+    OrderLineItem.objects.bulk_create(
+        [
+            OrderLineItem(
+                order=order,
+                product=item.product,
+                product_name=item.product.name,
+                quantity=item.quantity,
+                line_total=item.line_total,
+            )
+            for item in items
+        ]
+    )
+
+
 @login_required
 def success(request):
     returned_intent_id = request.GET.get("payment_intent")
@@ -351,13 +422,13 @@ def success(request):
         ).order_by("-created_at").first()
 
     if order and order.is_paid:
-        request.session.pop("checkout_shipping", None)
-        request.session.pop("expected_payment_intent_id", None)
-        request.session.pop("expected_payment_amount", None)
-        request.session.pop("expected_payment_currency", None)
-        request.session.pop("pending_order_id", None)
-        request.session.modified = True
+        # Usually the webhook confirmed the payment before the browser
+        # came back, so this is the normal path and needs no Stripe call.
+        first_return = order.id == pending_order_id
+        _clear_checkout_session(request)
 
+        if first_return:
+            return _order_placed(request, order)
         messages.info(request, "This order was already confirmed.")
         return redirect("orders:detail", order_number=order.order_number)
 
@@ -423,14 +494,12 @@ def success(request):
         messages.warning(request, "Payment user mismatch.")
         return redirect("orders:list")
 
-    order.is_paid = True
-    order.stripe_payment_intent_id = returned_intent_id
-    order.stripe_currency = str(intent.currency).lower()
-    order.stripe_amount = int(received)
-    order.save()
+    mark_order_paid(order, returned_intent_id, intent.currency, received)
+    _clear_checkout_session(request)
+    return _order_placed(request, order)
 
-    CartItem.objects.filter(user=request.user).delete()
 
+def _clear_checkout_session(request):
     request.session.pop("checkout_shipping", None)
     request.session.pop("expected_payment_intent_id", None)
     request.session.pop("expected_payment_amount", None)
@@ -438,6 +507,8 @@ def success(request):
     request.session.pop("pending_order_id", None)
     request.session.modified = True
 
+
+def _order_placed(request, order):
     messages.success(request, "Your order has been placed successfully.")
 
     order_detail_url = reverse(
@@ -447,6 +518,34 @@ def success(request):
     return redirect(f"{order_detail_url}?paid=1")
 
 
+@csrf_exempt
+@require_POST
+def stripe_webhook(request):
+    """
+    Receive Stripe events and confirm orders whose payment succeeded.
+
+    Deliveries are verified against STRIPE_WEBHOOK_SECRET and may be
+    repeated; confirming an already paid order is a no-op.
+    """
+    secret = getattr(settings, "STRIPE_WEBHOOK_SECRET", "")
+    if not secret:
+        return HttpResponseBadRequest("Webhook secret is not configured.")
+
+    try:
+        event = stripe.Webhook.construct_event(
+            request.body,
+            request.headers.get("Stripe-Signature", ""),
+            secret,
+        )
+    except (ValueError, stripe.SignatureVerificationError):
+        return HttpResponseBadRequest("Invalid webhook payload.")
+
+    if event["type"] == "payment_intent.succeeded":
+        confirm_payment_intent(event["data"]["object"])
+
+    return HttpResponse(status=200)
+
+
 @login_required
 @require_POST
 def update_item(request, item_id):
@@ -0,0 +1,11 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def has_shared_cache(alias="default"):
+    """
+    Return whether cache ``alias`` is shared between processes, so an
+    entry written or deleted by one worker is seen by all of them.
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
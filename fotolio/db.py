@@ -0,0 +1,50 @@
+from django.db import connection
+
+# Backends that run INSERT ... ON CONFLICT DO UPDATE.
+UPSERT_VENDORS = {"sqlite", "postgresql"}
+
+
+def can_upsert(returning=False):
+    """
+    Return whether the database runs upsert(), with ``returning`` when
+    that is asked for too.
+    """
+    if connection.vendor not in UPSERT_VENDORS:
+        return False
+    return not returning or connection.features.can_return_columns_from_insert
+
+
+def upsert(model, columns, rows, conflict, updates, returning=None):
+    """
+    Insert ``rows`` of ``columns`` into ``model``'s table with a single
+    INSERT ... ON CONFLICT DO UPDATE, so concurrent writers never lose
+    an update.
+
+    A row clashing on the ``conflict`` columns updates the stored row
+    instead: ``updates`` maps each column to change to an SQL template,
+    in which ``{old}`` is the stored value and ``{new}`` the one being
+    inserted. With ``returning``, ``rows`` holds a single row and the
+    stored value of that column is returned.
+    """
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    assignments = ", ".join(
+        f"{qn(column)} = "
+        + template.format(
+            old=f"{table}.{qn(column)}",
+            new=f"EXCLUDED.{qn(column)}",
+        )
+        for column, template in updates.items()
+    )
+    sql = (
+        f"INSERT INTO {table} ({', '.join(map(qn, columns))}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON CONFLICT ({', '.join(map(qn, conflict))}) "
+        f"DO UPDATE SET {assignments}"
+    )
+    with connection.cursor() as cursor:
+        if returning:
+            (row,) = rows
+            cursor.execute(f"{sql} RETURNING {qn(returning)}", row)
+            return cursor.fetchone()[0]
+        cursor.executemany(sql, rows)
@@ -0,0 +1,459 @@
+import base64
+import hashlib
+import io
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageFile, ImageOps
+
+# Widths offered in srcset. Renditions wider than the original are
+# left out, so nothing is ever upscaled.
+RENDITION_WIDTHS = (320, 480, 640, 960, 1280, 1600)
+
+# Formats in order of preference; the last one is the <img> fallback.
+RENDITION_FORMATS = ("webp", "jpeg")
+RENDITION_QUALITY = 80
+
+RENDITION_CACHE_KEY = "images:renditions"
+# Entries never go stale, but those of replaced or deleted files are
+# never read again and must not pile up in a shared cache.
+RENDITION_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+LOCAL_RENDITION_DIR = "renditions"
+
+CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+# Longest edge of the blurred placeholder inlined as a data URI, and of
+# the thumbnail the dominant colour is picked from.
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+COLOR_SAMPLE_SIZE = 64
+
+IMAGE_INFO_WORKERS = 8
+IMAGE_INFO_BATCH_SIZE = 100
+# Stop reading a remote original once this much is read without
+# finding its dimensions.
+HEADER_READ_LIMIT = 1024 * 1024
+
+EMPTY_IMAGE_INFO = {
+    "width": None,
+    "height": None,
+    "color": "",
+    "placeholder": "",
+}
+
+# EXIF orientations that turn the image by 90 degrees.
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+# Uploads are re-encoded to WebP by prepare_upload().
+UPLOAD_QUALITY = 85
+UPLOAD_FORMATS = ("JPEG", "PNG", "WEBP")
+
+
+class InvalidImage(ValueError):
+    """
+    Raised by prepare_upload() for files it will not store; the message
+    is meant for the person who uploaded the file.
+    """
+
+
+class Renditions:
+    """
+    The width-bounded variants of one image, as (width, url) pairs per
+    format, with the original's dimensions when they are known.
+    """
+
+    def __init__(self, sources, width=None, height=None):
+        self.sources = sources
+        self.width = width
+        self.height = height
+
+    def srcset(self, fmt):
+        return ", ".join(f"{url} {w}w" for w, url in self.sources[fmt])
+
+    def src(self, fmt=RENDITION_FORMATS[-1]):
+        """
+        Return the URL of the widest rendition of ``fmt``.
+        """
+        return self.sources[fmt][-1][1]
+
+
+def get_widths():
+    return tuple(getattr(settings, "IMAGE_RENDITION_WIDTHS", RENDITION_WIDTHS))
+
+
+def is_cloudinary(storage):
+    # Compared by module so cloudinary_storage, which needs credentials
+    # at import time, is never imported here.
+    return any(
+        cls.__module__.startswith("cloudinary_storage")
+        for cls in type(storage).__mro__
+    )
+
+
+def get_renditions(image):
+    """
+    Return the Renditions of an ImageField file, or None without one.
+
+    On Cloudinary the variants are transformation URLs; on any other
+    storage they are generated once with Pillow and saved next to the
+    original. Either way the result is cached under the file name,
+    which changes whenever a new file is uploaded.
+    """
+    if not image:
+        return None
+
+    storage = image.storage
+    backend = "cloudinary" if is_cloudinary(storage) else "local"
+    digest = hashlib.md5(
+        f"{backend}:{image.name}:{get_widths()}".encode()
+    ).hexdigest()
+    key = f"{RENDITION_CACHE_KEY}:{digest}"
+
+    renditions = cache.get(key)
+    if renditions is None:
+        if backend == "cloudinary":
+            renditions = cloudinary_renditions(storage, image.name)
+        else:
+            renditions = local_renditions(storage, image.name)
+        cache.set(key, renditions, RENDITION_CACHE_TIMEOUT)
+    return renditions
+
+
+def cloudinary_renditions(storage, name):
+    """
+    Build Cloudinary transformation URLs, capped at each width.
+
+    crop="limit" never enlarges, so widths beyond the original simply
+    serve the original size. A storage with transformed_url() builds,
+    and caches, the URLs itself.
+    """
+    if hasattr(storage, "transformed_url"):
+        build_url = storage.transformed_url
+    else:
+        import cloudinary
+
+        resource = cloudinary.CloudinaryImage(storage._prepend_prefix(name))
+        build_url = partial(_resource_url, resource)
+    sources = {
+        fmt: [
+            (
+                width,
+                build_url(
+                    name,
+                    width=width,
+                    crop="limit",
+                    format=EXTENSIONS[fmt],
+                    quality="auto",
+                    secure=True,
+                ),
+            )
+            for width in get_widths()
+        ]
+        for fmt in RENDITION_FORMATS
+    }
+    return Renditions(sources)
+
+
+def _resource_url(resource, name, **options):
+    return resource.build_url(**options)
+
+
+def local_renditions(storage, name):
+    """
+    Resize ``name`` with Pillow and save one file per width and format
+    under LOCAL_RENDITION_DIR, reusing files from earlier runs.
+    """
+    stem = posixpath.splitext(name)[0]
+    with storage.open(name) as original:
+        with Image.open(original) as image:
+            image = ImageOps.exif_transpose(image)
+            width, height = image.size
+            widths = [w for w in get_widths() if w < width] + [
+                min(width, max(get_widths()))
+            ]
+
+            sources = {fmt: [] for fmt in RENDITION_FORMATS}
+            # Largest first, so each resize starts from a smaller image.
+            for w in sorted(set(widths), reverse=True):
+                if w < image.width:
+                    image = image.resize(
+                        (w, max(1, round(height * w / width))),
+                        Image.LANCZOS,
+                    )
+                for fmt in RENDITION_FORMATS:
+                    path = (
+                        f"{LOCAL_RENDITION_DIR}/{stem}-{w}w.{EXTENSIONS[fmt]}"
+                    )
+                    if not storage.exists(path):
+                        path = storage.save(path, _encode(image, fmt))
+                    sources[fmt].insert(0, (w, storage.url(path)))
+
+    return Renditions(sources, width, height)
+
+
+def _encode(image, fmt):
+    if fmt == "jpeg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    buffer = io.BytesIO()
+    image.save(buffer, fmt.upper(), quality=RENDITION_QUALITY, optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+def image_info(source):
+    """
+    Return the displayed width and height, dominant colour and a
+    base64 placeholder of the image in the binary file ``source``.
+
+    JPEGs are decoded at reduced scale with draft(), so even a large
+    photo costs a fraction of a full decode.
+    """
+    with Image.open(source) as image:
+        width, height = _oriented_size(image)
+        image.draft("RGB", (COLOR_SAMPLE_SIZE, COLOR_SAMPLE_SIZE))
+        sample = ImageOps.exif_transpose(image).convert("RGB")
+    sample.thumbnail((COLOR_SAMPLE_SIZE, COLOR_SAMPLE_SIZE))
+    return {
+        "width": width,
+        "height": height,
+        "color": dominant_color(sample),
+        "placeholder": placeholder(sample),
+    }
+
+
+def _oriented_size(image):
+    width, height = image.size
+    if image.getexif().get(0x0112) in TRANSPOSED_ORIENTATIONS:
+        return height, width
+    return width, height
+
+
+def dominant_color(image):
+    """
+    Return the most common of a few representative colours of ``image``
+    as "#rrggbb".
+    """
+    palette_image = image.quantize(colors=4)
+    palette = palette_image.getpalette()
+    _, index = max(palette_image.getcolors())
+    return "#{:02x}{:02x}{:02x}".format(*palette[index * 3:index * 3 + 3])
+
+
+def placeholder(image):
+    small = image.copy()
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = io.BytesIO()
+    small.save(buffer, "WEBP", quality=PLACEHOLDER_QUALITY)
+    data = base64.b64encode(buffer.getvalue()).decode()
+    return f"data:image/webp;base64,{data}"
+
+
+def image_info_fields(field_name, info):
+    """
+    Map an image_info() result, or None, onto the model fields named
+    after ``field_name``, e.g. image_width.
+    """
+    info = info or EMPTY_IMAGE_INFO
+    return {f"{field_name}_{key}": value for key, value in info.items()}
+
+
+def refresh_image_info(instance, field_name):
+    """
+    Fill in the image facts of ``instance`` before it is saved.
+
+    Only a newly uploaded file is read; it is still local at this
+    point, so nothing is fetched from storage.
+    """
+    file = getattr(instance, field_name)
+    if not file:
+        values = image_info_fields(field_name, None)
+    elif not file._committed:
+        try:
+            file.seek(0)
+            values = image_info_fields(field_name, image_info(file))
+        except (OSError, ValueError, Image.DecompressionBombError):
+            values = image_info_fields(field_name, None)
+        finally:
+            file.seek(0)
+    else:
+        return
+    for name, value in values.items():
+        setattr(instance, name, value)
+
+
+def sniff_format(file):
+    """
+    Return the Pillow format name of ``file`` from its leading bytes,
+    or None if it is not one of UPLOAD_FORMATS.
+    """
+    file.seek(0)
+    head = file.read(12)
+    file.seek(0)
+    if head.startswith(b"\xff\xd8\xff"):
+        return "JPEG"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "PNG"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+def prepare_upload(upload, max_edge, max_bytes, max_pixels):
+    """
+    Return an uploaded image as a WebP ContentFile at most ``max_edge``
+    pixels on its longest side, turned upright and without EXIF data.
+
+    The byte size, the type, read from the file's leading bytes, and
+    the pixel count from the header are checked before anything is
+    decoded, so a decode never needs more than ``max_pixels`` worth of
+    memory. JPEGs are decoded at reduced scale where possible. Raises
+    InvalidImage for files that fail a check.
+    """
+    if upload.size > max_bytes:
+        raise InvalidImage(
+            f"Images can be at most {filesizeformat(max_bytes)}."
+        )
+    fmt = sniff_format(upload)
+    if fmt is None:
+        raise InvalidImage("Upload a JPEG, PNG or WebP image.")
+
+    try:
+        with Image.open(upload, formats=[fmt]) as image:
+            if image.width * image.height > max_pixels:
+                raise InvalidImage(
+                    "Images can be at most "
+                    f"{max_pixels // 1_000_000} megapixels."
+                )
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            image = ImageOps.exif_transpose(image)
+            has_alpha = image.mode in ("RGBA", "LA") or (
+                image.mode == "P" and "transparency" in image.info
+            )
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+            buffer = io.BytesIO()
+            # No exif argument, so none of the metadata is written.
+            image.save(
+                buffer,
+                "WEBP",
+                quality=UPLOAD_QUALITY,
+                icc_profile=image.info.get("icc_profile"),
+            )
+    except (OSError, SyntaxError, Image.DecompressionBombError) as error:
+        raise InvalidImage(
+            "The file could not be read as an image."
+        ) from error
+    finally:
+        upload.seek(0)
+
+    stem = posixpath.splitext(posixpath.basename(upload.name))[0]
+    return ContentFile(buffer.getvalue(), name=f"{stem}.webp")
+
+
+def read_image_info(storage, name):
+    """
+    Return image_info() for a stored file.
+
+    On Cloudinary only the head of the original is downloaded, for its
+    dimensions, plus a thumbnail for the colour and placeholder.
+    """
+    if not is_cloudinary(storage):
+        with storage.open(name) as source:
+            return image_info(source)
+
+    import cloudinary
+    import requests
+
+    resource = cloudinary.CloudinaryImage(storage._prepend_prefix(name))
+    parser = ImageFile.Parser()
+    with requests.get(
+        resource.build_url(secure=True),
+        stream=True,
+        timeout=30,
+    ) as response:
+        response.raise_for_status()
+        read = 0
+        for chunk in response.iter_content(64 * 1024):
+            parser.feed(chunk)
+            read += len(chunk)
+            if parser.image or read >= HEADER_READ_LIMIT:
+                break
+    if parser.image is None:
+        raise OSError(f"Could not read the dimensions of {name}")
+
+    response = requests.get(
+        resource.build_url(
+            width=COLOR_SAMPLE_SIZE,
+            crop="limit",
+            format="png",
+            secure=True,
+        ),
+        timeout=30,
+    )
+    response.raise_for_status()
+    info = image_info(io.BytesIO(response.content))
+    info["width"], info["height"] = _oriented_size(parser.image)
+    return info
+
+
+def backfill_image_info(
+    queryset,
+    field_name,
+    workers=IMAGE_INFO_WORKERS,
+    batch_size=IMAGE_INFO_BATCH_SIZE,
+    progress=None,
+):
+    """
+    Compute the image facts of every row of ``queryset`` that has a
+    file but no stored width, reading ``workers`` files at a time.
+
+    Returns (rows updated, rows whose file could not be read); failed
+    rows are reported to ``progress`` as (name, error) and left as they
+    are.
+    """
+    storage = queryset.model._meta.get_field(field_name).storage
+    rows = (
+        queryset
+        .exclude(**{field_name: ""})
+        .exclude(**{f"{field_name}__isnull": True})
+        .filter(**{f"{field_name}_width__isnull": True})
+        .order_by("pk")
+    )
+
+    def read(name):
+        try:
+            return read_image_info(storage, name), None
+        except Exception as error:
+            return None, error
+
+    updated = failed = 0
+    last_pk = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = list(
+                rows.filter(pk__gt=last_pk)
+                .values_list("pk", field_name)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+
+            results = pool.map(read, [name for _, name in batch])
+            for (pk, name), (info, error) in zip(batch, results):
+                if error is not None:
+                    failed += 1
+                    if progress:
+                        progress(name, error)
+                    continue
+                queryset.model.objects.filter(pk=pk).update(
+                    **image_info_fields(field_name, info)
+                )
+                updated += 1
+    return updated, failed
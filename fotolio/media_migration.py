@@ -0,0 +1,423 @@
+import hashlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from .images import (
+    IMAGE_INFO_BATCH_SIZE,
+    IMAGE_INFO_WORKERS,
+    backfill_image_info,
+)
+
+MIGRATION_WORKERS = 8
+MIGRATION_BATCH_SIZE = 100
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class MigrationStats:
+    def __init__(self):
+        self.migrated = 0
+        self.deduplicated = 0
+        self.skipped = 0
+        self.missing = 0
+        self.errors = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    @property
+    def done(self):
+        return (
+            self.migrated + self.deduplicated + self.skipped
+            + self.missing + self.errors
+        )
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        return (
+            f"migrated={self.migrated} "
+            f"deduplicated={self.deduplicated} "
+            f"skipped={self.skipped} "
+            f"missing={self.missing} "
+            f"errors={self.errors}"
+        )
+
+
+class Checkpoint:
+    """
+    An append-only JSON lines file of uploaded files.
+
+    Each line maps a content hash to the name it was stored under, so
+    a resumed run skips rows that already point at an uploaded file
+    and reuses the upload for files with the same content.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.by_hash = {}
+        self.stored = set()
+        if self.path.exists():
+            with self.path.open() as lines:
+                for line in lines:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by an interrupted run.
+                        continue
+                    self.by_hash[record["sha256"]] = record["stored"]
+                    self.stored.add(record["stored"])
+
+    def record(self, records):
+        with self.path.open("a") as out:
+            for record in records:
+                out.write(json.dumps(record) + "\n")
+                self.by_hash[record["sha256"]] = record["stored"]
+                self.stored.add(record["stored"])
+
+
+class MediaMigration:
+    """
+    Copy the files of one FileField from a local folder to the field's
+    storage and point each row at its new name.
+
+    Rows are read by primary key, ``batch_size`` at a time. Within a
+    batch the files are hashed and uploaded by a pool of ``workers``
+    threads, identical files are uploaded once, and the rows are
+    updated in one transaction. Every upload is written to the
+    checkpoint before the rows change, so an interrupted run can be
+    started again and picks up where it stopped without uploading
+    anything twice. Per-file failures go to ``error_log`` and never
+    stop the run.
+    """
+
+    def __init__(
+        self,
+        queryset,
+        field_name,
+        source_root,
+        checkpoint_path,
+        error_log_path,
+        workers=MIGRATION_WORKERS,
+        batch_size=MIGRATION_BATCH_SIZE,
+        dry_run=False,
+        progress=None,
+        describe=None,
+    ):
+        self.queryset = (
+            queryset
+            .exclude(**{field_name: ""})
+            .exclude(**{f"{field_name}__isnull": True})
+        )
+        self.field_name = field_name
+        self.field = queryset.model._meta.get_field(field_name)
+        self.source_root = Path(source_root)
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.error_log_path = Path(error_log_path)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.progress = progress
+        self.describe = describe
+        self.stats = MigrationStats()
+
+    def run(self):
+        total = self.queryset.count()
+        last_pk = None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                rows = self.queryset.order_by("pk")
+                if last_pk is not None:
+                    rows = rows.filter(pk__gt=last_pk)
+                batch = list(
+                    rows.values_list("pk", self.field_name)[:self.batch_size]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1][0]
+
+                self.migrate_batch(pool, batch)
+                if self.progress:
+                    self.progress(self.stats, total)
+
+        return self.stats
+
+    def migrate_batch(self, pool, batch):
+        pending = []
+        for pk, name in batch:
+            if name in self.checkpoint.stored:
+                self.stats.skipped += 1
+            elif not (self.source_root / name).is_file():
+                self.stats.missing += 1
+            else:
+                pending.append((pk, name))
+
+        inspected = pool.map(self._inspect, [name for _, name in pending])
+        uploads = {}
+        reused = []
+        described = {}
+        for (pk, name), (sha256, fields, error) in zip(pending, inspected):
+            described[pk] = fields
+            if error:
+                self._fail(name, error)
+            elif sha256 in self.checkpoint.by_hash:
+                reused.append((pk, self.checkpoint.by_hash[sha256]))
+            else:
+                uploads.setdefault(sha256, []).append((pk, name))
+
+        if self.dry_run:
+            self.stats.deduplicated += len(reused)
+            for rows in uploads.values():
+                self.stats.migrated += 1
+                self.stats.deduplicated += len(rows) - 1
+            return
+
+        results = pool.map(
+            self._upload,
+            [rows[0] for rows in uploads.values()],
+        )
+        updates = list(reused)
+        records = []
+        for (sha256, rows), (stored, size, error) in zip(
+            uploads.items(),
+            results,
+        ):
+            if error:
+                for _, name in rows:
+                    self._fail(name, error)
+                continue
+            records.append(
+                {
+                    "pk": rows[0][0],
+                    "source": rows[0][1],
+                    "sha256": sha256,
+                    "stored": stored,
+                }
+            )
+            updates += [(pk, stored) for pk, _ in rows]
+            self.stats.migrated += 1
+            self.stats.deduplicated += len(rows) - 1
+            self.stats.bytes += size
+
+        self.checkpoint.record(records)
+        with transaction.atomic():
+            for pk, stored in updates:
+                self.queryset.model.objects.filter(pk=pk).update(
+                    **{self.field_name: stored},
+                    **described[pk],
+                )
+        self.stats.deduplicated += len(reused)
+
+    def _inspect(self, name):
+        """
+        Hash a local file and, with ``describe``, read the extra field
+        values to store with it.
+        """
+        digest = hashlib.sha256()
+        fields = {}
+        try:
+            with (self.source_root / name).open("rb") as source:
+                for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                if self.describe:
+                    source.seek(0)
+                    try:
+                        fields = self.describe(source)
+                    except Exception:
+                        # Still worth migrating; a backfill can retry.
+                        fields = {}
+        except OSError:
+            return None, {}, traceback.format_exc()
+        return digest.hexdigest(), fields, None
+
+    def _upload(self, row):
+        pk, name = row
+        try:
+            instance = self.queryset.model(pk=pk)
+            target = self.field.generate_filename(
+                instance,
+                os.path.basename(name),
+            )
+            path = self.source_root / name
+            with path.open("rb") as source:
+                stored = self.field.storage.save(
+                    target,
+                    File(source),
+                    max_length=self.field.max_length,
+                )
+            size = path.stat().st_size
+        except Exception:
+            return None, 0, traceback.format_exc()
+        return stored, size, None
+
+    def _fail(self, name, error):
+        self.stats.errors += 1
+        with self.error_log_path.open("a") as log:
+            log.write(f"{name}\n{error}\n")
+
+
+class MediaMigrationCommand(BaseCommand):
+    """
+    Base for commands that move one FileField to the default storage.
+
+    Subclasses set ``model`` and ``field_name``.
+    """
+
+    model = None
+    field_name = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            help="Local folder holding the files (default: MEDIA_ROOT).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=MIGRATION_WORKERS,
+            help="Files hashed and uploaded in parallel.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=MIGRATION_BATCH_SIZE,
+            help="Rows read and updated at a time.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help=(
+                "File recording finished uploads, used to resume "
+                "(default: a file named after the field in the source "
+                "folder)."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be uploaded without uploading.",
+        )
+
+    def handle(self, *args, **options):
+        source = options["source"] or getattr(settings, "MEDIA_ROOT", None)
+
+        if not source:
+            self.stdout.write(self.style.ERROR("MEDIA_ROOT is not set."))
+            self.stdout.write(
+                "Pass --source or temporarily set MEDIA_ROOT to your "
+                "local media folder to migrate existing files."
+            )
+            return
+
+        label = f"{self.model._meta.label_lower}.{self.field_name}"
+        checkpoint = options["checkpoint"] or (
+            Path(source) / f".migrated-{label}.jsonl"
+        )
+        error_log = f"{checkpoint}.errors"
+
+        migration = MediaMigration(
+            self.model.objects.all(),
+            self.field_name,
+            source,
+            checkpoint,
+            error_log,
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            progress=self.report_progress,
+            describe=self.describe,
+        )
+        stats = migration.run()
+        if stats.migrated and not options["dry_run"]:
+            self.migrated()
+
+        if stats.errors:
+            self.stderr.write(f"Errors were logged to {error_log}")
+        msg = f"Done. dry_run={options['dry_run']} {stats.summary()}"
+        self.stdout.write(self.style.SUCCESS(msg))
+
+    def report_progress(self, stats, total):
+        elapsed = stats.elapsed
+        rate = stats.done / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{stats.done}/{total} rows "
+            f"{stats.summary()} "
+            f"rate={rate:.1f} rows/s "
+            f"uploaded={stats.bytes / 1024 / 1024:.1f}MiB"
+        )
+
+    def describe(self, source):
+        """
+        Return extra field values for the file open in ``source``,
+        stored on the row along with its new name.
+        """
+        return {}
+
+    def migrated(self):
+        """
+        Hook called after a run that changed rows.
+        """
+
+
+class ImageInfoBackfillCommand(BaseCommand):
+    """
+    Base for commands that store the dimensions, colour and placeholder
+    of images uploaded before they were recorded.
+
+    Subclasses set ``model`` and ``field_name``.
+    """
+
+    model = None
+    field_name = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=IMAGE_INFO_WORKERS,
+            help="Images read in parallel.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMAGE_INFO_BATCH_SIZE,
+            help="Rows read at a time.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated, failed = backfill_image_info(
+            self.model.objects.all(),
+            self.field_name,
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            progress=self.report_failure,
+        )
+        if updated:
+            self.updated()
+
+        elapsed = time.perf_counter() - started
+        msg = (
+            "Done. "
+            f"updated={updated} "
+            f"errors={failed} "
+            f"elapsed={elapsed:.1f}s"
+        )
+        self.stdout.write(self.style.SUCCESS(msg))
+
+    def report_failure(self, name, error):
+        self.stderr.write(f"{name}: {error}")
+
+    def updated(self):
+        """
+        Hook called after a run that changed rows.
+        """
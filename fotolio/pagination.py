@@ -0,0 +1,171 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # Keep full microsecond precision, which DjangoJSONEncoder drops.
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(values):
+    data = json.dumps(values, cls=CursorEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, fields):
+    """
+    Decode ``cursor`` into one value per field of ``fields``, converted
+    with the field's to_python().
+
+    Raises InvalidCursor for a cursor that is malformed or holds values
+    of the wrong type, so tampered cursors never reach the database.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor(cursor)
+    try:
+        values = [
+            field.to_python(value) for field, value in zip(fields, values)
+        ]
+    except (TypeError, ValueError, ValidationError):
+        raise InvalidCursor(cursor)
+    if any(v is None and not f.null for f, v in zip(fields, values)):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def ordering_fields(queryset, ordering):
+    """
+    Return the model field or annotation output field behind each name
+    of ``ordering``.
+    """
+    fields = []
+    for field in ordering:
+        name = field.lstrip("-")
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            fields.append(annotation.output_field)
+        else:
+            fields.append(queryset.model._meta.get_field(name))
+    return fields
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=24):
+    """
+    Return one page of ``queryset`` using keyset (seek) pagination.
+
+    ``ordering`` lists the sort fields, prefixed with "-" for descending
+    order, and must end in a unique field so every row has a distinct
+    position. ``cursor`` is the opaque token from the previous page;
+    raises InvalidCursor when it cannot be decoded.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, ordering_fields(queryset, ordering))
+        queryset = queryset.filter(_seek_filter(ordering, values))
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = cursor_for(items[-1], ordering)
+    return KeysetPage(items, next_cursor)
+
+
+def cursor_for(item, ordering):
+    """
+    Return the cursor that continues a listing right after ``item``.
+    """
+    return encode_cursor(
+        [getattr(item, field.lstrip("-")) for field in ordering]
+    )
+
+
+def _seek_filter(ordering, values):
+    """
+    Match rows that sort after ``values``:
+    (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+    """
+    seek = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition = Q(**{f"{name}__{lookup}": values[i]})
+        for previous, value in zip(ordering[:i], values):
+            condition &= Q(**{previous.lstrip("-"): value})
+        seek |= condition
+    return seek
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A Paginator that takes the row count of an unfiltered PostgreSQL
+    table from the planner statistics instead of running COUNT(*).
+
+    Filtered querysets, small tables and other databases are counted
+    exactly.
+    """
+
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimated_row_count(self.object_list)
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
+
+
+def estimated_row_count(queryset):
+    """
+    Return the planner's row estimate for ``queryset``'s table, or None
+    when the queryset is filtered or the database keeps no estimate.
+    """
+    query = getattr(queryset, "query", None)
+    if query is None or query.where or query.distinct or query.combinator:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class "
+            "WHERE oid = to_regclass(%s)",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # reltuples is -1 (or 0) until the table has been analyzed.
+    if not row or row[0] <= 0:
+        return None
+    return row[0]
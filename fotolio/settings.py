@@ -176,6 +176,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # A file rather than SQLite's in-memory default, so concurrency
+        # tests can open several connections to the test database.
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
@@ -186,6 +189,24 @@ if "DATABASE_URL" in os.environ:
         ssl_require=True,
     )
 
+# ==========================
+# Cache
+# ==========================
+
+# Catalog invalidation only reaches every worker through a shared
+# cache. Without REDIS_URL each process keeps its own cache, and
+# catalog-derived entries expire after a short timeout instead.
+if "REDIS_URL" in os.environ:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+    if os.environ["REDIS_URL"].startswith("rediss://"):
+        # Heroku Redis serves TLS with a self-signed certificate.
+        CACHES["default"]["OPTIONS"] = {"ssl_cert_reqs": None}
+
 # ==========================
 # Password validation
 # ==========================
@@ -241,7 +262,10 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 # Media uploads via Cloudinary
-DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
+DEFAULT_FILE_STORAGE = "fotolio.storage.CachedMediaCloudinaryStorage"
+# Cache alias shared by all workers for built media URLs; None keeps
+# them in each process only.
+MEDIA_URL_CACHE = os.environ.get("MEDIA_URL_CACHE") or None
 MEDIA_URL = "/media/"
 # ==========================
 # Email Settings (Gmail)
@@ -271,4 +295,5 @@ CURRENCY_DISPLAY = "kr"
 STRIPE_PUBLIC_KEY = os.environ.get("STRIPE_PUBLIC_KEY", "")
 STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY", "")
 STRIPE_CURRENCY = os.environ.get("STRIPE_CURRENCY", "sek")
+STRIPE_WEBHOOK_SECRET = os.environ.get("STRIPE_WEBHOOK_SECRET", "")
 STRIPE_PAYMENT_METHOD_TYPES = ["card"]
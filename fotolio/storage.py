@@ -0,0 +1,17 @@
+import cloudinary
+from cloudinary_storage.storage import MediaCloudinaryStorage
+
+from .url_cache import CachedURLMixin
+
+
+class CachedMediaCloudinaryStorage(CachedURLMixin, MediaCloudinaryStorage):
+    """
+    MediaCloudinaryStorage that builds each URL once per process.
+    """
+
+    def build_transformed_url(self, name, **options):
+        resource = cloudinary.CloudinaryResource(
+            self._prepend_prefix(name),
+            default_resource_type=self._get_resource_type(name),
+        )
+        return resource.build_url(**options)
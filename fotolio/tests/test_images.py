@@ -0,0 +1,349 @@
+import io
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+
+import cloudinary
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from fotolio.images import (
+    RENDITION_CACHE_TIMEOUT,
+    backfill_image_info,
+    cloudinary_renditions,
+    get_renditions,
+    image_info,
+    read_image_info,
+)
+from products.models import Category, Product
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_bytes(size=(1000, 500), color=(200, 80, 40), exif=None):
+    image = Image.new("RGB", size, color)
+    # A blue band across the bottom fifth.
+    image.paste((20, 40, 220), (0, size[1] * 4 // 5, size[0], size[1]))
+    buffer = io.BytesIO()
+    if exif is None:
+        image.save(buffer, "JPEG")
+    else:
+        image.save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def jpeg_upload(size=(1000, 500), name="sunset.jpg"):
+    return SimpleUploadedFile(name, jpeg_bytes(size), "image/jpeg")
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+
+class FakeCloudinaryStorage:
+    def _prepend_prefix(self, name):
+        return f"media/{name}"
+
+
+FakeCloudinaryStorage.__module__ = "cloudinary_storage.storage"
+
+
+@override_settings(
+    STORAGES={
+        "default": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+        },
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        },
+    },
+    MEDIA_ROOT=MEDIA_ROOT,
+    MEDIA_URL="/media/",
+)
+class RenditionTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(
+            category=Category.objects.create(name="prints"),
+            name="Sunset",
+            description="Sunset",
+            price=Decimal("10.00"),
+            image=jpeg_upload(),
+        )
+
+    def test_local_renditions_never_upscale(self):
+        renditions = get_renditions(self.product.image)
+
+        self.assertEqual((renditions.width, renditions.height), (1000, 500))
+        widths = [w for w, _ in renditions.sources["webp"]]
+        self.assertEqual(widths, [320, 480, 640, 960, 1000])
+
+        w, url = renditions.sources["jpeg"][0]
+        self.assertTrue(url.startswith("/media/renditions/products/"))
+        self.assertTrue(url.endswith("-320w.jpg"))
+        path = f"{MEDIA_ROOT}/{url[len('/media/'):]}"
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (320, 160))
+            self.assertEqual(image.format, "JPEG")
+
+    def test_renditions_are_cached_by_file_name(self):
+        first = get_renditions(self.product.image)
+
+        with patch.object(
+            self.product.image.storage,
+            "open",
+            side_effect=AssertionError("storage opened"),
+        ):
+            second = get_renditions(self.product.image)
+
+        self.assertEqual(second.sources, first.sources)
+
+    def test_renditions_cache_entries_expire(self):
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            get_renditions(self.product.image)
+
+        cache_set.assert_called_once()
+        self.assertEqual(
+            cache_set.call_args.args[2],
+            RENDITION_CACHE_TIMEOUT,
+        )
+
+    def test_existing_rendition_files_are_reused(self):
+        first = get_renditions(self.product.image)
+        cache.clear()
+
+        with patch.object(
+            self.product.image.storage,
+            "save",
+            side_effect=AssertionError("rendition saved again"),
+        ):
+            second = get_renditions(self.product.image)
+
+        self.assertEqual(second.sources, first.sources)
+
+    def test_no_image_has_no_renditions(self):
+        self.assertIsNone(get_renditions(Product(name="Empty").image))
+
+    def test_cloudinary_renditions_are_transformation_urls(self):
+        saved = cloudinary.config().cloud_name
+        cloudinary.config(cloud_name="fotolio")
+        self.addCleanup(cloudinary.config, cloud_name=saved)
+
+        renditions = cloudinary_renditions(
+            FakeCloudinaryStorage(),
+            "products/sunset_x1y2",
+        )
+
+        self.assertIsNone(renditions.width)
+        width, url = renditions.sources["webp"][2]
+        self.assertEqual(width, 640)
+        self.assertEqual(
+            url,
+            "https://res.cloudinary.com/fotolio/image/upload/"
+            "c_limit,q_auto,w_640/v1/media/products/sunset_x1y2.webp",
+        )
+        self.assertTrue(
+            renditions.src().endswith(
+                "w_1600/v1/media/products/sunset_x1y2.jpg"
+            )
+        )
+
+    def test_responsive_image_tag(self):
+        html = Template(
+            "{% load renditions %}"
+            '{% responsive_image image alt="Sunset" sizes="50vw" %}'
+        ).render(Context({"image": self.product.image}))
+
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn("-640w.webp 640w", html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn('width="1000" height="500"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('alt="Sunset"', html)
+
+    def test_responsive_image_tag_without_image_renders_nothing(self):
+        html = Template(
+            "{% load renditions %}{% responsive_image image %}"
+        ).render(Context({"image": Product().image}))
+
+        self.assertEqual(html.strip(), "")
+
+    def test_responsive_image_tag_falls_back_without_the_original(self):
+        url = self.product.image.url
+        self.product.image.storage.delete(self.product.image.name)
+
+        html = Template(
+            "{% load renditions %}"
+            '{% responsive_image image alt="Sunset" %}'
+        ).render(Context({"image": self.product.image}))
+
+        self.assertIn(f'src="{url}"', html)
+        self.assertIn('alt="Sunset"', html)
+        self.assertNotIn("<picture>", html)
+
+    def test_unreadable_original_does_not_break_pages(self):
+        storage = self.product.image.storage
+        storage.delete(self.product.image.name)
+        storage.save(self.product.image.name, io.BytesIO(b"not an image"))
+
+        for url in (
+            reverse("products:list"),
+            reverse("products:detail", args=[self.product.pk]),
+        ):
+            response = self.client.get(url)
+            self.assertContains(response, f'src="{self.product.image.url}"')
+
+    def test_gallery_and_detail_pages_use_renditions(self):
+        response = self.client.get(reverse("products:list"))
+        self.assertContains(response, "-320w.webp 320w")
+
+        response = self.client.get(
+            reverse("products:detail", args=[self.product.pk]),
+        )
+        self.assertContains(response, "-960w.jpg 960w")
+        self.assertContains(response, 'loading="eager"')
+
+    def test_image_info_reads_size_colour_and_placeholder(self):
+        info = image_info(io.BytesIO(jpeg_bytes()))
+
+        self.assertEqual((info["width"], info["height"]), (1000, 500))
+        red, green, blue = (
+            int(info["color"][i:i + 2], 16) for i in (1, 3, 5)
+        )
+        self.assertGreater(red, 150)
+        self.assertLess(blue, 100)
+        self.assertTrue(
+            info["placeholder"].startswith("data:image/webp;base64,")
+        )
+        self.assertLess(len(info["placeholder"]), 600)
+
+    def test_image_info_follows_exif_rotation(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        info = image_info(io.BytesIO(jpeg_bytes(exif=exif)))
+
+        self.assertEqual((info["width"], info["height"]), (500, 1000))
+
+    def test_upload_stores_image_facts(self):
+        self.assertEqual(
+            (self.product.image_width, self.product.image_height),
+            (1000, 500),
+        )
+        self.assertRegex(self.product.image_color, r"^#[0-9a-f]{6}$")
+        self.assertTrue(self.product.image_placeholder)
+
+        self.product.image = None
+        self.product.save()
+        self.product.refresh_from_db()
+
+        self.assertIsNone(self.product.image_width)
+        self.assertEqual(self.product.image_placeholder, "")
+
+    def test_saving_without_new_upload_does_not_read_the_file(self):
+        product = Product.objects.get(pk=self.product.pk)
+
+        with patch(
+            "fotolio.images.image_info",
+            side_effect=AssertionError("image read"),
+        ):
+            product.name = "Sunrise"
+            product.save()
+
+    def test_backfill_fills_missing_facts(self):
+        Product.objects.filter(pk=self.product.pk).update(
+            image_width=None,
+            image_color="",
+        )
+        broken = Product.objects.create(
+            name="Broken",
+            description="Broken",
+            price=Decimal("10.00"),
+        )
+        Product.objects.filter(pk=broken.pk).update(image="products/gone.jpg")
+
+        failures = []
+        updated, failed = backfill_image_info(
+            Product.objects.all(),
+            "image",
+            workers=2,
+            progress=lambda name, error: failures.append(name),
+        )
+
+        self.assertEqual((updated, failed), (1, 1))
+        self.assertEqual(failures, ["products/gone.jpg"])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.image_width, 1000)
+        self.assertTrue(self.product.image_color)
+
+    def test_backfill_command(self):
+        Product.objects.filter(pk=self.product.pk).update(image_width=None)
+        out = io.StringIO()
+
+        call_command("backfill_product_image_info", stdout=out)
+
+        self.assertIn("updated=1 errors=0", out.getvalue())
+
+    def test_cloudinary_image_info_reads_head_and_thumbnail(self):
+        saved = cloudinary.config().cloud_name
+        cloudinary.config(cloud_name="fotolio")
+        self.addCleanup(cloudinary.config, cloud_name=saved)
+        original = jpeg_bytes(size=(3000, 2000)) + b"\0" * 5_000_000
+        thumbnail = jpeg_bytes(size=(64, 43))
+
+        def get(url, **kwargs):
+            return FakeResponse(thumbnail if "w_64" in url else original)
+
+        with patch("requests.get", side_effect=get) as mock:
+            info = read_image_info(
+                FakeCloudinaryStorage(),
+                "products/sunset_x1y2",
+            )
+
+        self.assertEqual((info["width"], info["height"]), (3000, 2000))
+        self.assertTrue(info["placeholder"])
+        self.assertEqual(mock.call_count, 2)
+
+    def test_responsive_image_uses_stored_facts(self):
+        Product.objects.filter(pk=self.product.pk).update(
+            image_width=1200,
+            image_height=800,
+            image_color="#112233",
+            image_placeholder="data:image/webp;base64,AAAA",
+        )
+        product = Product.objects.get(pk=self.product.pk)
+
+        html = Template(
+            "{% load renditions %}{% responsive_image image %}"
+        ).render(Context({"image": product.image}))
+
+        self.assertIn('width="1200" height="800"', html)
+        self.assertIn(
+            'style="background: #112233 '
+            'url(data:image/webp;base64,AAAA) center / cover no-repeat"',
+            html,
+        )
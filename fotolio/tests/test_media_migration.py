@@ -0,0 +1,219 @@
+import io
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from fotolio.media_migration import MediaMigration
+from products.models import Product
+
+
+class MediaMigrationTests(TestCase):
+    def setUp(self):
+        self.source = Path(tempfile.mkdtemp())
+        self.target = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.source, True)
+        self.addCleanup(shutil.rmtree, self.target, True)
+        self.checkpoint = self.source / "checkpoint.jsonl"
+        self.error_log = self.source / "errors.log"
+
+        override = override_settings(
+            STORAGES={
+                "default": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                },
+                "staticfiles": {
+                    "BACKEND": (
+                        "django.contrib.staticfiles.storage."
+                        "StaticFilesStorage"
+                    ),
+                },
+            },
+            MEDIA_ROOT=str(self.target),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def product(self, name, content=None):
+        if content is not None:
+            path = self.source / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+        product = Product.objects.create(
+            name=name,
+            description=name,
+            price=Decimal("10.00"),
+        )
+        Product.objects.filter(pk=product.pk).update(image=name)
+        return product
+
+    def migrate(self, **kwargs):
+        kwargs.setdefault("workers", 4)
+        kwargs.setdefault("batch_size", 2)
+        return MediaMigration(
+            Product.objects.all(),
+            "image",
+            self.source,
+            self.checkpoint,
+            self.error_log,
+            **kwargs,
+        ).run()
+
+    def image_name(self, product):
+        return Product.objects.get(pk=product.pk).image.name
+
+    def test_uploads_files_and_updates_rows(self):
+        products = [
+            self.product(f"legacy/print-{n}.jpg", f"print {n}".encode())
+            for n in range(5)
+        ]
+        missing = self.product("legacy/gone.jpg")
+
+        stats = self.migrate()
+
+        self.assertEqual((stats.migrated, stats.missing), (5, 1))
+        for n, product in enumerate(products):
+            stored = self.image_name(product)
+            self.assertEqual(
+                (self.target / stored).read_bytes(),
+                f"print {n}".encode(),
+            )
+        self.assertEqual(self.image_name(product), "products/print-4.jpg")
+        self.assertEqual(self.image_name(missing), "legacy/gone.jpg")
+
+    def test_identical_files_are_uploaded_once(self):
+        first = self.product("legacy/a.jpg", b"same")
+        second = self.product("legacy/b.jpg", b"same")
+
+        stats = self.migrate()
+
+        self.assertEqual((stats.migrated, stats.deduplicated), (1, 1))
+        self.assertEqual(self.image_name(first), self.image_name(second))
+        self.assertEqual(len(list(self.target.rglob("*.jpg"))), 1)
+
+    def test_second_run_resumes_without_uploading_again(self):
+        done = self.product("legacy/a.jpg", b"a")
+        self.migrate()
+        self.product("legacy/b.jpg", b"b")
+        # Same content as an upload from the first run.
+        copy = self.product("legacy/c.jpg", b"a")
+
+        with patch.object(
+            FileSystemStorage,
+            "save",
+            autospec=True,
+            side_effect=FileSystemStorage.save,
+        ) as save:
+            stats = self.migrate()
+
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(
+            (stats.migrated, stats.deduplicated, stats.skipped),
+            (1, 1, 1),
+        )
+        self.assertEqual(self.image_name(copy), self.image_name(done))
+
+    def test_upload_recorded_before_rows_changed_is_reused(self):
+        product = self.product("legacy/a.jpg", b"a")
+
+        with patch.object(
+            Product.objects.none().__class__,
+            "update",
+            side_effect=RuntimeError("interrupted"),
+        ):
+            with self.assertRaises(RuntimeError):
+                self.migrate()
+
+        self.assertEqual(self.image_name(product), "legacy/a.jpg")
+        stats = self.migrate()
+
+        self.assertEqual((stats.migrated, stats.deduplicated), (0, 1))
+        record = json.loads(self.checkpoint.read_text())
+        self.assertEqual(self.image_name(product), record["stored"])
+
+    def test_failed_upload_is_logged_and_run_continues(self):
+        self.product("legacy/a.jpg", b"a")
+        ok = self.product("legacy/b.jpg", b"b")
+
+        def save(storage, name, content, max_length=None):
+            if name.endswith("a.jpg"):
+                raise OSError("upload refused")
+            return original(storage, name, content, max_length)
+
+        original = FileSystemStorage.save
+        with patch.object(FileSystemStorage, "save", autospec=True) as mock:
+            mock.side_effect = save
+            stats = self.migrate()
+
+        self.assertEqual((stats.migrated, stats.errors), (1, 1))
+        self.assertEqual(self.image_name(ok), "products/b.jpg")
+        log = self.error_log.read_text()
+        self.assertIn("legacy/a.jpg", log)
+        self.assertIn("upload refused", log)
+
+    def test_dry_run_changes_nothing(self):
+        product = self.product("legacy/a.jpg", b"a")
+        self.product("legacy/b.jpg", b"a")
+
+        stats = self.migrate(dry_run=True)
+
+        self.assertEqual((stats.migrated, stats.deduplicated), (1, 1))
+        self.assertEqual(self.image_name(product), "legacy/a.jpg")
+        self.assertFalse(self.checkpoint.exists())
+        self.assertEqual(list(self.target.rglob("*.jpg")), [])
+
+    def test_avatar_command(self):
+        user = User.objects.create_user(username="joe", password="x")
+        (self.source / "legacy").mkdir()
+        (self.source / "legacy/joe.png").write_bytes(b"avatar")
+        user.profile.avatar = "legacy/joe.png"
+        user.profile.save()
+
+        out = io.StringIO()
+        call_command(
+            "migrate_profile_avatars_to_cloudinary",
+            "--source",
+            str(self.source),
+            stdout=out,
+        )
+
+        self.assertIn("migrated=1", out.getvalue())
+        self.assertIn("1/1 rows", out.getvalue())
+        user.profile.refresh_from_db()
+        self.assertEqual(user.profile.avatar.name, "avatars/joe.png")
+        self.assertEqual(
+            (self.target / user.profile.avatar.name).read_bytes(),
+            b"avatar",
+        )
+        self.assertTrue(
+            (self.source / ".migrated-profiles.profile.avatar.jsonl").exists()
+        )
+
+    def test_product_command_stores_image_facts(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 30), (10, 200, 10)).save(buffer, "PNG")
+        product = self.product("legacy/green.png", buffer.getvalue())
+        broken = self.product("legacy/broken.png", b"not an image")
+
+        call_command(
+            "migrate_product_images_to_cloudinary",
+            "--source",
+            str(self.source),
+            stdout=io.StringIO(),
+        )
+
+        product.refresh_from_db()
+        self.assertEqual(product.image.name, "products/green.png")
+        self.assertEqual((product.image_width, product.image_height), (40, 30))
+        self.assertEqual(product.image_color, "#0ac80a")
+        broken.refresh_from_db()
+        self.assertEqual(broken.image.name, "products/broken.png")
+        self.assertIsNone(broken.image_width)
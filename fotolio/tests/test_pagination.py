@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from fotolio.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_page,
+    ordering_fields,
+)
+from products.models import Product
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        for name in ["B", "A", "B", "C", "A"]:
+            Product.objects.create(
+                name=name,
+                description="Wall art.",
+                price=Decimal("10.00"),
+            )
+
+    def collect(self, ordering, page_size):
+        seen = []
+        cursor = None
+        while True:
+            page = keyset_page(
+                Product.objects.all(),
+                ordering,
+                cursor=cursor,
+                page_size=page_size,
+            )
+            seen += page.items
+            if not page.has_next:
+                return seen
+            cursor = page.next_cursor
+
+    def test_pages_cover_every_row_once_in_order(self):
+        expected = list(Product.objects.order_by("name", "id"))
+
+        for page_size in [1, 2, 4, 5, 10]:
+            self.assertEqual(self.collect(["name", "id"], page_size), expected)
+
+    def test_descending_ordering(self):
+        expected = list(Product.objects.order_by("-name", "-id"))
+
+        self.assertEqual(self.collect(["-name", "-id"], 2), expected)
+
+    def test_last_page_has_no_next_cursor(self):
+        page = keyset_page(Product.objects.all(), ["name", "id"], page_size=5)
+
+        self.assertEqual(len(page.items), 5)
+        self.assertFalse(page.has_next)
+
+    def fields(self):
+        return ordering_fields(Product.objects.all(), ["name", "id"])
+
+    def test_cursor_round_trips_values(self):
+        cursor = encode_cursor(["Snow & Ice", 42])
+
+        self.assertEqual(
+            decode_cursor(cursor, self.fields()),
+            ["Snow & Ice", 42],
+        )
+
+    def test_invalid_cursor_raises(self):
+        for cursor in ["???", "bm90LWpzb24", encode_cursor(["only-one"])]:
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(cursor, self.fields())
+
+    def test_cursor_with_wrong_typed_values_raises(self):
+        for values in [["x", "abc"], ["x", [1]], ["x", None]]:
+            with self.assertRaises(InvalidCursor):
+                keyset_page(
+                    Product.objects.all(),
+                    ["name", "id"],
+                    cursor=encode_cursor(values),
+                )
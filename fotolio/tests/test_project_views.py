@@ -28,6 +28,11 @@ class ProjectViewsTests(TestCase):
         response = self.client.get("/sitemap.xml")
 
         self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "<sitemapindex", status_code=200)
+        self.assertContains(response, "/sitemap-products.xml")
+
+        response = self.client.get("/sitemap-products.xml")
+
         self.assertContains(response, "<urlset", status_code=200)
         self.assertContains(response, "/products/1/", status_code=200)
 
@@ -0,0 +1,122 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from fotolio.images import cloudinary_renditions
+from fotolio.url_cache import URL_CACHE_TIMEOUT, CachedURLMixin, LRUCache
+
+
+class CountingStorage:
+    def __init__(self):
+        self.built = []
+
+    def url(self, name):
+        self.built.append((name, {}))
+        return f"https://cdn.example.com/{name}"
+
+
+class CachedStorage(CachedURLMixin, CountingStorage):
+    def build_transformed_url(self, name, **options):
+        self.built.append((name, options))
+        query = "&".join(f"{k}={v}" for k, v in sorted(options.items()))
+        return f"https://cdn.example.com/{name}?{query}"
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_dropped(self):
+        lru = LRUCache(2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+
+        self.assertEqual(
+            (lru.get("a"), lru.get("b"), lru.get("c")),
+            (1, None, 3),
+        )
+        self.assertEqual(len(lru), 2)
+
+
+class CachedURLTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_url_is_built_once_per_name(self):
+        storage = CachedStorage()
+
+        for _ in range(3):
+            self.assertEqual(
+                storage.url("products/a.jpg"),
+                "https://cdn.example.com/products/a.jpg",
+            )
+        storage.url("products/b.jpg")
+
+        self.assertEqual(len(storage.built), 2)
+        self.assertEqual(
+            storage.url_cache_stats.snapshot(),
+            {"hits": 2, "shared_hits": 0, "misses": 2},
+        )
+
+    def test_transformations_are_cached_separately(self):
+        storage = CachedStorage()
+
+        small = storage.transformed_url("products/a.jpg", width=320)
+        storage.transformed_url("products/a.jpg", width=320)
+        large = storage.transformed_url("products/a.jpg", width=640)
+        plain = storage.url("products/a.jpg")
+
+        self.assertEqual(len({small, large, plain}), 3)
+        self.assertEqual(storage.url_cache_stats.misses, 3)
+        self.assertEqual(storage.url_cache_stats.hits, 1)
+
+    @override_settings(MEDIA_URL_CACHE_SIZE=1)
+    def test_cache_is_bounded(self):
+        storage = CachedStorage()
+
+        storage.url("products/a.jpg")
+        storage.url("products/b.jpg")
+        storage.url("products/a.jpg")
+
+        self.assertEqual(storage.url_cache_stats.misses, 3)
+
+    @override_settings(MEDIA_URL_CACHE="default")
+    def test_shared_cache_warms_new_processes(self):
+        CachedStorage().transformed_url("products/a.jpg", width=320)
+        storage = CachedStorage()
+
+        url = storage.transformed_url("products/a.jpg", width=320)
+        storage.transformed_url("products/a.jpg", width=320)
+
+        self.assertEqual(
+            url,
+            "https://cdn.example.com/products/a.jpg?width=320",
+        )
+        self.assertEqual(storage.built, [])
+        self.assertEqual(
+            storage.url_cache_stats.snapshot(),
+            {"hits": 1, "shared_hits": 1, "misses": 0},
+        )
+
+    @override_settings(MEDIA_URL_CACHE="default")
+    def test_shared_entries_expire(self):
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            CachedStorage().url("products/a.jpg")
+
+        cache_set.assert_called_once()
+        self.assertEqual(cache_set.call_args.args[2], URL_CACHE_TIMEOUT)
+
+    def test_renditions_use_the_storage_url_cache(self):
+        storage = CachedStorage()
+
+        first = cloudinary_renditions(storage, "products/a.jpg")
+        second = cloudinary_renditions(storage, "products/a.jpg")
+
+        self.assertEqual(first.sources, second.sources)
+        self.assertEqual(
+            first.sources["webp"][0][1],
+            "https://cdn.example.com/products/a.jpg"
+            "?crop=limit&format=webp&quality=auto&secure=True&width=320",
+        )
+        stats = storage.url_cache_stats
+        self.assertEqual(stats.hits, stats.misses)
@@ -0,0 +1,132 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Enough for a few pages of product cards, each with a dozen srcset
+# URLs, at a few hundred bytes per entry.
+URL_CACHE_SIZE = 16384
+URL_CACHE_KEY = "media:url"
+# Shared entries of replaced or deleted files are never read again.
+URL_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+class URLCacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def snapshot(self):
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
+
+
+class LRUCache:
+    """
+    A thread-safe in-process mapping that drops the least recently used
+    entry once it holds ``size`` entries.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CachedURLMixin:
+    """
+    Storage mixin that remembers the URLs it builds.
+
+    URLs are keyed by file name and transformation options and kept in
+    a bounded in-process LRU. When the MEDIA_URL_CACHE setting names a
+    cache alias, misses are also looked up in and written to that
+    shared cache, so new workers start warm. A name always builds the
+    same URL, so entries never go stale; shared ones expire after
+    URL_CACHE_TIMEOUT so those of removed files do not pile up.
+
+    Subclasses provide build_transformed_url(name, **options).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.url_cache = LRUCache(
+            getattr(settings, "MEDIA_URL_CACHE_SIZE", URL_CACHE_SIZE)
+        )
+        self.url_cache_stats = URLCacheStats()
+
+    def url(self, name):
+        return self._cached_url(
+            name,
+            {},
+            lambda: super(CachedURLMixin, self).url(name),
+        )
+
+    def transformed_url(self, name, **options):
+        return self._cached_url(
+            name,
+            options,
+            lambda: self.build_transformed_url(name, **options),
+        )
+
+    def _cached_url(self, name, options, build):
+        key = (name, tuple(sorted(options.items())))
+        url = self.url_cache.get(key)
+        if url is not None:
+            self.url_cache_stats.hits += 1
+            return url
+
+        shared = _shared_cache()
+        if shared is not None:
+            shared_key = _shared_key(key)
+            url = shared.get(shared_key)
+            if url is not None:
+                self.url_cache_stats.shared_hits += 1
+                self.url_cache.set(key, url)
+                return url
+
+        self.url_cache_stats.misses += 1
+        url = build()
+        self.url_cache.set(key, url)
+        if shared is not None:
+            shared.set(shared_key, url, URL_CACHE_TIMEOUT)
+        return url
+
+
+def _shared_key(key):
+    name, options = key
+    transformation = ",".join(f"{k}={v}" for k, v in options)
+    digest = hashlib.md5(f"{name}|{transformation}".encode()).hexdigest()
+    return f"{URL_CACHE_KEY}:{digest}"
+
+
+def _shared_cache():
+    alias = getattr(settings, "MEDIA_URL_CACHE", None)
+    return caches[alias] if alias else None
@@ -9,9 +9,9 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.shortcuts import render
 
-from django.contrib.sitemaps.views import sitemap
+from django.contrib.sitemaps import views as sitemap_views
 from fotolio.sitemaps import StaticViewSitemap
-from products.sitemaps import ProductSitemap
+from products.sitemaps import ProductSitemap, cache_sitemap
 
 # Error handlers
 
@@ -46,7 +46,17 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("allauth.urls")),
     path("robots.txt", robots_txt),
-    path("sitemap.xml", sitemap, {"sitemaps": sitemaps}),
+    path(
+        "sitemap.xml",
+        cache_sitemap(sitemap_views.index),
+        {"sitemaps": sitemaps},
+    ),
+    path(
+        "sitemap-<section>.xml",
+        cache_sitemap(sitemap_views.sitemap),
+        {"sitemaps": sitemaps, "template_name": "sitemaps/sitemap.xml"},
+        name="django.contrib.sitemaps.views.sitemap",
+    ),
     path("", include("home.urls")),
     path("products/", include("products.urls")),
     path("profile/", include("profiles.urls", namespace="profiles")),
@@ -26,14 +26,14 @@ class HomeViewsTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "home/index.html")
-        self.assertIn("teaser_products", response.context)
+        self.assertNotContains(response, "product-related")
 
     def test_about_view_returns_200_and_uses_correct_template(self):
         response = self.client.get(reverse("about"))
 
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "home/about.html")
-        self.assertIn("teaser_products", response.context)
+        self.assertNotContains(response, "product-related")
 
     def test_contact_view_get_returns_200_and_uses_correct_template(self):
         response = self.client.get(reverse("contact"))
@@ -41,7 +41,7 @@ class HomeViewsTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "home/contact.html")
         self.assertIn("form", response.context)
-        self.assertIn("teaser_products", response.context)
+        self.assertNotContains(response, "product-related")
 
     def test_contact_view_post_valid_data_creates_message(self):
         response = self.client.post(
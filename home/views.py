@@ -1,31 +1,19 @@
 from django.contrib import messages
 from django.shortcuts import redirect, render
 
-from products.models import Product
-
 from .forms import ContactMessageForm
 
 
 def index(request):
     """A view to return the index page."""
-    teaser_products = Product.objects.order_by("?")[:10]
-    context = {
-        "teaser_products": teaser_products,
-    }
-    return render(request, "home/index.html", context)
+    return render(request, "home/index.html")
 
 
 def about(request):
-    teaser_products = Product.objects.order_by("?")[:10]
-    context = {
-        "teaser_products": teaser_products,
-    }
-    return render(request, "home/about.html", context)
+    return render(request, "home/about.html")
 
 
 def contact(request):
-    teaser_products = Product.objects.order_by("?")[:10]
-
     if request.method == "POST":
         form = ContactMessageForm(request.POST)
         if form.is_valid():
@@ -37,7 +25,6 @@ def contact(request):
         form = ContactMessageForm()
 
     context = {
-        "teaser_products": teaser_products,
         "form": form,
     }
     return render(request, "home/contact.html", context)
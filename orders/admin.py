@@ -0,0 +1,186 @@
+import datetime
+import re
+
+from django.contrib import admin
+from django.db.models import Sum
+from django.db.models.functions import Lower
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from fotolio.pagination import EstimatedCountPaginator
+
+from .export import EXPORT_FORMATS, export_lines
+from .models import DailySales, Order, OrderLineItem, RollupWatermark
+from .rollups import SALES_WATERMARK
+
+ORDER_NUMBER_RE = re.compile(r"FO-\d{4}-\d{6}")
+
+
+def _export_response(queryset, fmt):
+    _, content_type = EXPORT_FORMATS[fmt]
+    filename = f"orders-{timezone.now():%Y%m%d-%H%M%S}.{fmt}"
+    response = StreamingHttpResponse(
+        export_lines(fmt, orders=queryset),
+        content_type=content_type,
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@admin.action(description="Export selected orders as CSV")
+def export_orders_csv(modeladmin, request, queryset):
+    return _export_response(queryset, "csv")
+
+
+@admin.action(description="Export selected orders as JSON lines")
+def export_orders_jsonl(modeladmin, request, queryset):
+    return _export_response(queryset, "jsonl")
+
+
+class OrderLineItemInline(admin.TabularInline):
+    model = OrderLineItem
+    extra = 0
+    fields = ("product", "product_name", "quantity", "line_total")
+    raw_id_fields = ("product",)
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = (
+        "order_number",
+        "created_at",
+        "full_name",
+        "email",
+        "user",
+        "total",
+        "is_paid",
+    )
+    list_filter = ("is_paid",)
+    list_select_related = ("user",)
+    date_hierarchy = "created_at"
+    search_fields = ("order_number", "email")
+    search_help_text = (
+        "Order number (or its beginning, e.g. FO-2026) "
+        "or a full email address."
+    )
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    raw_id_fields = ("user",)
+    readonly_fields = (
+        "order_number",
+        "order_year",
+        "order_seq",
+        "stripe_payment_intent_id",
+        "stripe_currency",
+        "stripe_amount",
+        "created_at",
+        "updated_at",
+    )
+    inlines = (OrderLineItemInline,)
+    actions = (export_orders_csv, export_orders_jsonl)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Match a whole email address or an order number prefix, so every
+        search is answered from an index instead of a LIKE '%...%' scan.
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if "@" in term:
+            queryset = queryset.alias(email_lower=Lower("email")).filter(
+                email_lower=term.lower()
+            )
+        elif ORDER_NUMBER_RE.fullmatch(term.upper()):
+            queryset = queryset.filter(order_number=term.upper())
+        else:
+            # Uses the varchar_pattern_ops index PostgreSQL keeps for
+            # order_number.
+            queryset = queryset.filter(order_number__startswith=term.upper())
+        return queryset, False
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    list_display = (
+        "day",
+        "product_name",
+        "country",
+        "orders",
+        "quantity",
+        "revenue",
+    )
+    list_filter = ("country",)
+    date_hierarchy = "day"
+    search_fields = ("product_name",)
+    change_list_template = "admin/orders/dailysales/change_list.html"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path(
+                "report/",
+                self.admin_site.admin_view(self.report_view),
+                name="orders_dailysales_report",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def report_view(self, request):
+        """
+        Sales totals for a date range, read only from DailySales so the
+        cost depends on the number of days, not orders.
+        """
+        today = timezone.localdate()
+        start = _parse_day(request.GET.get("start"))
+        end = _parse_day(request.GET.get("end")) or today
+        if start is None or start > end:
+            start = end - datetime.timedelta(days=29)
+
+        rows = DailySales.objects.filter(day__range=(start, end))
+        sums = {"quantity": Sum("quantity"), "revenue": Sum("revenue")}
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Sales report",
+            "start": start,
+            "end": end,
+            "totals": rows.aggregate(**sums),
+            "by_day": rows.values("day").annotate(**sums).order_by("day"),
+            # An order counts once per product, so only per-product
+            # order counts add up across rows.
+            "by_product": (
+                rows.values("product_id", "product_name")
+                .annotate(orders=Sum("orders"), **sums)
+                .order_by("-revenue")[:20]
+            ),
+            "by_country": (
+                rows.values("country").annotate(**sums).order_by("-revenue")
+            ),
+            "watermark": RollupWatermark.objects.filter(
+                name=SALES_WATERMARK
+            ).first(),
+        }
+        return TemplateResponse(
+            request,
+            "admin/orders/dailysales/report.html",
+            context,
+        )
+
+
+def _parse_day(value):
+    try:
+        return datetime.date.fromisoformat(value or "")
+    except ValueError:
+        return None
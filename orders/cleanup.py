@@ -0,0 +1,90 @@
+import datetime
+import time
+
+import stripe
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from cart.payments import cancel_payment_intent
+
+from .models import Order, OrderLineItem
+
+ABANDONED_ORDER_AGE = datetime.timedelta(days=7)
+CLEANUP_BATCH_SIZE = 500
+
+
+def abandoned_order_age():
+    return getattr(settings, "ABANDONED_ORDER_AGE", ABANDONED_ORDER_AGE)
+
+
+def delete_abandoned_orders(
+    max_age=None,
+    batch_size=CLEANUP_BATCH_SIZE,
+    pause=0,
+    dry_run=False,
+):
+    """
+    Delete unpaid orders not touched for ``max_age`` (ABANDONED_ORDER_AGE
+    by default), with their line items, ``batch_size`` orders per
+    transaction.
+
+    An order that reached the payment step is only deleted once its
+    PaymentIntent is canceled, so a stale payment page cannot charge a
+    buyer for an order that no longer exists. Orders whose intent was
+    paid, is being paid or could not be canceled are kept.
+
+    Each batch is a short transaction, so locks are held briefly and
+    ``pause`` seconds can be left between batches; Stripe is called
+    before it starts. On PostgreSQL the batch is locked with SKIP
+    LOCKED, so rows a checkout is updating are left for the next run,
+    and is_paid and the age are checked again under the lock. Returns
+    the (orders, line_items) deleted, or that would be deleted when
+    ``dry_run`` is set.
+    """
+    cutoff = timezone.now() - (max_age or abandoned_order_age())
+    abandoned = Order.objects.filter(
+        is_paid=False,
+        updated_at__lt=cutoff,
+    ).order_by("pk")
+
+    if dry_run:
+        return abandoned.count(), OrderLineItem.objects.filter(
+            order__in=abandoned
+        ).count()
+
+    stripe.api_key = getattr(settings, "STRIPE_SECRET_KEY", "")
+    deleted_orders = 0
+    deleted_items = 0
+    last_pk = 0
+    while True:
+        candidates = list(
+            abandoned
+            .filter(pk__gt=last_pk)
+            .values_list("pk", "stripe_payment_intent_id")[:batch_size]
+        )
+        if not candidates:
+            break
+        last_pk = candidates[-1][0]
+        pks = [
+            pk
+            for pk, intent_id in candidates
+            if not intent_id or cancel_payment_intent(intent_id)
+        ]
+
+        with transaction.atomic():
+            batch = abandoned.filter(pk__in=pks)
+            if connection.features.has_select_for_update_skip_locked:
+                batch = batch.select_for_update(skip_locked=True)
+            locked = list(batch.values_list("pk", flat=True))
+            if locked:
+                _, per_model = Order.objects.filter(pk__in=locked).delete()
+                deleted_orders += per_model.get(Order._meta.label, 0)
+                deleted_items += per_model.get(OrderLineItem._meta.label, 0)
+
+        if len(candidates) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    return deleted_orders, deleted_items
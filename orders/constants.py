@@ -0,0 +1,3 @@
+# Order history, newest first; id breaks ties between equal timestamps.
+ORDER_HISTORY_ORDERING = ["-created_at", "id"]
+ORDER_HISTORY_PAGE_SIZE = 20
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from orders.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_lines
+from orders.models import Order, OrderLineItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed orders and line items, stream them through the accounting "
+        "export and report its speed and, optionally, peak Python "
+        "memory. All seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--line-items",
+            type=int,
+            default=1_000_000,
+            help="Line items to seed.",
+        )
+        parser.add_argument(
+            "--items-per-order",
+            type=int,
+            default=4,
+            help="Line items per seeded order.",
+        )
+        parser.add_argument(
+            "--formats",
+            nargs="+",
+            choices=sorted(EXPORT_FORMATS),
+            default=sorted(EXPORT_FORMATS),
+            help="Export formats to benchmark.",
+        )
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Also report peak Python memory (slows the export).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Rows fetched from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            seeded = self.seed(
+                options["line_items"],
+                options["items_per_order"],
+            )
+            seed_s = time.perf_counter() - start
+            self.stdout.write(f"seeded line_items={seeded} in {seed_s:.1f}s")
+
+            for fmt in options["formats"]:
+                self.run_export(
+                    fmt,
+                    options["chunk_size"],
+                    options["trace_memory"],
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def run_export(self, fmt, chunk_size, trace_memory):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        rows = 0
+        size = 0
+        with open(os.devnull, "w") as out:
+            for line in export_lines(fmt, chunk_size=chunk_size):
+                out.write(line)
+                rows += 1
+                size += len(line)
+        elapsed = time.perf_counter() - start
+
+        msg = (
+            f"format={fmt} lines={rows} "
+            f"bytes={size} "
+            f"elapsed={elapsed:.1f}s "
+            f"rate={rows / elapsed:.0f} lines/s"
+        )
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            msg += f" peak_python_memory={peak / 1024 / 1024:.1f}MiB"
+        self.stdout.write(msg)
+
+    def seed(self, line_items, items_per_order):
+        order_count = -(-line_items // items_per_order)
+        created = 0
+        batch = 1000
+
+        for first in range(0, order_count, batch):
+            orders = Order.objects.bulk_create(
+                [
+                    Order(
+                        order_number=f"BENCH-{i:08d}",
+                        full_name="Benchmark",
+                        email="benchmark@example.com",
+                        address1="Benchmark street 1",
+                        city="Benchmark",
+                        country="SE",
+                        total=Decimal("356.00"),
+                        is_paid=True,
+                    )
+                    for i in range(first, min(first + batch, order_count))
+                ]
+            )
+            items = []
+            for order in orders:
+                for n in range(min(items_per_order, line_items - created)):
+                    items.append(
+                        OrderLineItem(
+                            order=order,
+                            product_name=f"Benchmark print {n}",
+                            quantity=1,
+                            line_total=Decimal("89.00"),
+                        )
+                    )
+                    created += 1
+            OrderLineItem.objects.bulk_create(items, batch_size=1000)
+        return created
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from orders.models import Order, OrderNumberCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Create orders from many threads at once and check that their "
+        "numbers are unique and gapless. Orders are created in a "
+        "reserved year and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Concurrent workers, each with its own connection.",
+        )
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=50,
+            help="Orders created by each worker.",
+        )
+        parser.add_argument(
+            "--year",
+            type=int,
+            default=9999,
+            help="Unused year to number the benchmark orders in.",
+        )
+
+    def handle(self, *args, **options):
+        year = options["year"]
+        threads = options["threads"]
+        per_thread = options["orders"]
+
+        if (
+            Order.objects.filter(order_year=year).exists()
+            or OrderNumberCounter.objects.filter(year=year).exists()
+        ):
+            raise CommandError(f"Year {year} is already in use.")
+
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(per_thread):
+                    Order.objects.create(
+                        order_year=year,
+                        full_name="Benchmark",
+                        email="benchmark@example.com",
+                        address1="Benchmark street 1",
+                        city="Benchmark",
+                        country="SE",
+                    )
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        try:
+            seqs = sorted(
+                Order.objects
+                .filter(order_year=year)
+                .values_list("order_seq", flat=True)
+            )
+            created = len(seqs)
+            unique = len(set(seqs)) == created
+            gapless = seqs == list(range(1, created + 1))
+        finally:
+            Order.objects.filter(order_year=year).delete()
+            OrderNumberCounter.objects.filter(year=year).delete()
+
+        self.stdout.write(
+            f"threads={threads} orders={created} errors={len(errors)} "
+            f"elapsed={elapsed:.2f}s "
+            f"rate={created / elapsed:.0f}/s "
+            f"unique={unique} gapless={gapless}"
+        )
+        for exc in errors[:5]:
+            self.stderr.write(f"{type(exc).__name__}: {exc}")
+
+        if errors or not unique or not gapless:
+            raise CommandError("Order numbering check failed.")
+        self.stdout.write(self.style.SUCCESS("Done."))
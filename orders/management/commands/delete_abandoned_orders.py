@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from orders.cleanup import (
+    CLEANUP_BATCH_SIZE,
+    abandoned_order_age,
+    delete_abandoned_orders,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete unpaid orders that have not been touched for a while, "
+        "with their line items, in small batches. Safe to run while "
+        "customers are checking out; meant for a daily scheduler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--age-hours",
+            type=float,
+            help=(
+                "Delete unpaid orders idle for longer than this. "
+                "Defaults to the ABANDONED_ORDER_AGE setting (7 days)."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=CLEANUP_BATCH_SIZE,
+            help="Orders deleted per transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to wait between batches.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        max_age = abandoned_order_age()
+        if options["age_hours"] is not None:
+            max_age = datetime.timedelta(hours=options["age_hours"])
+
+        orders, line_items = delete_abandoned_orders(
+            max_age=max_age,
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            dry_run=options["dry_run"],
+        )
+
+        msg = (
+            "Done. "
+            f"dry_run={options['dry_run']} "
+            f"max_age={max_age} "
+            f"orders={orders} "
+            f"line_items={line_items}"
+        )
+        self.stdout.write(self.style.SUCCESS(msg))
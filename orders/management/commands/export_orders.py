@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_lines
+from orders.models import Order
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream orders and their line items to CSV or JSON lines for "
+        "accounting, one row per line item."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=sorted(EXPORT_FORMATS),
+            default="csv",
+            help="Output format.",
+        )
+        parser.add_argument(
+            "--start",
+            type=parse_date,
+            help="First day to include (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--end",
+            type=parse_date,
+            help="Last day to include (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--paid-only",
+            action="store_true",
+            help="Leave out unpaid orders.",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to. Defaults to stdout.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Rows fetched from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        orders = Order.objects.all()
+        if options["paid_only"]:
+            orders = orders.filter(is_paid=True)
+
+        lines = export_lines(
+            options["format"],
+            orders=orders,
+            start=options["start"],
+            end=options["end"],
+            chunk_size=options["chunk_size"],
+        )
+
+        if options["output"]:
+            with open(options["output"], "w", newline="") as out:
+                out.writelines(lines)
+            msg = f"Done. output={options['output']}"
+            self.stdout.write(self.style.SUCCESS(msg))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from orders.rollups import ROLLUP_BATCH_SIZE, reset_sales_rollup, rollup_sales
+
+
+class Command(BaseCommand):
+    help = (
+        "Add orders paid since the last run to the daily sales rollups "
+        "used by the admin sales report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ROLLUP_BATCH_SIZE,
+            help="Orders processed per transaction.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop the rollups and rebuild them from every paid order.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            reset_sales_rollup()
+
+        processed = rollup_sales(batch_size=options["batch_size"])
+
+        msg = (
+            "Done. "
+            f"rebuild={options['rebuild']} "
+            f"orders={processed}"
+        )
+        self.stdout.write(self.style.SUCCESS(msg))
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.24 on 2026-10-18 10:44
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def seed_counters(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderNumberCounter = apps.get_model("orders", "OrderNumberCounter")
+
+    rows = (
+        Order.objects
+        .filter(order_year__isnull=False)
+        .values("order_year")
+        .annotate(last_seq=Max("order_seq"))
+    )
+    OrderNumberCounter.objects.bulk_create(
+        [
+            OrderNumberCounter(
+                year=row["order_year"],
+                last_seq=row["last_seq"] or 0,
+            )
+            for row in rows
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_stripe_payment_intent_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberCounter',
+            fields=[
+                ('year', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('last_seq', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
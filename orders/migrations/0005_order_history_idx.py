@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-18 10:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_ordernumbercounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'is_paid', 'created_at'], name='order_history_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('is_paid', False)), fields=['updated_at'], name='order_unpaid_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.24 on 2026-10-18 11:06
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import F
+
+
+def backfill_paid_at(apps, schema_editor):
+    # Best available guess for orders paid before paid_at existed.
+    Order = apps.get_model("orders", "Order")
+    Order.objects.filter(is_paid=True, paid_at__isnull=True).update(
+        paid_at=F("updated_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_productreview_feed_idx'),
+        ('orders', '0007_order_unpaid_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+                ('order_id', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='paid_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_paid_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('product_name', models.CharField(max_length=255)),
+                ('country', models.CharField(max_length=120)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.product')),
+            ],
+            options={
+                'verbose_name_plural': 'daily sales',
+                'ordering': ['-day', 'product_name'],
+                'indexes': [models.Index(fields=['day', 'product', 'country'], name='dailysales_key_idx')],
+            },
+        ),
+    ]
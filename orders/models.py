@@ -1,12 +1,68 @@
 from decimal import Decimal
 
 from django.conf import settings
-from django.db import models, transaction
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
 from django.utils import timezone
 
+from fotolio.db import can_upsert, upsert
 from products.models import Product
 
 
+class OrderNumberCounterManager(models.Manager):
+    def next_seq(self, year):
+        """
+        Allocate the next order sequence number for ``year``.
+
+        On SQLite and PostgreSQL the counter row is created or
+        incremented by a single INSERT ... ON CONFLICT DO UPDATE ...
+        RETURNING, so concurrent checkouts never read the same value
+        and the first order of a new year cannot race. Other backends
+        use an F() increment with a guarded insert.
+
+        Call it in the transaction that saves the order. Only the
+        year's counter row is locked, until that transaction ends, and
+        a rollback returns the number: numbers are unique and gapless.
+        """
+        if can_upsert(returning=True):
+            return upsert(
+                self.model,
+                ["year", "last_seq"],
+                [(year, 1)],
+                conflict=["year"],
+                updates={"last_seq": "{old} + 1"},
+                returning="last_seq",
+            )
+        return self._increment_next_seq(year)
+
+    def _increment_next_seq(self, year):
+        counters = self.filter(year=year)
+        if not counters.update(last_seq=F("last_seq") + 1):
+            try:
+                with transaction.atomic():
+                    self.create(year=year, last_seq=1)
+                return 1
+            except IntegrityError:
+                # Another checkout opened the year first.
+                counters.update(last_seq=F("last_seq") + 1)
+        return counters.values_list("last_seq", flat=True).get()
+
+
+class OrderNumberCounter(models.Model):
+    """
+    The last order sequence number handed out in each year.
+    """
+
+    year = models.PositiveSmallIntegerField(primary_key=True)
+    last_seq = models.PositiveIntegerField(default=0)
+
+    objects = OrderNumberCounterManager()
+
+    def __str__(self):
+        return f"{self.year}: {self.last_seq}"
+
+
 class Order(models.Model):
 
     order_number = models.CharField(
@@ -68,6 +124,7 @@ class Order(models.Model):
     stripe_payment_intent_id = models.CharField(
         max_length=255,
         blank=True,
+        db_index=True,
     )
     stripe_currency = models.CharField(
         max_length=10,
@@ -78,12 +135,37 @@ class Order(models.Model):
     )
 
     is_paid = models.BooleanField(default=False)
+    paid_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "is_paid", "created_at"],
+                name="order_history_idx",
+            ),
+            models.Index(
+                fields=["-created_at"],
+                name="order_created_idx",
+            ),
+            models.Index(
+                Lower("email"),
+                name="order_email_lower_idx",
+            ),
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(is_paid=False),
+                name="order_unpaid_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["order_year", "order_seq"],
@@ -92,16 +174,15 @@ class Order(models.Model):
         ]
 
     def save(self, *args, **kwargs):
+        if self.is_paid and self.paid_at is None:
+            self.paid_at = timezone.now()
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "paid_at"}
         if not self.order_number:
             with transaction.atomic():
-                year = timezone.now().year
-                last = (
-                    Order.objects.select_for_update()
-                    .filter(order_year=year)
-                    .order_by("-order_seq")
-                    .first()
-                )
-                next_seq = (last.order_seq + 1) if last else 1
+                year = self.order_year or timezone.now().year
+                next_seq = OrderNumberCounter.objects.next_seq(year)
                 self.order_year = year
                 self.order_seq = next_seq
                 self.order_number = f"FO-{year}-{next_seq:06d}"
@@ -141,3 +222,77 @@ class OrderLineItem(models.Model):
 
     def __str__(self):
         return f"{self.product_name} x {self.quantity}"
+
+
+class DailySales(models.Model):
+    """
+    Paid sales rolled up per day, product and shipping country.
+
+    Filled incrementally by the rollup_sales command; reports read these
+    rows instead of aggregating every order.
+    """
+
+    day = models.DateField()
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    product_name = models.CharField(max_length=255)
+    country = models.CharField(max_length=120)
+
+    orders = models.PositiveIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal("0.00"),
+    )
+
+    class Meta:
+        verbose_name_plural = "daily sales"
+        ordering = ["-day", "product_name"]
+        indexes = [
+            models.Index(
+                fields=["day", "product", "country"],
+                name="dailysales_key_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.product_name} ({self.country})"
+
+
+class RollupWatermark(models.Model):
+    """
+    How far a rollup has read: the (paid_at, id) of the last order it
+    processed.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    order_id = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.paid_at} #{self.order_id}"
+
+    def unread(self):
+        """
+        Return a Q matching orders paid after the watermark.
+        """
+        if self.paid_at is None:
+            return Q()
+        return Q(paid_at__gt=self.paid_at) | Q(
+            paid_at=self.paid_at,
+            id__gt=self.order_id,
+        )
+
+    def advance(self, order):
+        """
+        Move the watermark to ``order``, a dict with id and paid_at.
+        """
+        self.paid_at = order["paid_at"]
+        self.order_id = order["id"]
+        self.save()
@@ -0,0 +1,141 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DailySales, Order, OrderLineItem, RollupWatermark
+
+SALES_WATERMARK = "daily_sales"
+ROLLUP_BATCH_SIZE = 1000
+
+# Orders paid within this window are left for the next run, so a
+# payment committed late cannot slip behind the watermark.
+ROLLUP_SAFETY_LAG = datetime.timedelta(minutes=5)
+
+
+def scan_paid_orders(
+    name,
+    apply,
+    fields=(),
+    batch_size=ROLLUP_BATCH_SIZE,
+    lag=ROLLUP_SAFETY_LAG,
+):
+    """
+    Pass the orders paid since the watermark ``name`` to ``apply``.
+
+    Orders are read in (paid_at, id) order, ``batch_size`` at a time,
+    as dicts of id, paid_at and ``fields``. Each batch is applied and
+    the watermark moved in one transaction, so an interrupted run never
+    counts an order twice. Returns the number of orders processed.
+    """
+    until = timezone.now() - lag
+    processed = 0
+
+    while True:
+        with transaction.atomic():
+            watermark, _ = (
+                RollupWatermark.objects
+                .select_for_update()
+                .get_or_create(name=name)
+            )
+            orders = list(
+                Order.objects
+                .filter(is_paid=True, paid_at__lt=until)
+                .filter(watermark.unread())
+                .order_by("paid_at", "id")
+                .values("id", "paid_at", *fields)[:batch_size]
+            )
+            if not orders:
+                return processed
+
+            apply(orders)
+            watermark.advance(orders[-1])
+
+        processed += len(orders)
+
+
+def rollup_sales(batch_size=ROLLUP_BATCH_SIZE, lag=ROLLUP_SAFETY_LAG):
+    """
+    Add orders paid since the last run to DailySales. Returns the
+    number of orders processed.
+    """
+    return scan_paid_orders(
+        SALES_WATERMARK,
+        lambda orders: _apply(_aggregate(orders)),
+        fields=["country"],
+        batch_size=batch_size,
+        lag=lag,
+    )
+
+
+def reset_sales_rollup():
+    """
+    Drop all rollups so the next run rebuilds them from every order.
+    """
+    with transaction.atomic():
+        DailySales.objects.all().delete()
+        RollupWatermark.objects.filter(name=SALES_WATERMARK).delete()
+
+
+def _aggregate(orders):
+    """
+    Sum the line items of ``orders`` per (day, product, country).
+    """
+    by_id = {
+        order["id"]: (
+            timezone.localdate(order["paid_at"]),
+            order["country"],
+        )
+        for order in orders
+    }
+    totals = defaultdict(
+        lambda: {
+            "orders": set(),
+            "quantity": 0,
+            "revenue": Decimal("0.00"),
+            "product_name": "",
+        }
+    )
+    items = OrderLineItem.objects.filter(order_id__in=by_id).values_list(
+        "order_id",
+        "product_id",
+        "product_name",
+        "quantity",
+        "line_total",
+    )
+    for order_id, product_id, name, quantity, line_total in items:
+        day, country = by_id[order_id]
+        # Line items of deleted products are kept apart by name.
+        key = (day, product_id, "" if product_id else name, country)
+        row = totals[key]
+        row["orders"].add(order_id)
+        row["quantity"] += quantity
+        row["revenue"] += line_total
+        row["product_name"] = name
+    return totals
+
+
+def _apply(totals):
+    for (day, product_id, name, country), row in totals.items():
+        lookup = {"day": day, "product_id": product_id, "country": country}
+        if not product_id:
+            lookup["product_name"] = name
+        changed = DailySales.objects.filter(**lookup).update(
+            orders=F("orders") + len(row["orders"]),
+            quantity=F("quantity") + row["quantity"],
+            revenue=F("revenue") + row["revenue"],
+            product_name=row["product_name"],
+        )
+        if not changed:
+            DailySales.objects.create(
+                day=day,
+                product_id=product_id,
+                product_name=row["product_name"],
+                country=country,
+                orders=len(row["orders"]),
+                quantity=row["quantity"],
+                revenue=row["revenue"],
+            )
@@ -0,0 +1,193 @@
+import csv
+import io
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from fotolio.pagination import EstimatedCountPaginator, estimated_row_count
+from orders.admin import OrderAdmin, OrderLineItemInline
+from orders.models import Order, OrderLineItem
+from orders.tests.utils import create_order
+
+
+class OrderAdminConfigTests(TestCase):
+    def test_order_uses_order_admin(self):
+        self.assertIsInstance(site._registry[Order], OrderAdmin)
+
+    def test_changelist_is_bounded(self):
+        admin_obj = site._registry[Order]
+
+        self.assertEqual(admin_obj.list_select_related, ("user",))
+        self.assertEqual(admin_obj.date_hierarchy, "created_at")
+        self.assertFalse(admin_obj.show_full_result_count)
+        self.assertIs(admin_obj.paginator, EstimatedCountPaginator)
+        self.assertIn(OrderLineItemInline, admin_obj.inlines)
+
+
+class OrderAdminSearchTests(TestCase):
+    def setUp(self):
+        self.admin = site._registry[Order]
+        self.joe = create_order(email="Joe@Example.com")
+        self.ann = create_order(email="ann@example.com")
+
+    def search(self, term):
+        queryset, may_have_duplicates = self.admin.get_search_results(
+            None,
+            Order.objects.all(),
+            term,
+        )
+        self.assertFalse(may_have_duplicates)
+        return set(queryset)
+
+    def test_email_search_is_exact_and_case_insensitive(self):
+        self.assertEqual(self.search("joe@EXAMPLE.com"), {self.joe})
+        self.assertEqual(self.search("example.com"), set())
+
+    def test_full_order_number_search(self):
+        term = self.ann.order_number.lower()
+
+        self.assertEqual(self.search(term), {self.ann})
+
+    def test_order_number_prefix_search(self):
+        prefix = self.joe.order_number[:7]
+
+        self.assertEqual(self.search(prefix), {self.joe, self.ann})
+
+    def test_email_search_uses_the_lower_index(self):
+        queryset, _ = self.admin.get_search_results(
+            None,
+            Order.objects.all(),
+            "joe@example.com",
+        )
+
+        self.assertIn('LOWER("orders_order"."email")', str(queryset.query))
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        for _ in range(3):
+            create_order()
+
+    def test_large_unfiltered_table_uses_estimate(self):
+        with patch(
+            "fotolio.pagination.estimated_row_count",
+            return_value=2_000_000,
+        ), self.assertNumQueries(0):
+            paginator = EstimatedCountPaginator(Order.objects.all(), 100)
+            self.assertEqual(paginator.count, 2_000_000)
+
+    def test_small_estimate_is_counted_exactly(self):
+        with patch(
+            "fotolio.pagination.estimated_row_count",
+            return_value=50,
+        ):
+            paginator = EstimatedCountPaginator(Order.objects.all(), 100)
+            self.assertEqual(paginator.count, 3)
+
+    def test_filtered_and_non_postgres_querysets_have_no_estimate(self):
+        self.assertIsNone(
+            estimated_row_count(Order.objects.filter(is_paid=True))
+        )
+        if connection.vendor != "postgresql":
+            self.assertIsNone(estimated_row_count(Order.objects.all()))
+
+
+class OrderAdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="admin",
+            email="admin@example.com",
+            password="testpass123",
+        )
+        self.client.force_login(self.admin)
+        self.url = reverse("admin:orders_order_changelist")
+
+    def create_orders(self, count):
+        for i in range(count):
+            user = User.objects.create_user(username=f"buyer{count}-{i}")
+            create_order(user=user, is_paid=True)
+
+    def test_query_count_does_not_grow_with_orders(self):
+        self.create_orders(2)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+
+        self.create_orders(20)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(large), len(small))
+
+    def test_change_form_shows_line_items(self):
+        order = create_order()
+        OrderLineItem.objects.create(
+            order=order,
+            product_name="Sunset",
+            line_total=Decimal("10.00"),
+        )
+
+        response = self.client.get(
+            reverse("admin:orders_order_change", args=[order.pk])
+        )
+
+        self.assertContains(response, "Sunset")
+
+
+class OrderAdminExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="admin",
+            email="admin@example.com",
+            password="testpass123",
+        )
+        self.client.force_login(self.admin)
+        self.order = Order.objects.create(
+            full_name="Joe Smith",
+            email="joe@example.com",
+            address1="Main Street 1",
+            city="Stockholm",
+            country="SE",
+            is_paid=True,
+        )
+        OrderLineItem.objects.create(
+            order=self.order,
+            product_name="Sunset",
+            line_total=Decimal("10.00"),
+        )
+
+    def run_action(self, action):
+        return self.client.post(
+            reverse("admin:orders_order_changelist"),
+            {
+                "action": action,
+                ACTION_CHECKBOX_NAME: [self.order.pk],
+            },
+        )
+
+    def test_csv_export_action_streams_selected_orders(self):
+        response = self.run_action("export_orders_csv")
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment;", response["Content-Disposition"])
+
+        text = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], self.order.order_number)
+
+    def test_jsonl_export_action(self):
+        response = self.run_action("export_orders_jsonl")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(list(response.streaming_content)), 1)
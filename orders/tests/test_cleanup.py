@@ -0,0 +1,147 @@
+import datetime
+import io
+from unittest.mock import patch
+
+import stripe
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from cart.tests.stripe_stub import StripeStub
+from orders.cleanup import delete_abandoned_orders
+from orders.models import Order, OrderLineItem
+from orders.tests.utils import create_order
+
+
+# Two prints at 10.00 each.
+LINES = [("Print 0", 1), ("Print 1", 1)]
+
+
+def days_ago(days):
+    return timezone.now() - datetime.timedelta(days=days)
+
+
+class DeleteAbandonedOrdersTests(TestCase):
+    def setUp(self):
+        self.abandoned = [
+            create_order(lines=LINES, updated_at=days_ago(10))
+            for _ in range(5)
+        ]
+        self.recent = create_order(lines=LINES, updated_at=days_ago(1))
+        self.paid = create_order(
+            lines=LINES,
+            updated_at=days_ago(30),
+            is_paid=True,
+        )
+
+    def test_deletes_only_old_unpaid_orders(self):
+        orders, line_items = delete_abandoned_orders()
+
+        self.assertEqual((orders, line_items), (5, 10))
+        self.assertEqual(
+            set(Order.objects.all()),
+            {self.recent, self.paid},
+        )
+        self.assertEqual(OrderLineItem.objects.count(), 4)
+
+    def test_deletes_in_batches(self):
+        # Three batches, each a short transaction of its own.
+        with self.assertNumQueries(3 * 7):
+            orders, _ = delete_abandoned_orders(batch_size=2)
+
+        self.assertEqual(orders, 5)
+
+    def test_dry_run_deletes_nothing(self):
+        counts = delete_abandoned_orders(dry_run=True)
+
+        self.assertEqual(counts, (5, 10))
+        self.assertEqual(Order.objects.count(), 7)
+
+    @override_settings(ABANDONED_ORDER_AGE=datetime.timedelta(hours=12))
+    def test_age_comes_from_settings(self):
+        orders, _ = delete_abandoned_orders()
+
+        self.assertEqual(orders, 6)
+
+    def test_command_reports_counts(self):
+        out = io.StringIO()
+
+        call_command(
+            "delete_abandoned_orders",
+            "--age-hours=480",
+            stdout=out,
+        )
+
+        self.assertIn("orders=0", out.getvalue())
+        call_command("delete_abandoned_orders", stdout=out)
+        self.assertIn("orders=5 line_items=10", out.getvalue())
+
+
+@override_settings(STRIPE_SECRET_KEY="sk_test_dummy")
+class AbandonedPaymentIntentTests(TestCase):
+    def abandoned_order(self, intent_id):
+        return create_order(
+            lines=LINES,
+            updated_at=days_ago(10),
+            stripe_payment_intent_id=intent_id,
+        )
+
+    def add_intent(self, stub, intent_id, status):
+        stub.intents[intent_id] = {
+            "id": intent_id,
+            "object": "payment_intent",
+            "amount": 2000,
+            "amount_received": 0,
+            "currency": "sek",
+            "status": status,
+            "client_secret": f"{intent_id}_secret",
+            "metadata": {},
+        }
+
+    def test_open_intent_is_canceled_before_delete(self):
+        order = self.abandoned_order("pi_open")
+
+        with StripeStub() as stub:
+            self.add_intent(stub, "pi_open", "requires_payment_method")
+            orders, _ = delete_abandoned_orders()
+
+        self.assertEqual(orders, 1)
+        self.assertFalse(Order.objects.filter(pk=order.pk).exists())
+        self.assertEqual(stub.intents["pi_open"]["status"], "canceled")
+
+    def test_orders_with_settled_intents_are_kept(self):
+        paid = self.abandoned_order("pi_paid")
+        pending = self.abandoned_order("pi_pending")
+
+        with StripeStub() as stub:
+            self.add_intent(stub, "pi_paid", "succeeded")
+            self.add_intent(stub, "pi_pending", "processing")
+            orders, _ = delete_abandoned_orders(batch_size=1)
+
+        self.assertEqual(orders, 0)
+        self.assertEqual(set(Order.objects.all()), {paid, pending})
+        self.assertEqual(stub.count("POST", "cancel"), 0)
+
+    def test_unknown_or_canceled_intents_do_not_block_delete(self):
+        self.abandoned_order("pi_gone")
+        self.abandoned_order("pi_canceled")
+
+        with StripeStub() as stub:
+            self.add_intent(stub, "pi_canceled", "canceled")
+            orders, _ = delete_abandoned_orders()
+
+        self.assertEqual(orders, 2)
+        self.assertEqual(stub.count("POST", "cancel"), 0)
+
+    def test_orders_are_kept_when_stripe_fails(self):
+        order = self.abandoned_order("pi_open")
+
+        with StripeStub() as stub:
+            self.add_intent(stub, "pi_open", "requires_payment_method")
+            # Nothing listens on the discard port.
+            with patch.object(stripe, "api_base", "http://127.0.0.1:9"):
+                orders, _ = delete_abandoned_orders()
+
+        self.assertEqual(orders, 0)
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
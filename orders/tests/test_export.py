@@ -0,0 +1,117 @@
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.export import EXPORT_COLUMNS, export_lines, export_rows
+from orders.tests.utils import create_order
+
+
+def noon(day):
+    return timezone.make_aware(
+        datetime.datetime.combine(day, datetime.time(12))
+    )
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.first = create_order(
+            created_at=noon(datetime.date(2026, 3, 1)),
+            lines=[("Sunset", 1), ("Ocean", 2)],
+            total=Decimal("125.00"),
+            is_paid=True,
+        )
+        self.second = create_order(
+            created_at=noon(datetime.date(2026, 3, 2)),
+            lines=[("Forest", 3)],
+            total=Decimal("125.00"),
+        )
+        self.empty = create_order(
+            created_at=noon(datetime.date(2026, 3, 3)),
+            total=Decimal("125.00"),
+        )
+
+    def test_one_row_per_line_item(self):
+        rows = list(export_rows())
+
+        self.assertEqual(len(rows), 4)
+        names = [row[11] for row in rows]
+        self.assertEqual(names, ["Sunset", "Ocean", "Forest", None])
+
+    def test_date_range_is_inclusive(self):
+        rows = list(
+            export_rows(
+                start=datetime.date(2026, 3, 2),
+                end=datetime.date(2026, 3, 2),
+            )
+        )
+
+        self.assertEqual(
+            {row[0] for row in rows},
+            {self.second.order_number},
+        )
+
+    def test_rows_are_streamed_with_iterator(self):
+        rows = export_rows(chunk_size=1)
+
+        self.assertNotIsInstance(rows, list)
+        self.assertEqual(len(list(rows)), 4)
+
+    def test_csv_has_header_and_rows(self):
+        text = "".join(export_lines("csv"))
+        rows = list(csv.reader(io.StringIO(text)))
+
+        self.assertEqual(rows[0], [name for name, _ in EXPORT_COLUMNS])
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1][0], self.first.order_number)
+
+    def test_jsonl_rows_are_objects(self):
+        lines = list(export_lines("jsonl"))
+        first = json.loads(lines[0])
+
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(first["order_number"], self.first.order_number)
+        self.assertEqual(first["line_total"], "10.00")
+        self.assertEqual(first["quantity"], 1)
+
+    def test_command_writes_to_stdout(self):
+        out = io.StringIO()
+
+        call_command(
+            "export_orders",
+            "--format=jsonl",
+            "--paid-only",
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(
+            all(
+                json.loads(line)["order_number"] == self.first.order_number
+                for line in lines
+            )
+        )
+
+    def test_command_writes_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "orders.csv")
+
+            call_command(
+                "export_orders",
+                "--start=2026-03-02",
+                f"--output={path}",
+                stdout=io.StringIO(),
+            )
+
+            with open(path, newline="") as f:
+                rows = list(csv.reader(f))
+
+        self.assertEqual(len(rows), 3)
@@ -1,9 +1,13 @@
+import threading
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase
 
-from orders.models import Order, OrderLineItem
+from orders.models import Order, OrderLineItem, OrderNumberCounter
+from orders.tests.utils import create_order
 from products.models import Product
 
 
@@ -114,3 +118,82 @@ class OrderLineItemModelTests(TestCase):
         )
 
         self.assertEqual(str(lineitem), "Sunset Print x 2")
+
+
+class OrderNumberCounterTests(TestCase):
+    def test_first_order_of_a_year_opens_its_counter(self):
+        order = create_order(order_year=2031)
+
+        self.assertEqual(order.order_number, "FO-2031-000001")
+        self.assertEqual(OrderNumberCounter.objects.get(year=2031).last_seq, 1)
+
+    def test_numbering_continues_from_the_counter(self):
+        OrderNumberCounter.objects.create(year=2031, last_seq=41)
+
+        order = create_order(order_year=2031)
+
+        self.assertEqual(order.order_number, "FO-2031-000042")
+
+    def test_years_are_numbered_independently(self):
+        create_order(order_year=2031)
+        create_order(order_year=2031)
+
+        order = create_order(order_year=2032)
+
+        self.assertEqual(order.order_seq, 1)
+
+    def test_allocation_is_one_statement(self):
+        OrderNumberCounter.objects.create(year=2031, last_seq=1)
+
+        with self.assertNumQueries(1):
+            OrderNumberCounter.objects.next_seq(2031)
+
+    def test_fallback_increment_path(self):
+        with patch("fotolio.db.UPSERT_VENDORS", set()):
+            first = create_order(order_year=2031)
+            second = create_order(order_year=2031)
+
+        self.assertEqual(first.order_seq, 1)
+        self.assertEqual(second.order_seq, 2)
+
+    def test_failed_order_returns_its_number(self):
+        create_order(order_year=2031)
+
+        with patch(
+            "django.db.models.Model.save_base",
+            side_effect=IntegrityError,
+        ), self.assertRaises(IntegrityError):
+            create_order(order_year=2031)
+
+        order = create_order(order_year=2031)
+        self.assertEqual(order.order_seq, 2)
+
+
+class OrderNumberConcurrencyTests(TransactionTestCase):
+    threads = 8
+    orders_per_thread = 10
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Threads need a file-backed test database.")
+
+    def create_orders(self):
+        try:
+            for _ in range(self.orders_per_thread):
+                create_order(order_year=2031)
+        finally:
+            connection.close()
+
+    def test_concurrent_orders_get_unique_gapless_numbers(self):
+        workers = [
+            threading.Thread(target=self.create_orders)
+            for _ in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        seqs = sorted(Order.objects.values_list("order_seq", flat=True))
+        total = self.threads * self.orders_per_thread
+        self.assertEqual(seqs, list(range(1, total + 1)))
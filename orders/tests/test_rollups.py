@@ -0,0 +1,199 @@
+import datetime
+import io
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import DailySales, Order, OrderLineItem
+from orders.rollups import rollup_sales
+from products.models import Product
+
+NO_LAG = datetime.timedelta(0)
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.sunset = Product.objects.create(
+            name="Sunset",
+            price=Decimal("10.00"),
+        )
+        self.ocean = Product.objects.create(
+            name="Ocean",
+            price=Decimal("20.00"),
+        )
+        self.day = datetime.date(2026, 5, 4)
+
+    def paid_order(self, lines, country="SE", day=None, hour=12):
+        paid_at = timezone.make_aware(
+            datetime.datetime.combine(day or self.day, datetime.time(hour))
+        )
+        order = Order.objects.create(
+            full_name="Joe Smith",
+            email="joe@example.com",
+            address1="Main Street 1",
+            city="Stockholm",
+            country=country,
+            is_paid=True,
+        )
+        Order.objects.filter(pk=order.pk).update(paid_at=paid_at)
+        OrderLineItem.objects.bulk_create(
+            [
+                OrderLineItem(
+                    order=order,
+                    product=product,
+                    product_name=product.name,
+                    quantity=quantity,
+                    line_total=product.price * quantity,
+                )
+                for product, quantity in lines
+            ]
+        )
+        return order
+
+    def rollup(self, product, country="SE", day=None):
+        return DailySales.objects.get(
+            day=day or self.day,
+            product=product,
+            country=country,
+        )
+
+    def test_sums_per_day_product_and_country(self):
+        self.paid_order([(self.sunset, 1), (self.ocean, 2)])
+        self.paid_order([(self.sunset, 3)])
+        self.paid_order([(self.sunset, 1)], country="NO")
+
+        processed = rollup_sales(lag=NO_LAG)
+
+        self.assertEqual(processed, 3)
+        row = self.rollup(self.sunset)
+        self.assertEqual(
+            (row.orders, row.quantity, row.revenue),
+            (2, 4, Decimal("40.00")),
+        )
+        self.assertEqual(self.rollup(self.ocean).revenue, Decimal("40.00"))
+        self.assertEqual(self.rollup(self.sunset, "NO").quantity, 1)
+
+    def test_runs_are_incremental(self):
+        self.paid_order([(self.sunset, 1)], hour=9)
+        rollup_sales(lag=NO_LAG)
+
+        self.paid_order([(self.sunset, 2)], hour=10)
+        processed = rollup_sales(lag=NO_LAG)
+
+        self.assertEqual(processed, 1)
+        self.assertEqual(rollup_sales(lag=NO_LAG), 0)
+        row = self.rollup(self.sunset)
+        self.assertEqual((row.orders, row.quantity), (2, 3))
+
+    def test_small_batches_give_the_same_result(self):
+        for hour in range(6):
+            self.paid_order([(self.sunset, 1)], hour=hour)
+
+        rollup_sales(batch_size=4, lag=NO_LAG)
+
+        self.assertEqual(self.rollup(self.sunset).orders, 6)
+
+    def test_unpaid_and_recent_orders_wait(self):
+        Order.objects.create(
+            full_name="Joe Smith",
+            email="joe@example.com",
+            address1="Main Street 1",
+            city="Stockholm",
+            country="SE",
+        )
+        recent = Order.objects.create(
+            full_name="Joe Smith",
+            email="joe@example.com",
+            address1="Main Street 1",
+            city="Stockholm",
+            country="SE",
+            is_paid=True,
+        )
+
+        self.assertIsNotNone(recent.paid_at)
+        self.assertEqual(rollup_sales(), 0)
+        self.assertEqual(rollup_sales(lag=NO_LAG), 1)
+
+    def test_deleted_products_are_kept_apart_by_name(self):
+        order = self.paid_order([(self.sunset, 1), (self.ocean, 1)])
+        order.lineitems.update(product=None)
+
+        rollup_sales(lag=NO_LAG)
+
+        self.assertEqual(
+            sorted(
+                DailySales.objects.filter(product=None).values_list(
+                    "product_name",
+                    flat=True,
+                )
+            ),
+            ["Ocean", "Sunset"],
+        )
+
+    def test_rebuild_starts_over(self):
+        self.paid_order([(self.sunset, 1)])
+        rollup_sales(lag=NO_LAG)
+        DailySales.objects.update(quantity=99)
+
+        call_command("rollup_sales", "--rebuild", stdout=io.StringIO())
+
+        self.assertEqual(DailySales.objects.get().quantity, 1)
+
+
+class SalesReportViewTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(
+            username="admin",
+            email="admin@example.com",
+            password="testpass123",
+        )
+        self.client.force_login(admin)
+        self.url = reverse("admin:orders_dailysales_report")
+        today = timezone.localdate()
+        for offset in range(3):
+            DailySales.objects.create(
+                day=today - datetime.timedelta(days=offset),
+                product_name="Sunset",
+                country="SE",
+                orders=2,
+                quantity=3,
+                revenue=Decimal("30.00"),
+            )
+
+    def test_report_reads_only_rollups(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["totals"]["quantity"], 9)
+        self.assertEqual(response.context["by_product"][0]["orders"], 6)
+        self.assertFalse(
+            any('"orders_order"' in q["sql"] for q in queries)
+        )
+        self.assertFalse(
+            any('"orders_orderlineitem"' in q["sql"] for q in queries)
+        )
+
+    def test_report_date_range(self):
+        today = timezone.localdate()
+
+        response = self.client.get(
+            self.url,
+            {"start": today.isoformat(), "end": today.isoformat()},
+        )
+
+        self.assertEqual(response.context["totals"]["revenue"], Decimal("30"))
+        self.assertContains(response, "Sales report")
+
+    def test_changelist_links_to_report(self):
+        response = self.client.get(
+            reverse("admin:orders_dailysales_changelist")
+        )
+
+        self.assertContains(response, self.url)
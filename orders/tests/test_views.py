@@ -1,10 +1,15 @@
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from fotolio.pagination import encode_cursor
 from orders.models import Order
+from orders.tests.utils import create_order
 
 
 class OrderViewsTests(TestCase):
@@ -154,3 +159,96 @@ class OrderViewsTests(TestCase):
         response = self.client.get(self.unpaid_detail_url)
 
         self.assertRedirects(response, reverse("cart:detail"))
+
+
+class OrderHistoryPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="joe",
+            password="testpass123",
+        )
+        self.client.force_login(self.user)
+
+    def create_orders(self, count, lines=2):
+        return [
+            create_order(
+                user=self.user,
+                is_paid=True,
+                lines=[(f"Print {i}", 1) for i in range(lines)],
+            )
+            for _ in range(count)
+        ]
+
+    def get_page(self, cursor=""):
+        url = reverse("orders:list")
+        if cursor:
+            url += f"?cursor={cursor}"
+        return self.client.get(url)
+
+    @patch("orders.views.ORDER_HISTORY_PAGE_SIZE", 5)
+    def test_pages_walk_history_newest_first(self):
+        orders = self.create_orders(12)
+        expected = sorted(
+            orders,
+            key=lambda o: (-o.created_at.timestamp(), o.id),
+        )
+
+        seen = []
+        cursor = ""
+        while True:
+            response = self.get_page(cursor)
+            page = response.context["orders"]
+            self.assertLessEqual(len(page), 5)
+            seen.extend(page)
+            cursor = response.context["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(seen, expected)
+
+    @patch("orders.views.ORDER_HISTORY_PAGE_SIZE", 5)
+    def test_query_count_does_not_grow_with_orders_or_items(self):
+        self.create_orders(2, lines=1)
+        self.get_page()
+        with CaptureQueriesContext(connection) as small:
+            self.get_page()
+
+        self.create_orders(10, lines=6)
+        with CaptureQueriesContext(connection) as large:
+            response = self.get_page()
+
+        self.assertEqual(len(large), len(small))
+        self.assertContains(response, "Older orders")
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        orders = self.create_orders(2)
+
+        response = self.get_page("not-a-cursor")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["orders"]), len(orders))
+        self.assertTrue(response.context["is_first_page"])
+
+    def test_cursor_with_wrong_typed_values_falls_back_to_first_page(self):
+        self.create_orders(1)
+
+        for values in [["not-a-date", 1], ["2026-01-01T00:00:00", "abc"]]:
+            response = self.get_page(encode_cursor(values))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.context["is_first_page"])
+
+    def test_order_detail_prefetches_line_items(self):
+        order = self.create_orders(1, lines=5)[0]
+        url = reverse("orders:detail", args=[order.order_number])
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertContains(response, "Print 4")
+        lineitem_queries = [
+            q for q in queries
+            if "orders_orderlineitem" in q["sql"]
+        ]
+        self.assertEqual(len(lineitem_queries), 1)
@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+from orders.models import Order, OrderLineItem
+
+
+def create_order(lines=(), created_at=None, updated_at=None, **kwargs):
+    """
+    Create an order with a line item per (product name, quantity) in
+    ``lines``, each print priced at 10.00.
+
+    ``created_at`` and ``updated_at`` are set after saving, since the
+    model fills them in itself.
+    """
+    fields = {
+        "full_name": "Joe Smith",
+        "email": "joe@example.com",
+        "address1": "Main Street 1",
+        "city": "Stockholm",
+        "country": "SE",
+    }
+    fields.update(kwargs)
+    order = Order.objects.create(**fields)
+    OrderLineItem.objects.bulk_create(
+        [
+            OrderLineItem(
+                order=order,
+                product_name=name,
+                quantity=quantity,
+                line_total=Decimal("10.00") * quantity,
+            )
+            for name, quantity in lines
+        ]
+    )
+
+    timestamps = {
+        name: value
+        for name, value in (
+            ("created_at", created_at),
+            ("updated_at", updated_at),
+        )
+        if value is not None
+    }
+    if timestamps:
+        Order.objects.filter(pk=order.pk).update(**timestamps)
+        for name, value in timestamps.items():
+            setattr(order, name, value)
+    return order
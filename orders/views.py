@@ -2,24 +2,52 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect, render
 
+from fotolio.pagination import InvalidCursor, keyset_page
+
+from .constants import ORDER_HISTORY_ORDERING, ORDER_HISTORY_PAGE_SIZE
 from .models import Order
 
 
 @login_required
 def order_list(request):
-    orders = Order.objects.filter(
-        user=request.user,
-        is_paid=True,
-    ).order_by("-created_at")
+    """
+    Show the user's paid orders one keyset page at a time, with their
+    line items prefetched in a single extra query.
+    """
+    orders = (
+        Order.objects
+        .filter(user=request.user, is_paid=True)
+        .prefetch_related("lineitems")
+    )
 
-    context = {"orders": orders}
+    cursor = request.GET.get("cursor", "").strip()
+    try:
+        page = keyset_page(
+            orders,
+            ORDER_HISTORY_ORDERING,
+            cursor=cursor,
+            page_size=ORDER_HISTORY_PAGE_SIZE,
+        )
+    except InvalidCursor:
+        cursor = ""
+        page = keyset_page(
+            orders,
+            ORDER_HISTORY_ORDERING,
+            page_size=ORDER_HISTORY_PAGE_SIZE,
+        )
+
+    context = {
+        "orders": page.items,
+        "next_cursor": page.next_cursor,
+        "is_first_page": not cursor,
+    }
     return render(request, "orders/order_list.html", context)
 
 
 @login_required
 def order_detail(request, order_number):
     order = get_object_or_404(
-        Order,
+        Order.objects.prefetch_related("lineitems"),
         order_number=order_number,
         user=request.user,
     )
@@ -0,0 +1,63 @@
+import time
+
+from django.core.cache import cache
+
+from fotolio.caching import has_shared_cache
+
+from .constants import (
+    CATALOG_CACHE_TIMEOUT,
+    CATALOG_SHARED_CACHE_TIMEOUT,
+    CATALOG_VERSION_CACHE_KEY,
+    CATEGORIES_CACHE_KEY,
+)
+from .models import Category
+
+
+def catalog_cache_timeout():
+    """
+    Return the timeout for the catalog version and catalog-derived
+    entries.
+
+    With a shared cache a bump reaches every worker, so entries are
+    kept for CATALOG_SHARED_CACHE_TIMEOUT, which only clears out the
+    entries of old versions. A per-process cache never sees other
+    workers' bumps, so there entries expire after CATALOG_CACHE_TIMEOUT.
+    """
+    if has_shared_cache():
+        return CATALOG_SHARED_CACHE_TIMEOUT
+    return CATALOG_CACHE_TIMEOUT
+
+
+def get_catalog_version():
+    return cache.get_or_set(
+        CATALOG_VERSION_CACHE_KEY,
+        time.time_ns,
+        catalog_cache_timeout(),
+    )
+
+
+def bump_catalog_version():
+    """
+    Move every catalog-derived cache entry to a fresh key.
+
+    A new token is used rather than an increment, so a version that was
+    evicted from the cache can never collide with an older one.
+    """
+    cache.set(
+        CATALOG_VERSION_CACHE_KEY,
+        time.time_ns(),
+        catalog_cache_timeout(),
+    )
+
+
+def get_categories():
+    """
+    Return all categories in gallery chip order, cached per catalog
+    version.
+    """
+    key = f"{CATEGORIES_CACHE_KEY}:{get_catalog_version()}"
+    categories = cache.get(key)
+    if categories is None:
+        categories = list(Category.objects.order_by("friendly_name", "name"))
+        cache.set(key, categories, catalog_cache_timeout())
+    return categories
@@ -14,3 +14,55 @@ AVAILABLE_SIZES = [
         "price": 179.00,
     },
 ]
+
+# "You may also like" teaser strip
+TEASER_COUNT = 10
+TEASER_POOL_SIZE = 200
+TEASER_POOL_TIMEOUT = 60 * 10
+TEASER_POOL_CACHE_KEY = "products:teaser_pool"
+
+# Pre-rendered teaser strip variants
+TEASER_STRIP_VARIANTS = 5
+TEASER_STRIP_TIMEOUT = 60 * 10
+TEASER_STRIP_CACHE_KEY = "products:teaser_strip"
+
+# Catalog-derived caches, keyed by catalog version
+CATALOG_VERSION_CACHE_KEY = "products:catalog_version"
+CATEGORIES_CACHE_KEY = "products:categories"
+# How long a worker with a per-process cache may serve catalog data
+# that another worker has already invalidated.
+CATALOG_CACHE_TIMEOUT = 60
+# How long a shared cache keeps them. Every bump leaves the entries of
+# the old version behind, so they have to expire.
+CATALOG_SHARED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Gallery search
+SEARCH_CONFIG = "english"
+SEARCH_FTS_TABLE = "products_product_fts"
+SEARCH_BATCH_SIZE = 500
+
+# Gallery listing
+GALLERY_PAGE_SIZE = 24
+
+# Product detail review feed
+REVIEW_PAGE_SIZE = 10
+REVIEW_ORDERING = ["-created_at", "id"]
+
+# "Customers also bought" recommendations
+RECOMMENDATION_COUNT = 10
+RECOMMENDATION_BATCH_SIZE = 2000
+RECOMMENDATION_REFRESH_CHUNK = 500
+# Baskets bigger than this add no pairs; they say little about taste
+# and their pair count grows with the square of their size.
+RECOMMENDATION_MAX_BASKET = 50
+RECOMMENDATION_WATERMARK = "co_purchase"
+RECOMMENDATION_STRIP_CACHE_KEY = "products:recommendation_strip"
+POPULAR_PRODUCTS_CACHE_KEY = "products:popular"
+POPULAR_PRODUCTS_COUNT = 50
+
+# Sitemaps
+# URLs per sitemap page; well under the protocol's 50,000 URL and 50 MB
+# limits, even with an image entry per product.
+SITEMAP_PAGE_SIZE = 10000
+SITEMAP_CACHE_KEY = "products:sitemap"
+SITEMAP_CACHE_TIMEOUT = 60 * 60
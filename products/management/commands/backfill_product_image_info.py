@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from fotolio.media_migration import ImageInfoBackfillCommand
+from products.catalog import bump_catalog_version
+from products.models import Product
+
+
+class Command(ImageInfoBackfillCommand):
+    help = (
+        "Store the dimensions, dominant colour and placeholder of "
+        "product images that do not have them yet."
+    )
+
+    model = Product
+    field_name = "image"
+
+    def updated(self):
+        # Cached cards were rendered without the new facts.
+        bump_catalog_version()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models.fields.files import ImageFieldFile
+from django.template import Context, Template
+
+from fotolio.images import cloudinary_renditions
+from products.models import Product
+
+CARD_TEMPLATE = Template(
+    "{% for image in images %}"
+    '<img src="{{ image.url }}" alt="">'
+    "{% endfor %}"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the cost per product card of building Cloudinary URLs "
+        "with MediaCloudinaryStorage and with the URL-caching storage. "
+        "Needs Cloudinary credentials but makes no requests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cards",
+            type=int,
+            default=500,
+            help="Product cards rendered per page.",
+        )
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=20,
+            help="Times each page is rendered.",
+        )
+
+    def handle(self, *args, **options):
+        # Imported here: cloudinary_storage reads credentials on import.
+        from cloudinary_storage.storage import MediaCloudinaryStorage
+
+        from fotolio.storage import CachedMediaCloudinaryStorage
+
+        cards = options["cards"]
+        pages = options["pages"]
+        names = [f"products/benchmark-print-{i}_a1b2c3" for i in range(cards)]
+
+        for label, storage in (
+            ("uncached", MediaCloudinaryStorage()),
+            ("cached", CachedMediaCloudinaryStorage()),
+        ):
+            images = self.images(storage, names)
+
+            start = time.perf_counter()
+            for _ in range(pages):
+                CARD_TEMPLATE.render(Context({"images": images}))
+            url_us = self.per_card(start, cards * pages)
+
+            start = time.perf_counter()
+            for _ in range(pages):
+                for name in names:
+                    cloudinary_renditions(storage, name)
+            srcset_us = self.per_card(start, cards * pages)
+
+            stats = getattr(storage, "url_cache_stats", None)
+            counters = (
+                " ".join(f"{k}={v}" for k, v in stats.snapshot().items())
+                if stats
+                else ""
+            )
+            self.stdout.write(
+                f"{label}: "
+                f"url={url_us:.1f}us/card "
+                f"srcset={srcset_us:.1f}us/card "
+                f"{counters}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def images(self, storage, names):
+        field = Product._meta.get_field("image")
+        images = []
+        for name in names:
+            image = ImageFieldFile(Product(), field, name)
+            image.storage = storage
+            images.append(image)
+        return images
+
+    def per_card(self, start, count):
+        return (time.perf_counter() - start) * 1_000_000 / count
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import datetime
+import itertools
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order, OrderLineItem
+from products.models import Product, ProductNeighbour
+from products.recommendations import (
+    build_recommendations,
+    reset_recommendations,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a catalog and paid orders, build the co-purchase "
+        "recommendations from scratch and then incrementally, and "
+        "report the timings. All seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=100_000,
+            help="Paid orders to seed.",
+        )
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=2000,
+            help="Products to seed.",
+        )
+        parser.add_argument(
+            "--max-items",
+            type=int,
+            default=6,
+            help="Most distinct products per seeded order.",
+        )
+        parser.add_argument(
+            "--increment",
+            type=int,
+            default=1000,
+            help="Orders added before the incremental run.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=1,
+            help="Random seed for the seeded baskets.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        self.numbers = itertools.count()
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            products = self.seed_products(options["products"])
+            self.seed_orders(
+                rng,
+                products,
+                options["orders"],
+                options["max_items"],
+            )
+            seed_s = time.perf_counter() - start
+            self.stdout.write(
+                f"seeded orders={options['orders']} "
+                f"products={len(products)} in {seed_s:.1f}s"
+            )
+
+            reset_recommendations()
+            self.run("full", options["orders"])
+
+            self.seed_orders(
+                rng,
+                products,
+                options["increment"],
+                options["max_items"],
+            )
+            self.run("incremental", options["increment"])
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def run(self, label, expected):
+        start = time.perf_counter()
+        processed, refreshed = build_recommendations(
+            lag=datetime.timedelta(0),
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"run={label} orders={processed} "
+            f"products_refreshed={refreshed} "
+            f"neighbours={ProductNeighbour.objects.count()} "
+            f"elapsed={elapsed:.1f}s"
+        )
+        if processed != expected:
+            self.stderr.write(f"expected {expected} orders")
+
+    def seed_products(self, count):
+        return Product.objects.bulk_create(
+            [
+                Product(
+                    name=f"Benchmark print {n}",
+                    description="Benchmark",
+                    price=Decimal("89.00"),
+                )
+                for n in range(count)
+            ],
+            batch_size=1000,
+        )
+
+    def seed_orders(self, rng, products, count, max_items):
+        # Popularity follows a long tail, like a real catalog.
+        weights = [1 / (rank + 1) for rank in range(len(products))]
+        paid_at = timezone.now() - datetime.timedelta(hours=1)
+        batch = 1000
+
+        for first in range(0, count, batch):
+            orders = Order.objects.bulk_create(
+                [
+                    Order(
+                        order_number=f"BENCH-{next(self.numbers):08d}",
+                        full_name="Benchmark",
+                        email="benchmark@example.com",
+                        address1="Benchmark street 1",
+                        city="Benchmark",
+                        country="SE",
+                        total=Decimal("356.00"),
+                        is_paid=True,
+                        paid_at=paid_at,
+                    )
+                    for _ in range(min(batch, count - first))
+                ]
+            )
+            items = []
+            for order in orders:
+                size = rng.randint(1, max_items)
+                picked = set(rng.choices(products, weights, k=size))
+                items += [
+                    OrderLineItem(
+                        order=order,
+                        product=product,
+                        product_name=product.name,
+                        quantity=1,
+                        line_total=product.price,
+                    )
+                    for product in picked
+                ]
+            OrderLineItem.objects.bulk_create(items, batch_size=1000)
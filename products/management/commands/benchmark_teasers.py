@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from products.models import Product
+from products.teasers import get_teaser_products, invalidate_teaser_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare order_by('?') teaser selection with the cached teaser "
+        "pool on a seeded catalog. All seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[1000, 10000, 100000],
+            help="Catalog sizes to benchmark.",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=50,
+            help="Teaser selections per approach and size.",
+        )
+
+    def handle(self, *args, **options):
+        runs = options["runs"]
+
+        for size in options["sizes"]:
+            with transaction.atomic():
+                self.seed(size)
+                invalidate_teaser_pool()
+
+                random_ms = self.time_runs(
+                    lambda: list(Product.objects.order_by("?")[:10]),
+                    runs,
+                )
+
+                # First call builds the pool, later calls hit the cache.
+                start = time.perf_counter()
+                get_teaser_products()
+                build_ms = (time.perf_counter() - start) * 1000
+                pool_ms = self.time_runs(get_teaser_products, runs)
+
+                transaction.set_rollback(True)
+
+            invalidate_teaser_pool()
+
+            self.stdout.write(
+                f"products={size} "
+                f"order_by_random={random_ms:.2f}ms "
+                f"pool_build={build_ms:.2f}ms "
+                f"pool_sample={pool_ms:.2f}ms"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def seed(self, size):
+        Product.objects.bulk_create(
+            [
+                Product(
+                    name=f"Benchmark print {i}",
+                    description="Benchmark product.",
+                    price=Decimal("89.00"),
+                )
+                for i in range(size)
+            ],
+            batch_size=1000,
+        )
+
+    def time_runs(self, func, runs):
+        start = time.perf_counter()
+        for _ in range(runs):
+            func()
+        return (time.perf_counter() - start) * 1000 / runs
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from products.constants import RECOMMENDATION_BATCH_SIZE
+from products.models import CoPurchase
+from products.catalog import bump_catalog_version
+from products.recommendations import (
+    build_recommendations,
+    refresh_neighbours,
+    reset_recommendations,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Count co-purchases in orders paid since the last run and "
+        "refresh the \"customers also bought\" neighbours of the "
+        "products involved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RECOMMENDATION_BATCH_SIZE,
+            help="Orders processed per transaction.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop all counts and rebuild them from every paid order.",
+        )
+        parser.add_argument(
+            "--refresh-all",
+            action="store_true",
+            help="Recompute the neighbours of every product sold.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            reset_recommendations()
+
+        processed, refreshed = build_recommendations(
+            batch_size=options["batch_size"],
+        )
+        if options["refresh_all"]:
+            refreshed = refresh_neighbours(
+                product_ids=(
+                    CoPurchase.objects
+                    .filter(product=F("other"))
+                    .values_list("product_id", flat=True)
+                ),
+            )
+            if refreshed:
+                bump_catalog_version()
+
+        msg = (
+            "Done. "
+            f"rebuild={options['rebuild']} "
+            f"orders={processed} "
+            f"products={refreshed}"
+        )
+        self.stdout.write(self.style.SUCCESS(msg))
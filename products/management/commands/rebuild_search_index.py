@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from products.constants import SEARCH_BATCH_SIZE
+from products.models import Product
+from products.search import get_search_backend, refresh_search_documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Product search documents and rebuild the "
+        "full-text search index in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SEARCH_BATCH_SIZE,
+            help="Products processed per batch.",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.clear()
+
+        indexed = refresh_search_documents(
+            Product.objects.all(),
+            batch_size=options["batch_size"],
+        )
+
+        msg = (
+            "Done. "
+            f"backend={type(backend).__name__} "
+            f"indexed={indexed}"
+        )
+        self.stdout.write(self.style.SUCCESS(msg))
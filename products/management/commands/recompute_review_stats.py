@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from products.ratings import recompute_review_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Product review counts, rating totals, histograms "
+        "and average ratings from ProductReview rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Products processed per batch.",
+        )
+
+    def handle(self, *args, **options):
+        checked, fixed = recompute_review_stats(
+            Product.objects.all(),
+            batch_size=options["batch_size"],
+        )
+
+        msg = (
+            "Done. "
+            f"checked={checked} "
+            f"fixed={fixed}"
+        )
+        self.stdout.write(self.style.SUCCESS(msg))
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.24 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+FTS_TABLE = "products_product_fts"
+GIN_INDEX = "products_search_gin"
+SEARCH_CONFIG = "english"
+BATCH_SIZE = 500
+
+
+def build_documents(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    products = Product.objects.select_related("category").order_by("pk")
+    batch = []
+    for product in products.iterator(chunk_size=BATCH_SIZE):
+        parts = [product.name, product.description]
+        if product.category:
+            parts += [
+                product.category.name,
+                product.category.friendly_name,
+            ]
+        product.search_document = "\n".join(p for p in parts if p)
+        batch.append(product)
+        if len(batch) >= BATCH_SIZE:
+            Product.objects.bulk_update(batch, ["search_document"])
+            batch = []
+    if batch:
+        Product.objects.bulk_update(batch, ["search_document"])
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "search_document, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, search_document) "
+            "SELECT id, search_document FROM products_product"
+        )
+    elif vendor == "postgresql":
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+
+        Product = apps.get_model("products", "Product")
+        schema_editor.add_index(
+            Product,
+            GinIndex(
+                SearchVector("search_document", config=SEARCH_CONFIG),
+                name=GIN_INDEX,
+            ),
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0002_productreview"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_document",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
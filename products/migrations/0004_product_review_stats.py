@@ -0,0 +1,94 @@
+# Generated by Django 4.2.24 on 2026-10-18 11:00
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def compute_review_stats(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    ProductReview = apps.get_model("products", "ProductReview")
+
+    rows = (
+        ProductReview.objects
+        .values("product")
+        .annotate(
+            review_count=Count("id"),
+            rating_sum=Sum("rating"),
+            **{
+                f"rating_{stars}_count": Count("id", filter=Q(rating=stars))
+                for stars in range(1, 6)
+            },
+        )
+    )
+    stats = {row.pop("product"): row for row in rows}
+
+    products = []
+    for product in Product.objects.filter(pk__in=stats.keys()):
+        for field, value in stats[product.pk].items():
+            setattr(product, field, value)
+        product.rating = (
+            Decimal(product.rating_sum) / product.review_count
+        ).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        products.append(product)
+
+    Product.objects.bulk_update(
+        products,
+        [
+            "rating",
+            "review_count",
+            "rating_sum",
+            *[f"rating_{stars}_count" for stars in range(1, 6)],
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0003_product_search_document"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="review_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_1_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_2_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_3_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_4_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_5_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            compute_review_stats,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -54,9 +54,69 @@ class Product(models.Model):
         blank=True,
     )
 
+    # Image facts, maintained by fotolio.images so pages can reserve the
+    # image's space and paint a placeholder before it loads.
+    image_width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    image_height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    image_color = models.CharField(
+        max_length=7,
+        blank=True,
+        editable=False,
+    )
+    image_placeholder = models.TextField(
+        blank=True,
+        editable=False,
+    )
+    search_document = models.TextField(
+        blank=True,
+        editable=False,
+    )
+
+    # Review aggregates, maintained by products.ratings.
+    # ``rating`` above holds the average of the review ratings.
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.search_document = self.build_search_document()
+        super().save(*args, **kwargs)
+
+    def build_search_document(self):
+        """
+        Flatten the searchable text of the product and its category.
+        """
+        parts = [self.name, self.description]
+        if self.category:
+            parts += [self.category.name, self.category.friendly_name]
+        return "\n".join(part for part in parts if part)
+
+    def rating_histogram(self):
+        """
+        Return (stars, count) pairs from 5 stars down to 1.
+        """
+        return [
+            (stars, getattr(self, f"rating_{stars}_count"))
+            for stars in range(5, 0, -1)
+        ]
+
 
 class ProductReview(models.Model):
     product = models.ForeignKey(
@@ -79,6 +139,86 @@ class ProductReview(models.Model):
     class Meta:
         unique_together = ("product", "user")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["product", "created_at"],
+                name="productreview_feed_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.product} - {self.user} ({self.rating}/5)"
+
+
+class CoPurchase(models.Model):
+    """
+    How many paid orders contained both ``product`` and ``other``.
+
+    Pairs are stored in both directions. The row where ``other`` is the
+    product itself counts all paid orders of that product, and its
+    ``stale`` flag marks products whose neighbours need recomputing.
+    Maintained by products.recommendations.
+    """
+
+    product = models.ForeignKey(
+        "Product",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    other = models.ForeignKey(
+        "Product",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    orders = models.PositiveIntegerField(default=0)
+    stale = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "other"],
+                name="copurchase_pair_key",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["product"],
+                condition=models.Q(stale=True),
+                name="copurchase_stale_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} + {self.other_id}: {self.orders}"
+
+
+class ProductNeighbour(models.Model):
+    """
+    One of the products most often bought together with ``product``,
+    ``rank`` 0 being the closest.
+    """
+
+    product = models.ForeignKey(
+        "Product",
+        on_delete=models.CASCADE,
+        related_name="neighbours",
+    )
+    neighbour = models.ForeignKey(
+        "Product",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ["product", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "rank"],
+                name="productneighbour_rank_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.neighbour_id} ({self.score:.3f})"
@@ -0,0 +1,128 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import Product, ProductReview
+
+RATING_COUNT_FIELDS = [f"rating_{stars}_count" for stars in range(1, 6)]
+STATS_FIELDS = ["review_count", "rating_sum", *RATING_COUNT_FIELDS]
+
+
+def average_rating(rating_sum, review_count):
+    if not review_count:
+        return None
+    return (Decimal(rating_sum) / review_count).quantize(
+        Decimal("0.01"),
+        rounding=ROUND_HALF_UP,
+    )
+
+
+def _apply(product_id, **changes):
+    """
+    Apply F() increments to a product's review aggregates, then store
+    the average of the new totals in ``rating``.
+
+    The first UPDATE holds the row lock until the transaction ends, so
+    the totals read back cannot be changed by a concurrent review.
+    """
+    with transaction.atomic():
+        products = Product.objects.filter(pk=product_id)
+        products.update(
+            **{field: F(field) + delta for field, delta in changes.items()}
+        )
+        totals = products.values_list("rating_sum", "review_count").first()
+        if totals:
+            products.update(rating=average_rating(*totals))
+
+
+def review_added(product_id, rating):
+    _apply(
+        product_id,
+        review_count=1,
+        rating_sum=rating,
+        **{f"rating_{rating}_count": 1},
+    )
+
+
+def review_removed(product_id, rating):
+    _apply(
+        product_id,
+        review_count=-1,
+        rating_sum=-rating,
+        **{f"rating_{rating}_count": -1},
+    )
+
+
+def review_changed(product_id, old_rating, new_rating):
+    if old_rating == new_rating:
+        return
+    _apply(
+        product_id,
+        rating_sum=new_rating - old_rating,
+        **{
+            f"rating_{old_rating}_count": -1,
+            f"rating_{new_rating}_count": 1,
+        },
+    )
+
+
+def recompute_review_stats(queryset, batch_size=500):
+    """
+    Recompute review aggregates from ProductReview rows, in batches of
+    products, and write back only the products that drifted.
+
+    Returns (checked, fixed) product counts.
+    """
+    checked = 0
+    fixed = 0
+    last_pk = 0
+
+    while True:
+        products = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", "rating", *STATS_FIELDS)[:batch_size]
+        )
+        if not products:
+            return checked, fixed
+        last_pk = products[-1].pk
+
+        stats = {
+            row.pop("product"): row
+            for row in (
+                ProductReview.objects
+                .filter(product__in=products)
+                .values("product")
+                .annotate(
+                    review_count=Count("id"),
+                    rating_sum=Sum("rating"),
+                    **{
+                        f"rating_{stars}_count": Count(
+                            "id",
+                            filter=Q(rating=stars),
+                        )
+                        for stars in range(1, 6)
+                    },
+                )
+            )
+        }
+
+        changed = []
+        for product in products:
+            row = stats.get(product.pk, {})
+            expected = {field: row.get(field, 0) for field in STATS_FIELDS}
+            expected["rating"] = average_rating(
+                expected["rating_sum"],
+                expected["review_count"],
+            )
+            if any(getattr(product, k) != v for k, v in expected.items()):
+                for field, value in expected.items():
+                    setattr(product, field, value)
+                changed.append(product)
+
+        if changed:
+            Product.objects.bulk_update(changed, ["rating", *STATS_FIELDS])
+
+        checked += len(products)
+        fixed += len(changed)
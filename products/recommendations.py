@@ -0,0 +1,308 @@
+import heapq
+import itertools
+import math
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from fotolio.db import can_upsert, upsert
+from orders.models import OrderLineItem, RollupWatermark
+from orders.rollups import ROLLUP_SAFETY_LAG, scan_paid_orders
+
+from .catalog import (
+    bump_catalog_version,
+    catalog_cache_timeout,
+    get_catalog_version,
+)
+from .constants import (
+    POPULAR_PRODUCTS_CACHE_KEY,
+    POPULAR_PRODUCTS_COUNT,
+    RECOMMENDATION_BATCH_SIZE,
+    RECOMMENDATION_COUNT,
+    RECOMMENDATION_MAX_BASKET,
+    RECOMMENDATION_REFRESH_CHUNK,
+    RECOMMENDATION_STRIP_CACHE_KEY,
+    RECOMMENDATION_WATERMARK,
+    TEASER_STRIP_TIMEOUT,
+)
+from .models import CoPurchase, Product, ProductNeighbour
+from .teasers import get_teaser_products
+
+
+def build_recommendations(
+    batch_size=RECOMMENDATION_BATCH_SIZE,
+    lag=ROLLUP_SAFETY_LAG,
+):
+    """
+    Count co-purchases in orders paid since the last run and refresh
+    the neighbours of every product they touched.
+
+    Each batch of orders adds its pair counts and flags the products it
+    touched as stale with the watermark move, so an interrupted run
+    never loses a stale product. Returns (orders processed, products
+    refreshed).
+    """
+    processed = scan_paid_orders(
+        RECOMMENDATION_WATERMARK,
+        _count_orders,
+        batch_size=batch_size,
+        lag=lag,
+    )
+    refreshed = refresh_neighbours()
+    if refreshed:
+        bump_catalog_version()
+    return processed, refreshed
+
+
+def reset_recommendations():
+    """
+    Drop all counts so the next run rebuilds them from every order.
+    """
+    with transaction.atomic():
+        ProductNeighbour.objects.all().delete()
+        CoPurchase.objects.all().delete()
+        RollupWatermark.objects.filter(
+            name=RECOMMENDATION_WATERMARK,
+        ).delete()
+
+
+def _count_orders(orders):
+    baskets = _baskets([order["id"] for order in orders])
+    _add_pair_counts(count_pairs(baskets.values()))
+
+
+def _baskets(order_ids):
+    baskets = defaultdict(set)
+    items = (
+        OrderLineItem.objects
+        .filter(order_id__in=order_ids, product__isnull=False)
+        .values_list("order_id", "product_id")
+    )
+    for order_id, product_id in items:
+        baskets[order_id].add(product_id)
+    return baskets
+
+
+def count_pairs(baskets, max_basket=RECOMMENDATION_MAX_BASKET):
+    """
+    Count (product, other) pairs over ``baskets`` of product ids.
+
+    Every basket counts once for each product in it, under
+    (product, product). Baskets of up to ``max_basket`` products also
+    count every ordered pair of distinct products.
+    """
+    counts = Counter()
+    for basket in baskets:
+        if len(basket) > max_basket:
+            counts.update((pk, pk) for pk in basket)
+        else:
+            counts.update(itertools.product(basket, repeat=2))
+    return counts
+
+
+def _add_pair_counts(counts):
+    """
+    Add ``counts`` to CoPurchase and flag the products involved stale.
+
+    On SQLite and PostgreSQL every pair is one INSERT ... ON CONFLICT
+    DO UPDATE, sent with executemany. Other backends read the existing
+    rows and write them back in bulk, which is safe because the run
+    holds the watermark lock.
+    """
+    if can_upsert():
+        upsert(
+            CoPurchase,
+            ["product_id", "other_id", "orders", "stale"],
+            [
+                (product_id, other_id, added, product_id == other_id)
+                for (product_id, other_id), added in counts.items()
+            ],
+            conflict=["product_id", "other_id"],
+            updates={"orders": "{old} + {new}", "stale": "{old} OR {new}"},
+        )
+    else:
+        _merge_pair_counts(counts)
+
+
+def _merge_pair_counts(counts):
+    product_ids = {product_id for product_id, _ in counts}
+    existing = {}
+    for chunk in _chunks(product_ids, RECOMMENDATION_REFRESH_CHUNK):
+        rows = CoPurchase.objects.filter(product_id__in=chunk).only(
+            "id", "product_id", "other_id", "orders", "stale",
+        )
+        for row in rows:
+            if (row.product_id, row.other_id) in counts:
+                existing[row.product_id, row.other_id] = row
+
+    changed = []
+    created = []
+    for (product_id, other_id), added in counts.items():
+        stale = product_id == other_id
+        row = existing.get((product_id, other_id))
+        if row is None:
+            created.append(
+                CoPurchase(
+                    product_id=product_id,
+                    other_id=other_id,
+                    orders=added,
+                    stale=stale,
+                )
+            )
+        else:
+            row.orders += added
+            row.stale = row.stale or stale
+            changed.append(row)
+
+    CoPurchase.objects.bulk_update(
+        changed,
+        ["orders", "stale"],
+        batch_size=500,
+    )
+    CoPurchase.objects.bulk_create(created, batch_size=500)
+
+
+def refresh_neighbours(count=RECOMMENDATION_COUNT, product_ids=None):
+    """
+    Recompute the top ``count`` neighbours of stale products, or of
+    ``product_ids`` when given. Returns the number of products done.
+
+    Neighbours are ranked by cosine similarity over paid orders:
+    co-purchases divided by the geometric mean of both order counts,
+    so best sellers do not crowd out every list. Scores of products
+    that were not refreshed drift slightly as their partners sell;
+    refreshing every product now and then puts them right.
+    """
+    orders_of = dict(
+        CoPurchase.objects
+        .filter(product=F("other"))
+        .values_list("product_id", "orders")
+    )
+    if product_ids is None:
+        product_ids = (
+            CoPurchase.objects
+            .filter(stale=True)
+            .values_list("product_id", flat=True)
+        )
+    product_ids = sorted(set(product_ids))
+
+    for chunk in _chunks(product_ids, RECOMMENDATION_REFRESH_CHUNK):
+        candidates = defaultdict(list)
+        rows = (
+            CoPurchase.objects
+            .filter(product_id__in=chunk)
+            .exclude(other=F("product"))
+            .values_list("product_id", "other_id", "orders")
+        )
+        for product_id, other_id, together in rows:
+            score = together / math.sqrt(
+                orders_of[product_id] * orders_of[other_id]
+            )
+            candidates[product_id].append((score, -other_id))
+
+        neighbours = []
+        for product_id, scored in candidates.items():
+            top = heapq.nlargest(count, scored)
+            neighbours += [
+                ProductNeighbour(
+                    product_id=product_id,
+                    neighbour_id=-negated_id,
+                    rank=rank,
+                    score=score,
+                )
+                for rank, (score, negated_id) in enumerate(top)
+            ]
+
+        with transaction.atomic():
+            ProductNeighbour.objects.filter(product_id__in=chunk).delete()
+            ProductNeighbour.objects.bulk_create(neighbours, batch_size=500)
+            CoPurchase.objects.filter(
+                product_id__in=chunk,
+                stale=True,
+            ).update(stale=False)
+
+    return len(product_ids)
+
+
+def _chunks(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def get_popular_product_ids():
+    """
+    Return the ids of the products in the most paid orders, cached per
+    catalog version.
+    """
+    key = f"{POPULAR_PRODUCTS_CACHE_KEY}:{get_catalog_version()}"
+    pks = cache.get(key)
+    if pks is None:
+        pks = list(
+            CoPurchase.objects
+            .filter(product=F("other"))
+            .order_by("-orders", "product_id")
+            .values_list("product_id", flat=True)[:POPULAR_PRODUCTS_COUNT]
+        )
+        cache.set(key, pks, catalog_cache_timeout())
+    return pks
+
+
+def get_recommended_products(product, count=RECOMMENDATION_COUNT):
+    """
+    Return up to ``count`` products bought together with ``product``.
+
+    The precomputed neighbours come first, topped up with popular
+    products and, while the shop has too few sales for either, with
+    random teaser products.
+    """
+    picked = list(
+        ProductNeighbour.objects
+        .filter(product=product)
+        .order_by("rank")
+        .values_list("neighbour_id", flat=True)[:count]
+    )
+    seen = set(picked) | {product.pk}
+    for pk in get_popular_product_ids():
+        if len(picked) >= count:
+            break
+        if pk not in seen:
+            picked.append(pk)
+            seen.add(pk)
+
+    by_pk = Product.objects.select_related("category").in_bulk(picked)
+    products = [by_pk[pk] for pk in picked if pk in by_pk]
+
+    if len(products) < count:
+        products += [
+            teaser
+            for teaser in get_teaser_products(exclude_pk=product.pk)
+            if teaser.pk not in seen
+        ][:count - len(products)]
+    return products
+
+
+def render_recommendation_strip(product):
+    """
+    Return the rendered "You may also like" strip for ``product``.
+
+    It is cached per catalog version, which build_recommendations
+    bumps, and expires like the teaser strip so any random top-up
+    keeps rotating.
+    """
+    key = (
+        f"{RECOMMENDATION_STRIP_CACHE_KEY}:{get_catalog_version()}:"
+        f"{product.pk}"
+    )
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(
+            "includes/product_teaser_strip.html",
+            {"teaser_products": get_recommended_products(product)},
+        )
+        cache.set(key, html, TEASER_STRIP_TIMEOUT)
+    return mark_safe(html)
@@ -0,0 +1,52 @@
+from django.db.models import BooleanField, Case, Value, When
+
+from fotolio.pagination import KeysetPage, cursor_for, keyset_page
+
+from .constants import REVIEW_ORDERING, REVIEW_PAGE_SIZE
+
+
+def get_review_page(product, user, cursor=None, page_size=None):
+    """
+    Return (page, user_review) for the product's review feed.
+
+    The signed-in user's own review is pinned above the feed and left
+    out of it. On the first page it is fetched in the same query as
+    the reviews, by sorting it ahead of everything else.
+    Raises InvalidCursor for a cursor that cannot be decoded.
+    """
+    page_size = page_size or REVIEW_PAGE_SIZE
+    reviews = product.reviews.select_related("user", "user__profile")
+
+    if not user.is_authenticated:
+        return keyset_page(reviews, REVIEW_ORDERING, cursor, page_size), None
+
+    if cursor:
+        page = keyset_page(
+            reviews.exclude(user=user),
+            REVIEW_ORDERING,
+            cursor,
+            page_size,
+        )
+        return page, None
+
+    rows = list(
+        reviews
+        .annotate(
+            is_mine=Case(
+                When(user=user, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
+        .order_by("-is_mine", *REVIEW_ORDERING)[:page_size + 2]
+    )
+
+    user_review = None
+    if rows and rows[0].is_mine:
+        user_review = rows.pop(0)
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = cursor_for(rows[-1], REVIEW_ORDERING)
+    return KeysetPage(rows, next_cursor), user_review
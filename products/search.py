@@ -0,0 +1,207 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.utils.module_loading import import_string
+
+from .constants import SEARCH_BATCH_SIZE, SEARCH_CONFIG, SEARCH_FTS_TABLE
+from .models import Product
+
+
+class SearchBackend:
+    """
+    Portable fallback: substring match on the denormalized document.
+
+    Every term has to appear in the document. Results are not ranked:
+    every match gets the same search_rank, so callers can order by it
+    whichever backend is in use.
+    """
+
+    def search(self, queryset, query):
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return self.no_results(queryset)
+        for term in terms:
+            queryset = queryset.filter(search_document__icontains=term)
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    def no_results(self, queryset):
+        return queryset.none().annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    def index(self, products):
+        pass
+
+    def remove(self, pks):
+        pass
+
+    def clear(self):
+        pass
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    SQLite FTS5 table keyed by product id, ranked with bm25().
+    """
+
+    def search(self, queryset, query):
+        match = self.build_match(query)
+        if not match:
+            return self.no_results(queryset)
+
+        product_id = (
+            f'"{Product._meta.db_table}"."{Product._meta.pk.column}"'
+        )
+        matching_ids = RawSQL(
+            f"SELECT rowid FROM {SEARCH_FTS_TABLE} "
+            f"WHERE {SEARCH_FTS_TABLE} MATCH %s",
+            (match,),
+        )
+        rank = RawSQL(
+            f"SELECT -bm25({SEARCH_FTS_TABLE}) FROM {SEARCH_FTS_TABLE} "
+            f"WHERE {SEARCH_FTS_TABLE} MATCH %s "
+            f"AND rowid = {product_id}",
+            (match,),
+            output_field=FloatField(),
+        )
+        return (
+            queryset
+            .filter(pk__in=matching_ids)
+            .annotate(search_rank=rank)
+            .order_by("-search_rank", "name")
+        )
+
+    def build_match(self, query):
+        """
+        Turn free text into an FTS5 query of quoted prefix terms.
+
+        Quoting every term keeps FTS5 operators typed by the user from
+        being interpreted, so any input is a valid MATCH expression.
+        """
+        terms = re.findall(r"\w+", query)
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def index(self, products):
+        rows = [(p.pk, p.search_document) for p in products]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SEARCH_FTS_TABLE} WHERE rowid = %s",
+                [(pk,) for pk, _ in rows],
+            )
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_FTS_TABLE} (rowid, search_document) "
+                "VALUES (%s, %s)",
+                rows,
+            )
+
+    def remove(self, pks):
+        if not pks:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SEARCH_FTS_TABLE} WHERE rowid = %s",
+                [(pk,) for pk in pks],
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_FTS_TABLE}")
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    PostgreSQL full-text search backed by a GIN expression index.
+
+    The index is built on the same SearchVector used here, so the
+    database maintains it on every write and no sync step is needed.
+    The rank is cast from real to double precision, so it survives the
+    round trip through a keyset cursor unrounded.
+    """
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVector,
+        )
+
+        if not query.strip():
+            return self.no_results(queryset)
+
+        vector = SearchVector("search_document", config=SEARCH_CONFIG)
+        search_query = SearchQuery(
+            query,
+            config=SEARCH_CONFIG,
+            search_type="websearch",
+        )
+        return (
+            queryset
+            .annotate(search=vector)
+            .filter(search=search_query)
+            .annotate(
+                search_rank=Cast(
+                    SearchRank(vector, search_query),
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("-search_rank", "name")
+        )
+
+
+VENDOR_BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Return the backend named by PRODUCT_SEARCH_BACKEND, or the one that
+    matches the default database.
+    """
+    path = getattr(settings, "PRODUCT_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, SearchBackend)()
+
+
+def search_products(queryset, query):
+    return get_search_backend().search(queryset, query)
+
+
+def refresh_search_documents(queryset, batch_size=SEARCH_BATCH_SIZE):
+    """
+    Rebuild the search document of every product in ``queryset``.
+
+    Products are streamed and written back in batches, so memory use
+    does not grow with the catalog. Returns the number of products.
+    """
+    backend = get_search_backend()
+    products = queryset.select_related("category").order_by("pk")
+    count = 0
+    batch = []
+
+    for product in products.iterator(chunk_size=batch_size):
+        product.search_document = product.build_search_document()
+        batch.append(product)
+        if len(batch) >= batch_size:
+            count += _write_batch(backend, batch)
+            batch = []
+
+    if batch:
+        count += _write_batch(backend, batch)
+    return count
+
+
+def _write_batch(backend, batch):
+    Product.objects.bulk_update(batch, ["search_document"])
+    backend.index(batch)
+    return len(batch)
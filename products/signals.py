@@ -0,0 +1,96 @@
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from fotolio.images import refresh_image_info
+
+from .catalog import bump_catalog_version
+from . import ratings
+from .models import Category, Product, ProductReview
+from .search import get_search_backend, refresh_search_documents
+from .teasers import invalidate_teaser_pool
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, instance, **kwargs):
+    """
+    Drop cached product data whenever the catalog changes.
+    """
+    invalidate_teaser_pool()
+    bump_catalog_version()
+
+
+@receiver(pre_save, sender=Product)
+def describe_product_image(sender, instance, **kwargs):
+    refresh_image_info(instance, "image")
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """
+    Category names are shown on product cards, so re-render them.
+    """
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_products(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search_documents(instance.products.all())
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_products(sender, instance, **kwargs):
+    # Products are detached with a bulk UPDATE, so note them beforehand.
+    instance._search_product_ids = list(
+        instance.products.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Category)
+def reindex_detached_products(sender, instance, **kwargs):
+    product_ids = getattr(instance, "_search_product_ids", [])
+    if product_ids:
+        refresh_search_documents(Product.objects.filter(pk__in=product_ids))
+
+
+@receiver(post_init, sender=ProductReview)
+def remember_review_rating(sender, instance, **kwargs):
+    # The rating as stored, so edits can move it between histogram buckets.
+    instance._stored_rating = instance.rating if instance.pk else None
+
+
+@receiver(post_save, sender=ProductReview)
+def update_review_stats_on_save(sender, instance, created, **kwargs):
+    if created:
+        ratings.review_added(instance.product_id, instance.rating)
+    elif instance._stored_rating is not None:
+        ratings.review_changed(
+            instance.product_id,
+            instance._stored_rating,
+            instance.rating,
+        )
+    instance._stored_rating = instance.rating
+
+
+@receiver(post_delete, sender=ProductReview)
+def update_review_stats_on_delete(sender, instance, **kwargs):
+    rating = instance._stored_rating or instance.rating
+    ratings.review_removed(instance.product_id, rating)
@@ -1,15 +1,91 @@
+from functools import wraps
+from urllib.parse import urljoin
+
 from django.contrib.sitemaps import Sitemap
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import HttpResponse
 from django.urls import reverse
 
+from .catalog import get_catalog_version
+from .constants import (
+    SITEMAP_CACHE_KEY,
+    SITEMAP_CACHE_TIMEOUT,
+    SITEMAP_PAGE_SIZE,
+)
 from .models import Product
 
 
 class ProductSitemap(Sitemap):
     changefreq = "weekly"
     priority = 0.8
+    limit = SITEMAP_PAGE_SIZE
 
     def items(self):
-        return Product.objects.order_by("pk")
+        # Plain rows rather than model instances; a page holds thousands.
+        return Product.objects.order_by("pk").values_list(
+            "pk",
+            "updated_at",
+            "image",
+            "image_url",
+            named=True,
+        )
+
+    def location(self, item):
+        return reverse("products:detail", args=[item.pk])
+
+    def lastmod(self, item):
+        return item.updated_at
+
+    def get_latest_lastmod(self):
+        # The default walks every item.
+        return Product.objects.aggregate(latest=Max("updated_at"))["latest"]
+
+    def image_location(self, item):
+        if item.image:
+            return Product._meta.get_field("image").storage.url(item.image)
+        return item.image_url
+
+    def get_urls(self, page=1, site=None, protocol=None):
+        urls = super().get_urls(page, site, protocol)
+        base = f"{self.get_protocol(protocol)}://{self.get_domain(site)}"
+        for url in urls:
+            image = self.image_location(url["item"])
+            # Storage URLs may be relative to the site.
+            url["images"] = [urljoin(base, image)] if image else []
+        return urls
+
+
+def cache_sitemap(view):
+    """
+    Cache the rendered XML of a sitemap view until the catalog changes.
+
+    Entries are keyed by protocol, section and page number only, so
+    other query strings cannot fill the cache. Requests with a ``p``
+    that is not a page number are passed through for the view to
+    reject.
+    """
+
+    @wraps(view)
+    def cached_view(request, *args, **kwargs):
+        page = request.GET.get("p", "1")
+        if not page.isdigit() or int(page) < 1:
+            return view(request, *args, **kwargs)
+
+        section = kwargs.get("section", "index")
+        key = (
+            f"{SITEMAP_CACHE_KEY}:{get_catalog_version()}:"
+            f"{request.scheme}:{section}:{int(page)}"
+        )
+        cached = cache.get(key)
+        if cached is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response.render()
+            cached = (response.content, dict(response.headers))
+            cache.set(key, cached, SITEMAP_CACHE_TIMEOUT)
+        content, headers = cached
+        return HttpResponse(content, headers=headers)
 
-    def location(self, obj):
-        return reverse("products:detail", args=[obj.pk])
+    return cached_view
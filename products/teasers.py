@@ -0,0 +1,82 @@
+import random
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .constants import (
+    TEASER_COUNT,
+    TEASER_POOL_CACHE_KEY,
+    TEASER_POOL_SIZE,
+    TEASER_POOL_TIMEOUT,
+    TEASER_STRIP_CACHE_KEY,
+    TEASER_STRIP_TIMEOUT,
+    TEASER_STRIP_VARIANTS,
+)
+from .catalog import get_catalog_version
+from .models import Product
+
+
+def build_teaser_pool():
+    """
+    Pick a random sample of product ids and store it in the cache.
+
+    Only the primary keys are read from the database, so refreshing the
+    pool never sorts the product table. The pool expires after
+    TEASER_POOL_TIMEOUT seconds, which keeps the teasers rotating.
+    """
+    pks = list(Product.objects.values_list("pk", flat=True))
+    pool = random.sample(pks, min(len(pks), TEASER_POOL_SIZE))
+    cache.set(TEASER_POOL_CACHE_KEY, pool, TEASER_POOL_TIMEOUT)
+    return pool
+
+
+def get_teaser_pool():
+    pool = cache.get(TEASER_POOL_CACHE_KEY)
+    if pool is None:
+        pool = build_teaser_pool()
+    return pool
+
+
+def invalidate_teaser_pool():
+    cache.delete(TEASER_POOL_CACHE_KEY)
+
+
+def get_teaser_products(exclude_pk=None, count=TEASER_COUNT):
+    """
+    Return up to ``count`` random products, optionally leaving one out.
+
+    Products are sampled from the cached pool in Python and fetched by
+    primary key in a single query, in the sampled order.
+    """
+    pool = [pk for pk in get_teaser_pool() if pk != exclude_pk]
+    picked = random.sample(pool, min(len(pool), count))
+    if not picked:
+        return []
+
+    by_pk = Product.objects.select_related("category").in_bulk(picked)
+    return [by_pk[pk] for pk in picked if pk in by_pk]
+
+
+def render_teaser_strip(exclude_pk=None):
+    """
+    Return the rendered "You may also like" strip.
+
+    A handful of rendered variants are kept per catalog version and one
+    of them is picked at random on each call, so the strip keeps
+    rotating without rendering ten cards per request.
+    """
+    variant = random.randrange(TEASER_STRIP_VARIANTS)
+    key = (
+        f"{TEASER_STRIP_CACHE_KEY}:{get_catalog_version()}:"
+        f"{exclude_pk or 0}:{variant}"
+    )
+
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(
+            "includes/product_teaser_strip.html",
+            {"teaser_products": get_teaser_products(exclude_pk=exclude_pk)},
+        )
+        cache.set(key, html, TEASER_STRIP_TIMEOUT)
+    return mark_safe(html)
@@ -0,0 +1,67 @@
+from django import template
+from PIL import UnidentifiedImageError
+
+from fotolio.images import CONTENT_TYPES, RENDITION_FORMATS, get_renditions
+
+register = template.Library()
+
+
+@register.inclusion_tag("includes/responsive_image.html")
+def responsive_image(
+    image,
+    alt="",
+    sizes="100vw",
+    css_class="",
+    loading="lazy",
+    width=None,
+    height=None,
+):
+    """
+    Render ``image`` as a <picture> with a srcset per format.
+
+    ``sizes`` should describe the slot the image fills, so the browser
+    can pick the smallest rendition that is sharp enough. Pass
+    loading="eager" for the image that is in view on load.
+
+    The dimensions, colour and placeholder stored on the model (e.g.
+    image_width for an ``image`` field) reserve the image's space and
+    paint a blurred preview until it loads.
+
+    An original that is missing or cannot be decoded renders as a plain
+    <img> of its URL rather than failing the page.
+    """
+    try:
+        renditions = get_renditions(image)
+    except (OSError, UnidentifiedImageError):
+        return {
+            "renditions": None,
+            "src": image.url,
+            "alt": alt,
+            "css_class": css_class,
+            "loading": loading,
+        }
+    if renditions is None:
+        return {"renditions": None}
+
+    facts = {
+        key: getattr(image.instance, f"{image.field.name}_{key}", None)
+        for key in ("width", "height", "color", "placeholder")
+    }
+
+    return {
+        "renditions": renditions,
+        "sources": [
+            (CONTENT_TYPES[fmt], renditions.srcset(fmt))
+            for fmt in RENDITION_FORMATS[:-1]
+        ],
+        "fallback_srcset": renditions.srcset(RENDITION_FORMATS[-1]),
+        "src": renditions.src(),
+        "alt": alt,
+        "sizes": sizes,
+        "css_class": css_class,
+        "loading": loading,
+        "width": width or facts["width"] or renditions.width,
+        "height": height or facts["height"] or renditions.height,
+        "color": facts["color"],
+        "placeholder": facts["placeholder"],
+    }
@@ -0,0 +1,86 @@
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from products.catalog import (
+    catalog_cache_timeout,
+    get_catalog_version,
+    get_categories,
+)
+from products.constants import (
+    CATALOG_CACHE_TIMEOUT,
+    CATALOG_SHARED_CACHE_TIMEOUT,
+)
+from products.models import Category, Product
+
+
+class CatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(
+            name="landscape",
+            friendly_name="Landscape",
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_catalog_changes_bump_catalog_version(self):
+        version = get_catalog_version()
+
+        Product.objects.create(
+            name="Sunset Print",
+            description="Wall art.",
+            price=Decimal("49.99"),
+        )
+        product_version = get_catalog_version()
+        Category.objects.create(name="forest")
+
+        self.assertNotEqual(version, product_version)
+        self.assertNotEqual(product_version, get_catalog_version())
+
+    def test_get_categories_is_cached(self):
+        get_categories()
+
+        with self.assertNumQueries(0):
+            categories = get_categories()
+
+        self.assertEqual(categories, [self.category])
+
+    def test_get_categories_reflects_category_changes(self):
+        get_categories()
+
+        Category.objects.create(name="abstract", friendly_name="Abstract")
+
+        self.assertEqual(
+            [c.name for c in get_categories()],
+            ["abstract", "landscape"],
+        )
+
+    def test_per_process_cache_entries_expire(self):
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            get_categories()
+
+        timeouts = {call.args[2] for call in cache_set.call_args_list}
+        self.assertEqual(timeouts, {CATALOG_CACHE_TIMEOUT})
+
+    def test_shared_cache_entries_outlive_per_process_ones(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, True)
+        shared = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased."
+                "FileBasedCache",
+                "LOCATION": location,
+            }
+        }
+        with override_settings(CACHES=shared):
+            self.assertEqual(
+                catalog_cache_timeout(),
+                CATALOG_SHARED_CACHE_TIMEOUT,
+            )
+        self.assertEqual(catalog_cache_timeout(), CATALOG_CACHE_TIMEOUT)
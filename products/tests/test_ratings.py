@@ -0,0 +1,121 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from products.models import Product, ProductReview
+
+
+class ReviewStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="joe",
+            email="joe@example.com",
+            password="testpass123",
+        )
+        self.product = Product.objects.create(
+            name="Sunset Print",
+            description="Beautiful sunset artwork.",
+            price=Decimal("49.99"),
+        )
+        self.client.login(username="joe", password="testpass123")
+
+    def add_review(self, user, rating):
+        return ProductReview.objects.create(
+            product=self.product,
+            user=user,
+            rating=rating,
+            comment="Review.",
+        )
+
+    def assert_stats(self, count, total, rating, histogram):
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.review_count, count)
+        self.assertEqual(self.product.rating_sum, total)
+        self.assertEqual(self.product.rating, rating)
+        self.assertEqual(
+            [n for _, n in self.product.rating_histogram()],
+            histogram,
+        )
+
+    def test_review_create_updates_stats(self):
+        self.client.post(
+            reverse("products:review_add", args=[self.product.pk]),
+            {"rating": 4, "comment": "Nice."},
+        )
+
+        self.assert_stats(1, 4, Decimal("4.00"), [0, 1, 0, 0, 0])
+
+    def test_review_edit_moves_rating_between_buckets(self):
+        self.client.post(
+            reverse("products:review_add", args=[self.product.pk]),
+            {"rating": 4, "comment": "Nice."},
+        )
+        review = ProductReview.objects.get()
+
+        self.client.post(
+            reverse("products:review_edit", args=[review.pk]),
+            {"rating": 1, "comment": "Changed my mind."},
+        )
+
+        self.assert_stats(1, 1, Decimal("1.00"), [0, 0, 0, 0, 1])
+
+    def test_review_delete_resets_stats(self):
+        self.client.post(
+            reverse("products:review_add", args=[self.product.pk]),
+            {"rating": 5, "comment": "Great."},
+        )
+        review = ProductReview.objects.get()
+
+        self.client.post(
+            reverse("products:review_delete", args=[review.pk])
+        )
+
+        self.assert_stats(0, 0, None, [0, 0, 0, 0, 0])
+
+    def test_deleting_reviewer_account_updates_stats(self):
+        other = User.objects.create_user(
+            username="ann",
+            email="ann@example.com",
+            password="testpass123",
+        )
+        self.add_review(self.user, 5)
+        self.add_review(other, 2)
+
+        other.delete()
+
+        self.assert_stats(1, 5, Decimal("5.00"), [1, 0, 0, 0, 0])
+
+    def test_recompute_review_stats_repairs_drift(self):
+        other = User.objects.create_user(
+            username="ann",
+            email="ann@example.com",
+            password="testpass123",
+        )
+        third = User.objects.create_user(
+            username="bob",
+            email="bob@example.com",
+            password="testpass123",
+        )
+        self.add_review(self.user, 5)
+        self.add_review(other, 4)
+        self.add_review(third, 4)
+        Product.objects.create(
+            name="Untouched Print",
+            description="No reviews.",
+            price=Decimal("9.99"),
+        )
+        Product.objects.filter(pk=self.product.pk).update(
+            review_count=7,
+            rating_5_count=0,
+            rating=None,
+        )
+        out = StringIO()
+
+        call_command("recompute_review_stats", "--batch-size", "1", stdout=out)
+
+        self.assertIn("checked=2 fixed=1", out.getvalue())
+        self.assert_stats(3, 13, Decimal("4.33"), [1, 2, 0, 0, 0])
@@ -0,0 +1,267 @@
+import datetime
+import io
+import math
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import Order, OrderLineItem
+from products.catalog import get_catalog_version
+from products.constants import CATALOG_CACHE_TIMEOUT
+from products.models import Category, CoPurchase, Product, ProductNeighbour
+from products.recommendations import (
+    build_recommendations,
+    count_pairs,
+    get_popular_product_ids,
+    get_recommended_products,
+    refresh_neighbours,
+    render_recommendation_strip,
+)
+
+NO_LAG = datetime.timedelta(0)
+HOUR = datetime.timedelta(hours=1)
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="prints")
+        self.sunset, self.ocean, self.forest, self.desert, self.city = [
+            Product.objects.create(
+                category=category,
+                name=name,
+                description=name,
+                price=Decimal("10.00"),
+            )
+            for name in ["Sunset", "Ocean", "Forest", "Desert", "City"]
+        ]
+
+    def paid_order(self, *products, is_paid=True, ago=HOUR):
+        order = Order.objects.create(
+            full_name="Joe Smith",
+            email="joe@example.com",
+            address1="Main Street 1",
+            city="Stockholm",
+            country="SE",
+            is_paid=is_paid,
+        )
+        if is_paid:
+            Order.objects.filter(pk=order.pk).update(
+                paid_at=timezone.now() - ago,
+            )
+        OrderLineItem.objects.bulk_create(
+            [
+                OrderLineItem(
+                    order=order,
+                    product=product,
+                    product_name=product.name,
+                    quantity=1,
+                    line_total=product.price,
+                )
+                for product in products
+            ]
+        )
+        return order
+
+    def neighbours(self, product):
+        return [
+            n.neighbour
+            for n in ProductNeighbour.objects.filter(product=product)
+        ]
+
+    def pair(self, product, other):
+        return CoPurchase.objects.get(product=product, other=other).orders
+
+    def test_count_pairs_counts_both_directions_and_products(self):
+        counts = count_pairs([{1, 2}, {1}, {1, 2, 3, 4}], max_basket=3)
+
+        self.assertEqual(counts[1, 1], 3)
+        self.assertEqual(counts[1, 2], 1)
+        self.assertEqual(counts[2, 1], 1)
+        self.assertEqual(counts[4, 4], 1)
+        self.assertNotIn((3, 4), counts)
+
+    def test_ranks_neighbours_by_cosine_similarity(self):
+        for _ in range(3):
+            self.paid_order(self.sunset, self.ocean)
+        self.paid_order(self.sunset, self.forest)
+        for _ in range(8):
+            self.paid_order(self.forest)
+
+        processed, refreshed = build_recommendations(lag=NO_LAG)
+
+        self.assertEqual((processed, refreshed), (12, 3))
+        self.assertEqual(
+            self.neighbours(self.sunset),
+            [self.ocean, self.forest],
+        )
+        self.assertEqual(self.neighbours(self.forest), [self.sunset])
+        top = ProductNeighbour.objects.get(product=self.sunset, rank=0)
+        self.assertAlmostEqual(top.score, 3 / math.sqrt(4 * 3))
+
+    def test_ignores_unpaid_orders_and_deleted_products(self):
+        self.paid_order(self.sunset, self.ocean, is_paid=False)
+        order = self.paid_order(self.sunset, self.forest)
+        OrderLineItem.objects.create(
+            order=order,
+            product=None,
+            product_name="Removed print",
+            quantity=1,
+            line_total=Decimal("10.00"),
+        )
+
+        build_recommendations(lag=NO_LAG)
+
+        self.assertEqual(self.neighbours(self.sunset), [self.forest])
+        self.assertFalse(
+            CoPurchase.objects.filter(product=self.ocean).exists()
+        )
+
+    def test_incremental_run_adds_new_orders_only(self):
+        self.paid_order(self.sunset, self.ocean)
+        build_recommendations(lag=NO_LAG)
+
+        self.paid_order(self.sunset, self.forest)
+        self.paid_order(self.sunset, self.forest)
+        processed, refreshed = build_recommendations(lag=NO_LAG)
+
+        self.assertEqual((processed, refreshed), (2, 2))
+        self.assertEqual(self.pair(self.sunset, self.sunset), 3)
+        self.assertEqual(self.pair(self.forest, self.sunset), 2)
+        self.assertEqual(self.pair(self.sunset, self.ocean), 1)
+        self.assertEqual(
+            self.neighbours(self.sunset),
+            [self.forest, self.ocean],
+        )
+        self.assertFalse(CoPurchase.objects.filter(stale=True).exists())
+
+        self.assertEqual(build_recommendations(lag=NO_LAG), (0, 0))
+
+    def test_incremental_run_without_upsert(self):
+        with patch("fotolio.db.UPSERT_VENDORS", set()):
+            self.test_incremental_run_adds_new_orders_only()
+
+    def test_small_batches_count_each_order_once(self):
+        for _ in range(5):
+            self.paid_order(self.sunset, self.ocean)
+
+        processed, _ = build_recommendations(batch_size=2, lag=NO_LAG)
+
+        self.assertEqual(processed, 5)
+        self.assertEqual(self.pair(self.ocean, self.sunset), 5)
+
+    def test_recent_payments_wait_for_next_run(self):
+        self.paid_order(self.sunset, self.ocean, ago=NO_LAG)
+
+        processed, _ = build_recommendations()
+
+        self.assertEqual(processed, 0)
+        self.assertFalse(CoPurchase.objects.exists())
+
+    def test_refresh_neighbours_for_given_products(self):
+        self.paid_order(self.sunset, self.ocean)
+        build_recommendations(lag=NO_LAG)
+        ProductNeighbour.objects.all().delete()
+
+        self.assertEqual(refresh_neighbours(product_ids=[self.ocean.pk]), 1)
+
+        self.assertEqual(self.neighbours(self.ocean), [self.sunset])
+        self.assertEqual(self.neighbours(self.sunset), [])
+
+    def test_recommended_products_fall_back_to_popular_products(self):
+        self.paid_order(self.sunset, self.ocean)
+        self.paid_order(self.desert)
+        self.paid_order(self.desert)
+        self.paid_order(self.forest)
+        build_recommendations(lag=NO_LAG)
+
+        recommended = get_recommended_products(self.sunset, count=3)
+
+        self.assertEqual(recommended, [self.ocean, self.desert, self.forest])
+
+    def test_recommended_products_fall_back_to_teasers_without_sales(self):
+        recommended = get_recommended_products(self.sunset)
+
+        self.assertEqual(len(recommended), 4)
+        self.assertNotIn(self.sunset, recommended)
+
+    def test_lookup_costs_two_queries_with_cached_popular_products(self):
+        self.paid_order(self.sunset, self.ocean)
+        build_recommendations(lag=NO_LAG)
+        self.paid_order(self.city)
+        build_recommendations(lag=NO_LAG)
+        get_recommended_products(self.sunset, count=2)
+
+        with self.assertNumQueries(2):
+            # neighbours and products
+            recommended = get_recommended_products(self.sunset, count=2)
+
+        self.assertEqual(recommended, [self.ocean, self.city])
+
+    def test_popular_products_expire_in_a_per_process_cache(self):
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            get_popular_product_ids()
+
+        cache_set.assert_called_once()
+        self.assertEqual(cache_set.call_args.args[2], CATALOG_CACHE_TIMEOUT)
+
+    def test_strip_is_cached_until_recommendations_change(self):
+        self.paid_order(self.sunset, self.ocean)
+        build_recommendations(lag=NO_LAG)
+        html = render_recommendation_strip(self.sunset)
+        self.assertIn("Ocean", html)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(render_recommendation_strip(self.sunset), html)
+
+        self.paid_order(self.sunset, self.city)
+        self.paid_order(self.sunset, self.city)
+        build_recommendations(lag=NO_LAG)
+
+        html = render_recommendation_strip(self.sunset)
+        self.assertLess(html.index("City"), html.index("Ocean"))
+
+    def test_product_detail_does_not_render_the_strip(self):
+        # The strip was taken off the page for Lighthouse NO_LCP failures.
+        self.paid_order(self.sunset, self.city)
+        build_recommendations(lag=NO_LAG)
+
+        response = self.client.get(
+            reverse("products:detail", args=[self.sunset.pk]),
+        )
+
+        self.assertNotContains(
+            response,
+            reverse("products:detail", args=[self.city.pk]),
+        )
+
+    def test_command_rebuilds_from_scratch(self):
+        self.paid_order(self.sunset, self.ocean)
+        build_recommendations(lag=NO_LAG)
+        Order.objects.filter(paid_at__isnull=False).update(
+            paid_at=timezone.now() - datetime.timedelta(days=1),
+        )
+
+        out = io.StringIO()
+        call_command("build_recommendations", "--rebuild", stdout=out)
+
+        self.assertIn("orders=1 products=2", out.getvalue())
+        self.assertEqual(self.pair(self.sunset, self.ocean), 1)
+
+    def test_refresh_all_invalidates_cached_strips(self):
+        self.paid_order(self.sunset, self.ocean)
+        build_recommendations(lag=NO_LAG)
+        version = get_catalog_version()
+
+        call_command(
+            "build_recommendations",
+            "--refresh-all",
+            stdout=io.StringIO(),
+        )
+
+        self.assertNotEqual(get_catalog_version(), version)
@@ -0,0 +1,123 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.test import TestCase, override_settings
+
+from products.constants import SEARCH_FTS_TABLE
+from products.models import Category, Product
+from products.search import (
+    PostgresSearchBackend,
+    SearchBackend,
+    SQLiteSearchBackend,
+    get_search_backend,
+    search_products,
+)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(
+            name="winter",
+            friendly_name="Snowy Landscapes",
+        )
+        self.forest = Product.objects.create(
+            category=self.category,
+            name="Forest Path",
+            description="A quiet forest path under fresh snow.",
+            price=Decimal("49.99"),
+        )
+        self.mountain = Product.objects.create(
+            name="Mountain Ridge",
+            description="Snow snow snow on a mountain ridge.",
+            price=Decimal("59.99"),
+        )
+        self.ocean = Product.objects.create(
+            name="Ocean Waves",
+            description="Waves crashing on the shore.",
+            price=Decimal("39.99"),
+        )
+
+    def search(self, query):
+        return list(search_products(Product.objects.all(), query))
+
+    def fts_row_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_FTS_TABLE}")
+            return cursor.fetchone()[0]
+
+    def test_default_backend_matches_database_vendor(self):
+        self.assertIsInstance(get_search_backend(), SQLiteSearchBackend)
+
+    @override_settings(
+        PRODUCT_SEARCH_BACKEND="products.search.SearchBackend",
+    )
+    def test_backend_can_be_overridden_in_settings(self):
+        backend = get_search_backend()
+
+        self.assertIs(type(backend), SearchBackend)
+        self.assertEqual(self.search("ocean"), [self.ocean])
+
+    def test_postgres_rank_is_double_precision(self):
+        # SearchRank is a real; seeking on its rounded value would skip
+        # or repeat tied rows at page boundaries.
+        queryset = PostgresSearchBackend().search(
+            Product.objects.all(),
+            "snow",
+        )
+        rank = queryset.query.annotations["search_rank"]
+
+        self.assertIsInstance(rank, Cast)
+        self.assertIsInstance(rank.output_field, FloatField)
+
+    def test_search_document_includes_category_names(self):
+        self.assertIn("Snowy Landscapes", self.forest.search_document)
+        self.assertIn("winter", self.forest.search_document)
+
+    def test_search_ranks_better_matches_first(self):
+        results = self.search("snow")
+
+        self.assertEqual(results, [self.mountain, self.forest])
+
+    def test_search_matches_category_names_and_prefixes(self):
+        self.assertEqual(self.search("landsc"), [self.forest])
+
+    def test_search_requires_every_term(self):
+        self.assertEqual(self.search("snow forest"), [self.forest])
+
+    def test_search_ignores_fts_syntax_in_query(self):
+        self.assertEqual(self.search('ocean" OR (NEAR'), [])
+        self.assertEqual(self.search("***"), [])
+
+    def test_renaming_category_updates_index(self):
+        self.category.friendly_name = "Frozen North"
+        self.category.save()
+
+        self.assertEqual(self.search("frozen"), [self.forest])
+        self.assertEqual(self.search("landscapes"), [])
+
+    def test_deleting_category_updates_index(self):
+        self.category.delete()
+
+        self.assertEqual(self.search("winter"), [])
+
+    def test_deleting_product_removes_it_from_index(self):
+        self.ocean.delete()
+
+        self.assertEqual(self.search("ocean"), [])
+        self.assertEqual(self.fts_row_count(), 2)
+
+    def test_rebuild_search_index_command_reindexes_products(self):
+        Product.objects.filter(pk=self.ocean.pk).update(
+            description="Stormy sea."
+        )
+        out = StringIO()
+
+        call_command("rebuild_search_index", "--batch-size", "2", stdout=out)
+
+        self.assertIn("indexed=3", out.getvalue())
+        self.assertEqual(self.fts_row_count(), 3)
+        self.assertEqual(self.search("stormy"), [self.ocean])
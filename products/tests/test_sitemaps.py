@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from products.constants import SITEMAP_CACHE_TIMEOUT
+from products.models import Product
+from products.sitemaps import ProductSitemap
+
+
+@override_settings(
+    ALLOWED_HOSTS=["testserver"],
+    STORAGES={
+        "default": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+        },
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        },
+    },
+    MEDIA_URL="/media/",
+)
+class ProductSitemapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.print = self.product("Sunset")
+        Product.objects.filter(pk=self.print.pk).update(
+            image="products/sunset.jpg",
+            updated_at=datetime(2026, 3, 4, 12, tzinfo=timezone.utc),
+        )
+        self.poster = self.product(
+            "Harbour",
+            image_url="https://images.example.com/harbour.jpg",
+        )
+
+    def product(self, name, **fields):
+        return Product.objects.create(
+            name=name,
+            description=name,
+            price=Decimal("10.00"),
+            **fields,
+        )
+
+    def test_index_lists_paginated_product_sitemaps(self):
+        with patch.object(ProductSitemap, "limit", 1):
+            response = self.client.get("/sitemap.xml")
+
+        self.assertContains(response, "<sitemapindex")
+        self.assertContains(response, "/sitemap-static.xml</loc>")
+        self.assertContains(response, "/sitemap-products.xml</loc>")
+        self.assertContains(response, "/sitemap-products.xml?p=2</loc>")
+
+    def test_product_urls_have_lastmod_and_images(self):
+        response = self.client.get("/sitemap-products.xml")
+
+        self.assertContains(response, f"/products/{self.print.pk}/</loc>")
+        self.assertContains(response, "<lastmod>2026-03-04</lastmod>")
+        self.assertContains(
+            response,
+            "<image:loc>http://example.com/media/products/sunset.jpg"
+            "</image:loc>",
+        )
+        self.assertContains(
+            response,
+            "<image:loc>https://images.example.com/harbour.jpg</image:loc>",
+        )
+        self.assertIn("Last-Modified", response.headers)
+
+    def test_items_are_plain_rows(self):
+        item = ProductSitemap().items().get(pk=self.print.pk)
+
+        self.assertNotIsInstance(item, Product)
+        self.assertEqual(item.image, "products/sunset.jpg")
+
+    def test_xml_is_cached_until_the_catalog_changes(self):
+        first = self.client.get("/sitemap-products.xml")
+
+        with self.assertNumQueries(0):
+            cached = self.client.get("/sitemap-products.xml")
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(cached["Content-Type"], first["Content-Type"])
+
+        added = self.product("Meadow")
+        response = self.client.get("/sitemap-products.xml")
+
+        self.assertContains(response, f"/products/{added.pk}/</loc>")
+
+    def test_other_query_strings_share_one_entry(self):
+        self.client.get("/sitemap-products.xml")
+
+        with self.assertNumQueries(0):
+            for query in ("?x=1", "?x=2", "?p=1&utm_source=feed"):
+                response = self.client.get(f"/sitemap-products.xml{query}")
+                self.assertEqual(response.status_code, 200)
+
+    def test_entries_expire(self):
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.client.get("/sitemap-products.xml")
+
+        self.assertIn(
+            SITEMAP_CACHE_TIMEOUT,
+            [call.args[2] for call in cache_set.call_args_list],
+        )
+
+    def test_invalid_page_is_not_found(self):
+        for page in ("abc", "0", "99"):
+            response = self.client.get(f"/sitemap-products.xml?p={page}")
+            self.assertEqual(response.status_code, 404)
+
+    def test_unknown_section_is_not_found(self):
+        response = self.client.get("/sitemap-nothing.xml")
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,105 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from products.constants import TEASER_POOL_CACHE_KEY
+from products.models import Category, Product
+from products.teasers import (
+    get_teaser_pool,
+    get_teaser_products,
+    render_teaser_strip,
+)
+
+
+class TeaserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.products = [
+            Product.objects.create(
+                name=f"Print {i}",
+                description="Wall art.",
+                price=Decimal("49.99"),
+            )
+            for i in range(12)
+        ]
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_get_teaser_products_returns_ten_unique_products(self):
+        teasers = get_teaser_products()
+
+        self.assertEqual(len(teasers), 10)
+        self.assertEqual(len({p.pk for p in teasers}), 10)
+
+    def test_get_teaser_products_excludes_given_pk(self):
+        excluded = self.products[0]
+
+        for _ in range(5):
+            teasers = get_teaser_products(
+                exclude_pk=excluded.pk,
+                count=11,
+            )
+            self.assertNotIn(excluded, teasers)
+            self.assertEqual(len(teasers), 11)
+
+    def test_get_teaser_products_uses_cached_pool(self):
+        get_teaser_pool()
+
+        with self.assertNumQueries(1):
+            get_teaser_products()
+
+    def test_saving_product_invalidates_pool(self):
+        get_teaser_pool()
+        self.assertIsNotNone(cache.get(TEASER_POOL_CACHE_KEY))
+
+        Product.objects.create(
+            name="New Print",
+            description="Wall art.",
+            price=Decimal("49.99"),
+        )
+
+        self.assertIsNone(cache.get(TEASER_POOL_CACHE_KEY))
+
+    def test_deleting_product_invalidates_pool(self):
+        get_teaser_pool()
+
+        self.products[0].delete()
+
+        self.assertIsNone(cache.get(TEASER_POOL_CACHE_KEY))
+        self.assertNotIn(self.products[0].pk, get_teaser_pool())
+
+    def test_get_teaser_products_with_empty_catalog_returns_empty_list(self):
+        Product.objects.all().delete()
+
+        self.assertEqual(get_teaser_products(), [])
+
+    def test_render_teaser_strip_renders_product_cards(self):
+        html = render_teaser_strip()
+
+        self.assertIn("You may also like", html)
+        self.assertEqual(html.count("product-related-card"), 10)
+
+    def test_render_teaser_strip_excludes_given_pk(self):
+        Product.objects.exclude(pk=self.products[0].pk).delete()
+
+        html = render_teaser_strip(exclude_pk=self.products[0].pk)
+
+        self.assertNotIn("product-related-card", html)
+
+    def test_render_teaser_strip_is_served_from_cache(self):
+        with patch("products.teasers.random.randrange", return_value=0):
+            render_teaser_strip()
+
+            with self.assertNumQueries(0):
+                render_teaser_strip()
+
+    def test_render_teaser_strip_avoids_category_queries(self):
+        category = Category.objects.create(name="forest")
+        Product.objects.update(category=category)
+        get_teaser_pool()
+
+        with self.assertNumQueries(1):
+            render_teaser_strip()
@@ -1,10 +1,16 @@
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
+from fotolio.pagination import encode_cursor
+
 from products.models import Category, Product, ProductReview
+from products.reviews import get_review_page
 
 
 class ProductViewsTests(TestCase):
@@ -83,7 +89,7 @@ class ProductViewsTests(TestCase):
         products = response.context["products"]
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(products.count(), 2)
+        self.assertEqual(len(products), 2)
         self.assertEqual(response.context["active_category"], "landscape")
 
     def test_products_list_with_invalid_category_returns_no_products(self):
@@ -93,7 +99,7 @@ class ProductViewsTests(TestCase):
         )
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.context["products"].count(), 0)
+        self.assertEqual(len(response.context["products"]), 0)
         self.assertTrue(response.context["no_results"])
 
     def test_products_list_search_returns_matching_products(self):
@@ -105,8 +111,8 @@ class ProductViewsTests(TestCase):
         products = response.context["products"]
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(products.count(), 1)
-        self.assertEqual(products.first(), self.product)
+        self.assertEqual(len(products), 1)
+        self.assertEqual(products[0], self.product)
         self.assertEqual(response.context["search_query"], "sunset")
 
     def test_products_list_search_with_no_results_sets_no_results_true(self):
@@ -116,7 +122,7 @@ class ProductViewsTests(TestCase):
         )
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.context["products"].count(), 0)
+        self.assertEqual(len(response.context["products"]), 0)
         self.assertTrue(response.context["no_results"])
 
     def test_products_list_sets_show_search_when_focus_is_one(self):
@@ -129,6 +135,161 @@ class ProductViewsTests(TestCase):
         self.assertTrue(response.context["show_search"])
         self.assertTrue(response.context["autofocus_search"])
 
+    def create_gallery(self, count):
+        for i in range(count):
+            Product.objects.create(
+                category=self.category,
+                name=f"Gallery Print {i:02d}",
+                description="Gallery wall art.",
+                price=Decimal("19.99"),
+            )
+
+    @patch("products.views.GALLERY_PAGE_SIZE", 3)
+    def test_products_list_paginates_with_cursor(self):
+        self.create_gallery(5)
+
+        seen = []
+        params = {}
+        while True:
+            response = self.client.get(self.list_url, params)
+            seen += [p.name for p in response.context["products"]]
+            next_page_query = response.context["next_page_query"]
+            if not next_page_query:
+                break
+            params = QueryDict(next_page_query)
+
+        self.assertEqual(
+            seen,
+            list(Product.objects.order_by("name").values_list(
+                "name", flat=True
+            )),
+        )
+
+    @patch("products.views.GALLERY_PAGE_SIZE", 2)
+    def test_products_list_paginates_search_results(self):
+        self.create_gallery(5)
+
+        seen = []
+        params = {"q": "gallery"}
+        while True:
+            response = self.client.get(self.list_url, params)
+            seen += [p.name for p in response.context["products"]]
+            next_page_query = response.context["next_page_query"]
+            if not next_page_query:
+                break
+            params = QueryDict(next_page_query)
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    @patch("products.views.GALLERY_PAGE_SIZE", 1)
+    def test_products_list_cursor_keeps_filters(self):
+        self.create_gallery(2)
+
+        response = self.client.get(
+            self.list_url,
+            {"category": "landscape", "q": "gallery"},
+        )
+        params = QueryDict(response.context["next_page_query"])
+
+        self.assertEqual(params["category"], "landscape")
+        self.assertEqual(params["q"], "gallery")
+        self.assertIn("cursor", params)
+
+    def test_products_list_ignores_invalid_cursor(self):
+        response = self.client.get(self.list_url, {"cursor": "not-valid"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["products"]), 2)
+
+    @patch("products.views.GALLERY_PAGE_SIZE", 1)
+    def test_products_page_returns_card_fragment(self):
+        response = self.client.get(self.list_url)
+        next_page_query = response.context["next_page_query"]
+
+        response = self.client.get(
+            f"{reverse('products:list_page')}?{next_page_query}"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(
+            response,
+            "products/includes/product_cards.html",
+        )
+        self.assertTemplateNotUsed(response, "base.html")
+        self.assertContains(response, "Sunset Print")
+        self.assertNotContains(response, "Ocean Print")
+
+    def test_products_page_rejects_invalid_cursor(self):
+        response = self.client.get(
+            reverse("products:list_page"),
+            {"cursor": "not-valid"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_with_wrong_typed_values_is_rejected(self):
+        cursor = encode_cursor(["x", "abc"])
+
+        response = self.client.get(self.list_url, {"cursor": cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["products"]), 2)
+
+        response = self.client.get(
+            reverse("products:list_page"),
+            {"cursor": cursor},
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(
+            reverse("products:list_page"),
+            {"cursor": encode_cursor(["x", "y", 1]), "q": "print"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(
+        PRODUCT_SEARCH_BACKEND="products.search.SearchBackend",
+    )
+    @patch("products.views.GALLERY_PAGE_SIZE", 1)
+    def test_search_with_fallback_backend_paginates(self):
+        seen = []
+        params = {"q": "print"}
+        while True:
+            response = self.client.get(self.list_url, params)
+            self.assertEqual(response.status_code, 200)
+            seen += [p.name for p in response.context["products"]]
+            if not response.context["next_page_query"]:
+                break
+            params = QueryDict(response.context["next_page_query"])
+
+        self.assertEqual(seen, ["Ocean Print", "Sunset Print"])
+
+    def test_search_without_terms_returns_no_results(self):
+        response = self.client.get(self.list_url, {"q": "!!!"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["no_results"])
+
+    def test_products_list_query_budget_is_constant(self):
+        for size in [10, 40]:
+            cache.clear()
+            self.create_gallery(size)
+
+            with self.assertNumQueries(2):
+                # categories and listing
+                response = self.client.get(
+                    self.list_url,
+                    {"category": "landscape", "q": "print"},
+                )
+
+            self.assertEqual(response.status_code, 200)
+
+            with self.assertNumQueries(1):
+                self.client.get(
+                    self.list_url,
+                    {"category": "landscape", "q": "print"},
+                )
+
     def test_product_detail_view_returns_success(self):
         response = self.client.get(self.detail_url)
 
@@ -136,7 +297,7 @@ class ProductViewsTests(TestCase):
         self.assertTemplateUsed(response, "products/detail.html")
         self.assertEqual(response.context["product"], self.product)
         self.assertIn("reviews", response.context)
-        self.assertIn("teaser_products", response.context)
+        self.assertNotContains(response, "product-related")
 
     def test_product_detail_view_returns_404_for_invalid_product(self):
         response = self.client.get(
@@ -162,6 +323,78 @@ class ProductViewsTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context["user_review"], review)
 
+    def create_reviews(self, count):
+        reviews = []
+        for i in range(count):
+            user = User.objects.create_user(
+                username=f"reviewer{i}",
+                password="testpass123",
+            )
+            reviews.append(
+                ProductReview.objects.create(
+                    product=self.product,
+                    user=user,
+                    rating=4,
+                    comment=f"Review {i}.",
+                )
+            )
+        return reviews
+
+    @patch("products.reviews.REVIEW_PAGE_SIZE", 2)
+    def test_product_detail_paginates_reviews(self):
+        reviews = self.create_reviews(5)
+
+        response = self.client.get(self.detail_url)
+        seen = list(response.context["reviews"])
+        cursor = response.context["next_reviews_cursor"]
+        while cursor:
+            response = self.client.get(
+                reverse("products:review_page", args=[self.product.pk]),
+                {"cursor": cursor},
+            )
+            self.assertTemplateUsed(
+                response,
+                "products/reviews/review_list.html",
+            )
+            seen += response.context["reviews"]
+            cursor = response.context["next_reviews_cursor"]
+
+        self.assertEqual(
+            seen,
+            sorted(reviews, key=lambda r: (-r.created_at.timestamp(), r.pk)),
+        )
+
+    @patch("products.reviews.REVIEW_PAGE_SIZE", 2)
+    def test_product_detail_pins_user_review_in_one_query(self):
+        self.create_reviews(3)
+        own_review = ProductReview.objects.create(
+            product=self.product,
+            user=self.user,
+            rating=5,
+            comment="Mine.",
+        )
+
+        with self.assertNumQueries(1):
+            page, user_review = get_review_page(self.product, self.user)
+
+        self.assertEqual(user_review, own_review)
+
+        self.client.login(username="joe", password="testpass123")
+        response = self.client.get(self.detail_url)
+
+        self.assertEqual(response.context["user_review"], own_review)
+        self.assertNotIn(own_review, response.context["reviews"])
+        self.assertEqual(len(response.context["reviews"]), 2)
+
+    def test_review_page_rejects_invalid_cursor(self):
+        for cursor in ["not-valid", encode_cursor(["not-a-date", 1])]:
+            response = self.client.get(
+                reverse("products:review_page", args=[self.product.pk]),
+                {"cursor": cursor},
+            )
+
+            self.assertEqual(response.status_code, 400)
+
     def test_review_add_requires_login(self):
         response = self.client.get(self.review_add_url)
 
@@ -14,11 +14,21 @@ urlpatterns = [
         products_list,
         name="list"
     ),
+    path(
+        "page/",
+        views.products_page,
+        name="list_page"
+    ),
     path(
         "<int:pk>/",
         product_detail,
         name="detail"
     ),
+    path(
+        "<int:pk>/reviews/",
+        views.review_page,
+        name="review_page"
+    ),
     path(
         "<int:product_id>/reviews/add/",
         views.review_create,
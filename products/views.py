@@ -1,36 +1,47 @@
+from urllib.parse import urlencode
+
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.shortcuts import redirect
-from django.db.models import Q
 
-from .models import Product, Category, ProductReview
-from .constants import BASE_SIZE_LABEL
+from fotolio.pagination import InvalidCursor, keyset_page
+
+from .catalog import get_categories
+from .models import Product, ProductReview
+from .constants import BASE_SIZE_LABEL, GALLERY_PAGE_SIZE
 from .forms import ProductReviewForm
+from .reviews import get_review_page
+from .search import search_products
 
 
 def ping(request):
     return HttpResponse("Products route OK")
 
 
-def products_list(request):
+def _gallery_page(request, cursor, categories):
+    """
+    Filter the gallery by category and search query and return one
+    keyset page of it, with the query string for the following page.
+
+    The category is validated against the cached ``categories`` list,
+    so a request costs a single listing query.
+    """
     products = (
         Product.objects
         .select_related("category")
-        .order_by("name")
+        .defer("search_document")
     )
-    teaser_products = Product.objects.order_by("?")[:10]
-
-    categories = Category.objects.order_by("friendly_name", "name")
+    ordering = ["name", "id"]
 
     category = request.GET.get("category", "").strip()
     q = request.GET.get("q", "").strip()
-    focus = request.GET.get("focus", "").strip()
 
     active_category = None
     if category:
-        category_exists = Category.objects.filter(name=category).exists()
+        category_exists = any(c.name == category for c in categories)
         if category_exists:
             active_category = category
             products = products.filter(category__name=category)
@@ -38,23 +49,60 @@ def products_list(request):
             products = products.none()
 
     if q:
-        products = products.filter(
-            Q(name__icontains=q)
-            | Q(description__icontains=q)
-            | Q(category__name__icontains=q)
-            | Q(category__friendly_name__icontains=q)
-        )
+        products = search_products(products, q)
+        ordering = ["-search_rank", "name", "id"]
+
+    page = keyset_page(
+        products,
+        ordering,
+        cursor=cursor,
+        page_size=GALLERY_PAGE_SIZE,
+    )
 
-    has_filters = bool(category) or bool(q)
-    no_results = has_filters and not products.exists()
+    next_page_query = ""
+    if page.has_next:
+        params = {"cursor": page.next_cursor}
+        if active_category:
+            params["category"] = active_category
+        if q:
+            params["q"] = q
+        next_page_query = urlencode(params)
+
+    return {
+        "products": page.items,
+        "next_page_query": next_page_query,
+        "active_category": active_category,
+        "has_filters": bool(category) or bool(q),
+        "search_query": q,
+    }
+
+
+def products_list(request):
+    categories = get_categories()
+
+    cursor = request.GET.get("cursor", "").strip()
+    try:
+        gallery = _gallery_page(request, cursor, categories)
+    except InvalidCursor:
+        cursor = ""
+        gallery = _gallery_page(request, cursor, categories)
+
+    focus = request.GET.get("focus", "").strip()
+    q = gallery["search_query"]
+
+    no_results = (
+        gallery["has_filters"]
+        and not cursor
+        and not gallery["products"]
+    )
 
     show_search = bool(q) or (focus == "1")
 
     context = {
-        "products": products,
-        "teaser_products": teaser_products,
+        "products": gallery["products"],
+        "next_page_query": gallery["next_page_query"],
         "categories": categories,
-        "active_category": active_category,
+        "active_category": gallery["active_category"],
         "no_results": no_results,
         "show_search": show_search,
         "search_query": q,
@@ -63,35 +111,63 @@ def products_list(request):
     return render(request, "products/list.html", context)
 
 
+def products_page(request):
+    """
+    Return the next batch of gallery cards as an HTML fragment for
+    infinite scroll.
+    """
+    try:
+        gallery = _gallery_page(
+            request,
+            request.GET.get("cursor", ""),
+            get_categories(),
+        )
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor.")
+
+    context = {
+        "products": gallery["products"],
+        "next_page_query": gallery["next_page_query"],
+    }
+    return render(request, "products/includes/product_cards.html", context)
+
+
 def product_detail(request, pk):
     product = get_object_or_404(Product, pk=pk)
-    reviews = (
-        product.reviews
-        .select_related("user")
-        .all()
-    )
-    user_review = None
-    if request.user.is_authenticated:
-        user_review = reviews.filter(
-            user=request.user
-        ).first()
-
-    teaser_products = (
-        Product.objects
-        .exclude(pk=product.pk)
-        .order_by("?")[:10]
-    )
+    page, user_review = get_review_page(product, request.user)
 
     context = {
         "product": product,
         "base_size": BASE_SIZE_LABEL,
-        "teaser_products": teaser_products,
-        "reviews": reviews,
+        "reviews": page.items,
+        "next_reviews_cursor": page.next_cursor,
         "user_review": user_review,
     }
     return render(request, "products/detail.html", context)
 
 
+def review_page(request, pk):
+    """
+    Return the next batch of reviews as an HTML fragment.
+    """
+    product = get_object_or_404(Product, pk=pk)
+    try:
+        page, _ = get_review_page(
+            product,
+            request.user,
+            cursor=request.GET.get("cursor", ""),
+        )
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor.")
+
+    context = {
+        "product": product,
+        "reviews": page.items,
+        "next_reviews_cursor": page.next_cursor,
+    }
+    return render(request, "products/reviews/review_list.html", context)
+
+
 @login_required
 def review_create(request, product_id):
     product = get_object_or_404(Product, pk=product_id)
@@ -117,7 +193,8 @@ def review_create(request, product_id):
             review = form.save(commit=False)
             review.product = product
             review.user = request.user
-            review.save()
+            with transaction.atomic():
+                review.save()
             messages.success(
                 request,
                 "Review added successfully."
@@ -158,7 +235,8 @@ def review_edit(request, review_id):
     if request.method == "POST":
         form = ProductReviewForm(request.POST, instance=review)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                form.save()
             messages.success(
                 request,
                 "Review updated successfully."
@@ -207,7 +285,8 @@ def review_delete(request, review_id):
         )
 
     product_id = review.product.id
-    review.delete()
+    with transaction.atomic():
+        review.delete()
     messages.success(
         request,
         "Review deleted successfully."
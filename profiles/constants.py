@@ -0,0 +1,5 @@
+# Avatar uploads are checked against these caps, then downsized to
+# AVATAR_MAX_EDGE and re-encoded before they are stored.
+AVATAR_MAX_EDGE = 1024
+AVATAR_MAX_UPLOAD_SIZE = 25 * 1024 * 1024
+AVATAR_MAX_PIXELS = 50_000_000
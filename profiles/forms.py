@@ -1,6 +1,14 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 from django_countries.widgets import CountrySelectWidget
 
+from fotolio.images import InvalidImage, prepare_upload
+
+from .constants import (
+    AVATAR_MAX_EDGE,
+    AVATAR_MAX_PIXELS,
+    AVATAR_MAX_UPLOAD_SIZE,
+)
 from .models import Profile
 
 
@@ -64,6 +72,9 @@ class ProfileForm(forms.ModelForm):
             "country": CountrySelectWidget(
                 attrs={"class": "form-control"}
             ),
+            "avatar": forms.ClearableFileInput(
+                attrs={"accept": "image/jpeg,image/png,image/webp"}
+            ),
         }
 
     def __init__(self, *args, **kwargs):
@@ -84,3 +95,20 @@ class ProfileForm(forms.ModelForm):
 
         if "address_line2" in self.fields:
             self.fields["address_line2"].required = False
+
+    def clean_avatar(self):
+        """
+        Store new uploads as a downsized WebP without EXIF data.
+        """
+        avatar = self.cleaned_data.get("avatar")
+        if not isinstance(avatar, UploadedFile):
+            return avatar
+        try:
+            return prepare_upload(
+                avatar,
+                max_edge=AVATAR_MAX_EDGE,
+                max_bytes=AVATAR_MAX_UPLOAD_SIZE,
+                max_pixels=AVATAR_MAX_PIXELS,
+            )
+        except InvalidImage as error:
+            raise forms.ValidationError(str(error))
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from fotolio.media_migration import ImageInfoBackfillCommand
+from profiles.models import Profile
+
+
+class Command(ImageInfoBackfillCommand):
+    help = (
+        "Store the dimensions, dominant colour and placeholder of "
+        "avatars that do not have them yet."
+    )
+
+    model = Profile
+    field_name = "avatar"
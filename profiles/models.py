@@ -63,6 +63,27 @@ class Profile(models.Model):
         null=True,
     )
 
+    # Avatar facts, maintained by fotolio.images.
+    avatar_width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    avatar_height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    avatar_color = models.CharField(
+        max_length=7,
+        blank=True,
+        editable=False,
+    )
+    avatar_placeholder = models.TextField(
+        blank=True,
+        editable=False,
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 
+from fotolio.images import refresh_image_info
+
 from .models import Profile
 
 
@@ -19,3 +21,8 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
             instance.profile.save()
         except Profile.DoesNotExist:
             Profile.objects.create(user=instance)
+
+
+@receiver(pre_save, sender=Profile)
+def describe_avatar(sender, instance, **kwargs):
+    refresh_image_info(instance, "avatar")
@@ -1,7 +1,41 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
 
 from profiles.forms import ProfileForm
 
+MEDIA_ROOT = tempfile.mkdtemp()
+
+PROFILE_DATA = {
+    "display_name": "Joe",
+    "phone": "123456789",
+    "shipping_full_name": "Joe Smith",
+    "address_line1": "Main Street 1",
+    "city": "Stockholm",
+    "postcode": "12345",
+    "country": "SE",
+}
+
+
+def image_upload(
+    fmt="JPEG",
+    size=(3000, 2000),
+    mode="RGB",
+    color="orange",
+    name=None,
+    **save,
+):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, fmt, **save)
+    name = name or f"photo.{fmt.lower()}"
+    return SimpleUploadedFile(name, buffer.getvalue())
+
 
 class ProfileFormTests(TestCase):
     def test_required_fields_are_required(self):
@@ -62,3 +96,100 @@ class ProfileFormTests(TestCase):
             form.fields["country"].widget.attrs["class"],
             "form-control",
         )
+
+
+@override_settings(
+    STORAGES={
+        "default": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+        },
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        },
+    },
+    MEDIA_ROOT=MEDIA_ROOT,
+)
+class AvatarUploadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def form(self, avatar):
+        return ProfileForm(data=PROFILE_DATA, files={"avatar": avatar})
+
+    def test_avatar_is_downsized_upright_webp_without_exif(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = "PhoneMaker"
+        form = self.form(image_upload(exif=exif))
+
+        self.assertTrue(form.is_valid(), form.errors)
+        avatar = form.cleaned_data["avatar"]
+        self.assertEqual(avatar.name, "photo.webp")
+        with Image.open(avatar) as image:
+            self.assertEqual(image.format, "WEBP")
+            # Portrait once the EXIF rotation is applied.
+            self.assertEqual(image.size, (683, 1024))
+            self.assertEqual(len(image.getexif()), 0)
+
+    def test_saved_profile_stores_processed_avatar(self):
+        user = User.objects.create_user(username="joe", password="x")
+        form = ProfileForm(
+            data=PROFILE_DATA,
+            files={"avatar": image_upload()},
+            instance=user.profile,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        profile = form.save()
+
+        self.assertTrue(profile.avatar.name.startswith("avatars/photo"))
+        self.assertTrue(profile.avatar.name.endswith(".webp"))
+        self.assertEqual(
+            (profile.avatar_width, profile.avatar_height),
+            (1024, 683),
+        )
+
+    def test_transparent_png_keeps_alpha(self):
+        form = self.form(image_upload(
+                "PNG",
+                size=(200, 200),
+                mode="RGBA",
+                color=(255, 165, 0, 128),
+            ))
+
+        self.assertTrue(form.is_valid(), form.errors)
+        with Image.open(form.cleaned_data["avatar"]) as image:
+            self.assertEqual(image.mode, "RGBA")
+            self.assertEqual(image.size, (200, 200))
+
+    def test_type_is_checked_from_file_contents(self):
+        form = self.form(image_upload("GIF", size=(50, 50), name="photo.jpg"))
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("JPEG, PNG or WebP", form.errors["avatar"][0])
+
+    def test_upload_size_is_capped(self):
+        with patch("profiles.forms.AVATAR_MAX_UPLOAD_SIZE", 1024):
+            form = self.form(image_upload(size=(400, 400), quality=100))
+
+            self.assertFalse(form.is_valid())
+        self.assertIn("at most 1.0\xa0KB", form.errors["avatar"][0])
+
+    def test_pixel_count_is_capped_before_decoding(self):
+        upload = image_upload(size=(2000, 1000))
+
+        with patch("profiles.forms.AVATAR_MAX_PIXELS", 1_000_000), patch(
+            "PIL.ImageFile.ImageFile.load",
+            side_effect=AssertionError("decoded"),
+        ):
+            form = self.form(upload)
+
+            self.assertFalse(form.is_valid())
+        self.assertIn("megapixels", form.errors["avatar"][0])
+
+    def test_existing_avatar_is_left_alone(self):
+        form = ProfileForm(data=PROFILE_DATA)
+
+        self.assertTrue(form.is_valid())
+        self.assertIsNone(form.cleaned_data["avatar"])